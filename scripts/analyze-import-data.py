@@ -1,108 +1,116 @@
 # -*- coding: utf-8 -*-
-import openpyxl
+"""
+FEAT-008: OM Expense import data analyzer
+
+Profiles an OM Expense import workbook in a single streaming pass and writes
+an analysis report (unique headers / items / categories / OpCos, header list,
+sample items, per-column statistics and heavy hitters).
+
+Usage:
+    python scripts/analyze-import-data.py [excel_file] [output_file] [--exact] [--top N]
+        [--engine openpyxl|fast]
+
+Arguments:
+    excel_file   - (Optional) Path to the Excel file (or a .csv / .tsv export)
+                   (default: docs/For Data Import/OM Expense and Detail import data - v2.xlsx)
+    output_file  - (Optional) Path to the report (default: docs/import-data-analysis.json)
+
+Options:
+    --exact      - Exact distinct counts, frequencies and full lists. Memory grows
+                   with the number of distinct values; use for small files.
+                   Without it, distinct counts switch to HyperLogLog estimates past
+                   10,000 values and lists are capped, so memory stays flat
+                   (see om_import/profiler.py)
+    --top N      - Heavy hitters to report per key (default: 50)
+    --engine     - Sheet reader: openpyxl (default) or fast, a direct xlsx XML
+                   parse yielding the same values (see om_import/readers.py)
+
+To write this report and the import JSON from one read of the workbook, use
+`python scripts/convert-excel-to-import-json.py <excel_file> --analysis <report>`.
+
+Report additions over the original analysis JSON:
+    summary.exact - Per unique count, whether it is exact (false: a HyperLogLog
+                    estimate, printed as "(approximate)")
+    columns       - Per column: null rate, type mix, numeric min/max/sum,
+                    text length range, distinct count
+    heavy_hitters - Most frequent headers, (header, item) pairs and OpCos
+    profile       - Mode, empty rows, whether counts are exact, capped lists
+    layout        - Layout profile matched by the header row and its column
+                    letters (see om_import/layouts.py); `headers` and `columns`
+                    follow the import layout order
+"""
+
+import argparse
 import json
+import os
 import sys
 
-# Read Excel file
-wb = openpyxl.load_workbook('docs/For Data Import/OM Expense and Detail import data - v2.xlsx', data_only=True)
-ws = wb.active
-
-# Read all data
-data = []
-headers = []
-
-for row_idx, row in enumerate(ws.iter_rows(min_row=1, values_only=True), 1):
-    if row_idx == 1:
-        headers = list(row)
-    else:
-        if all(cell is None or cell == '' for cell in row):
-            continue
-        data.append(list(row))
-
-# Analyze unique values
-om_headers = {}  # name -> description
-om_items = {}    # (header, item) -> details
-categories = set()
-opcos = set()
-header_category_map = {}  # header -> category
-
-for row in data:
-    header_name = str(row[1]).strip() if row[1] else None
-    header_desc = str(row[2]).strip() if row[2] else None
-    item_name = str(row[3]).strip() if row[3] else None
-    item_desc = str(row[4]).strip() if row[4] else None
-    category = str(row[5]).strip() if row[5] else None
-    budget_usd = row[6]
-    opco = str(row[9]).strip() if row[9] else None
-    end_date = row[12]
-
-    if header_name:
-        if header_name not in om_headers:
-            om_headers[header_name] = header_desc
-        if category:
-            header_category_map[header_name] = category
-            categories.add(category)
-
-    if item_name and header_name:
-        key = (header_name, item_name)
-        if key not in om_items:
-            om_items[key] = {
-                'header': header_name,
-                'item': item_name,
-                'item_desc': item_desc,
-                'category': category,
-                'opcos': [],
-                'budgets': [],
-                'end_dates': []
-            }
-        if opco:
-            opcos.add(opco)
-            om_items[key]['opcos'].append(opco)
-        if budget_usd is not None:
-            om_items[key]['budgets'].append(budget_usd)
-        if end_date:
-            om_items[key]['end_dates'].append(str(end_date))
-
-# Output results
-result = {
-    'summary': {
-        'total_rows': len(data),
-        'unique_headers': len(om_headers),
-        'unique_items': len(om_items),
-        'unique_categories': len(categories),
-        'unique_opcos': len(opcos)
-    },
-    'headers': headers,
-    'categories': sorted(list(categories)),
-    'opcos': sorted(list(opcos)),
-    'om_expense_headers': [
-        {
-            'name': name,
-            'description': desc,
-            'category': header_category_map.get(name, '')
-        }
-        for name, desc in sorted(om_headers.items())
-    ],
-    'sample_items': [
-        {
-            'header': details['header'],
-            'item': details['item'],
-            'item_desc': details['item_desc'],
-            'category': details['category'],
-            'opcos_count': len(set(details['opcos'])),
-            'unique_opcos': list(set(details['opcos']))[:5]
-        }
-        for key, details in list(om_items.items())[:20]
-    ]
-}
-
-# Write to JSON file
-with open('docs/import-data-analysis.json', 'w', encoding='utf-8') as f:
-    json.dump(result, f, ensure_ascii=False, indent=2)
-
-print('Analysis complete. Results saved to docs/import-data-analysis.json')
-print(f"Total rows: {result['summary']['total_rows']}")
-print(f"Unique headers: {result['summary']['unique_headers']}")
-print(f"Unique items: {result['summary']['unique_items']}")
-print(f"Unique categories: {result['summary']['unique_categories']}")
-print(f"Unique OpCos: {result['summary']['unique_opcos']}")
+from om_import.readers import DEFAULT_ENGINE, READER_ENGINES
+from om_import.sketches import DEFAULT_TOP_K
+
+DEFAULT_INPUT = 'docs/For Data Import/OM Expense and Detail import data - v2.xlsx'
+DEFAULT_OUTPUT = 'docs/import-data-analysis.json'
+
+
+def analyze_import_data(excel_path, output_path=DEFAULT_OUTPUT, exact=False, top_k=DEFAULT_TOP_K, engine=None):
+    """
+    Profile a workbook and write the analysis report (`engine`: sheet reader, see om_import/readers.py).
+
+    Returns:
+        the report dict
+    """
+    from om_import.profiler import profile_workbook
+
+    result = profile_workbook(excel_path, engine=engine, exact=exact, top_k=top_k)
+
+    # Write to JSON file
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    summary = result['summary']
+
+    def count(name):
+        return f"{summary[name]}" + ('' if summary['exact'][name] else ' (approximate)')
+
+    print(f'Analysis complete. Results saved to {output_path}')
+    print(f"Layout: {result['layout']['profile']}")
+    print(f"Total rows: {summary['total_rows']}")
+    print(f"Unique headers: {count('unique_headers')}")
+    print(f"Unique items: {count('unique_items')}")
+    print(f"Unique categories: {count('unique_categories')}")
+    print(f"Unique OpCos: {count('unique_opcos')}")
+    if result['profile']['truncated_lists']:
+        print(f"[WARN] Lists capped in streaming mode: {', '.join(result['profile']['truncated_lists'])} "
+              f"(use --exact for full lists)")
+    return result
+
+
+def main(argv=None, prog=None):
+    """Main entry point."""
+    parser = argparse.ArgumentParser(prog=prog, description='Profile an OM Expense import workbook.')
+    parser.add_argument('excel_file', nargs='?', default=DEFAULT_INPUT,
+                        help=f'Path to the Excel file (default: {DEFAULT_INPUT})')
+    parser.add_argument('output_file', nargs='?', default=DEFAULT_OUTPUT,
+                        help=f'Path to the report (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--exact', action='store_true',
+                        help='Exact counts and full lists (memory grows with distinct values)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_K,
+                        help=f'Heavy hitters per key (default: {DEFAULT_TOP_K})')
+    parser.add_argument('--engine', choices=READER_ENGINES, default=DEFAULT_ENGINE,
+                        help=f'Sheet reader: openpyxl or fast (direct xlsx XML parse) (default: {DEFAULT_ENGINE})')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.excel_file):
+        print(f"[ERROR] File not found: {args.excel_file}")
+        sys.exit(1)
+
+    try:
+        analyze_import_data(args.excel_file, args.output_file, exact=args.exact, top_k=args.top,
+                            engine=args.engine)
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Benchmark suite for the OM Expense import scripts
+
+Generates deterministic synthetic workbooks (om_import/synthetic.py) and
+times the import tooling on them:
+
+    convert         convert_excel_to_import_json (default mode)
+    convert-stream  convert_excel_to_import_json --stream
+    convert-fast    convert_excel_to_import_json --engine fast (om_import/readers.py)
+    analyze         analyze-import-data.py (streaming profiler)
+    analyze-fast    analyze-import-data.py --engine fast
+    flatten         screenshot-extraction JSON -> flat items (om_import/extracted.py)
+    reconcile       subtotal reconciliation of the extraction JSON (om_import/reconcile.py)
+
+With --startup it instead times how long the commands of om-import.py take
+to start (see om_import/cli.py): `--help` of the CLI and of every command,
+and a complete run of the light commands (reconcile on a small extraction
+document, fix-imports on a small source tree), each as a fresh
+`python scripts/om-import.py ...` process next to a bare `python -c pass`.
+A run is checked against --startup-limit and must not import openpyxl or a
+process pool.
+
+With --diff-engines it instead checks the fast reader engine against
+openpyxl (om_import/readers.py): on the given workbooks (default: the
+synthetic workbooks of --rows), every row read by both engines must be
+equal, and so must the converter outputs; any difference is listed and the
+run exits with status 1.
+
+Every target runs --repeat times per size; the JSON results record each run's
+wall time, best / median, rows per second and peak Python heap memory
+(tracemalloc, measured in one extra run because tracing slows the code
+down). Converter runs are also checked against the counts the generator
+expects (unique items, duplicates, skipped rows).
+
+Usage:
+    python scripts/benchmark-om-import.py [--rows 1000,10000,100000]
+        [--targets convert,convert-stream,convert-fast,analyze,analyze-fast,flatten,reconcile]
+        [--repeat 3]
+        [--duplicate-rate 0.02] [--invalid-rate 0.01] [--seed 0]
+        [--work-dir .om-import-bench] [--output benchmark-results.json]
+        [--compare BASELINE_JSON [--threshold 0.1]]
+    python scripts/benchmark-om-import.py --startup [--repeat 10] [--startup-limit 100]
+    python scripts/benchmark-om-import.py --diff-engines [WORKBOOK ...] [--rows 1000,10000]
+
+Options:
+    --rows       - Comma-separated data row counts (1k .. 1M; suffixes k / m allowed)
+    --targets    - Comma-separated targets to run (default: all)
+    --repeat     - Timed runs per target and size (default: 3)
+    --work-dir   - Where generated workbooks are kept; a workbook is reused
+                   while its parameters are unchanged (default: .om-import-bench/)
+    --output     - Results JSON (default: <work-dir>/benchmark-results.json)
+    --compare    - Compare best times with an earlier results file and exit
+                   with status 1 when a target got slower by more than
+                   --threshold (default: 0.1 = 10%)
+    --startup    - Time CLI start-up instead of the targets (--repeat defaults to 10)
+    --startup-limit - Slowest acceptable start-up in milliseconds (default: 100)
+    --diff-engines - Compare the fast reader engine with openpyxl instead of timing
+
+Author: IT Department
+Since: FEAT-008 - OM Expense Data Import
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from om_import.cli import COMMANDS, load_script
+from om_import.extracted import flatten_items
+from om_import.readers import diff_engines
+from om_import.reconcile import Reconciler
+from om_import.synthetic import SyntheticSpec, expected, extracted_document, write_workbook
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WORK_DIR = '.om-import-bench'
+DEFAULT_ROWS = '1000,10000'
+TARGETS = ('convert', 'convert-stream', 'convert-fast', 'analyze', 'analyze-fast', 'flatten', 'reconcile')
+
+DEFAULT_STARTUP_REPEAT = 10
+DEFAULT_STARTUP_LIMIT_MS = 100
+# Modules no start-up run may load: the command would be paying for work it does not do
+HEAVY_MODULES = ('openpyxl', 'multiprocessing', 'asyncio')
+
+
+def parse_rows(text):
+    """'1k,10k,1m' -> [1000, 10000, 1000000]"""
+    sizes = []
+    for part in text.split(','):
+        part = part.strip().lower()
+        scale = {'k': 1000, 'm': 1000000}.get(part[-1:], 1)
+        sizes.append(int(float(part.rstrip('km')) * scale))
+    return sizes
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=SCRIPTS_DIR, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def prepare_inputs(spec, work_dir):
+    """Generate (or reuse) the workbook and extraction JSON for one spec."""
+    base = os.path.join(work_dir, f"synthetic-{spec.slug()}")
+    workbook_path = base + '.xlsx'
+    extracted_path = base + '.extracted.json'
+
+    if not os.path.exists(workbook_path):
+        print(f"[INFO] Generating {spec.rows:,} rows: {workbook_path}")
+        started = time.perf_counter()
+        write_workbook(workbook_path + '.tmp.xlsx', spec)
+        os.replace(workbook_path + '.tmp.xlsx', workbook_path)
+        print(f"[INFO] Generated in {time.perf_counter() - started:.1f}s")
+    if not os.path.exists(extracted_path):
+        with open(extracted_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(extracted_document(spec), f, ensure_ascii=False)
+        os.replace(extracted_path + '.tmp', extracted_path)
+
+    return workbook_path, extracted_path
+
+
+def make_runners(workbook_path, extracted_path, work_dir):
+    """Return {target: callable} for one workbook; each call returns a result summary."""
+    converter = load_script('convert-excel-to-import-json.py')
+    analyzer = load_script('analyze-import-data.py')
+    output_path = os.path.join(work_dir, 'benchmark-output.json')
+    report_path = os.path.join(work_dir, 'benchmark-analysis.json')
+
+    def convert(streaming, engine=None):
+        stats = converter.convert_excel_to_import_json(workbook_path, output_path, streaming=streaming,
+                                                       engine=engine)
+        return {
+            'unique_items': stats['unique_items'],
+            'duplicates': stats['duplicates_removed'],
+            'invalid': stats['skipped_rows'],
+        }
+
+    def analyze(engine=None):
+        report = analyzer.analyze_import_data(workbook_path, report_path, engine=engine)
+        return {'rows': report['summary']['total_rows']}
+
+    def flatten():
+        with open(extracted_path, encoding='utf-8') as f:
+            items = flatten_items(json.load(f))
+        return {'items': len(items)}
+
+    def reconcile():
+        reconciler = Reconciler()
+        reconciler.add_file(extracted_path)
+        report = reconciler.report()
+        return {'headers': report['headers'], 'findings': sum(report['findings_by_kind'].values())}
+
+    return {
+        'convert': lambda: convert(False),
+        'convert-stream': lambda: convert(True),
+        'convert-fast': lambda: convert(False, engine='fast'),
+        'analyze': analyze,
+        'analyze-fast': lambda: analyze(engine='fast'),
+        'flatten': flatten,
+        'reconcile': reconcile,
+    }
+
+
+def measure(runner, repeat):
+    """Time `repeat` runs, then one traced run for peak memory."""
+    seconds = []
+    summary = None
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            summary = runner()
+            seconds.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        try:
+            runner()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return seconds, peak, summary
+
+
+def check(target, summary, counts):
+    """Compare a converter / reconcile run with what the generator guarantees."""
+    if target == 'reconcile':
+        # Synthetic subtotals are the sums of their items
+        return {'ok': summary['findings'] == 0, 'expected': {'findings': 0}, 'actual': summary}
+    if not target.startswith('convert'):
+        return None
+    wanted = {key: counts[key] for key in ('unique_items', 'duplicates', 'invalid')}
+    return {'ok': summary == wanted, 'expected': wanted, 'actual': summary}
+
+
+def compare(results, baseline_path, threshold):
+    """Print best-time ratios against a baseline; return the regressions."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['target'], r['rows']): r for r in json.load(f)['results']}
+
+    regressions = []
+    print("\n" + "="*50)
+    print(f"[STATS] Compared with {baseline_path}")
+    print("="*50)
+    for result in results:
+        before = baseline.get((result['target'], result['rows']))
+        if before is None:
+            continue
+        ratio = result['best'] / before['best'] if before['best'] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = ' [WARN] slower'
+            regressions.append({'target': result['target'], 'rows': result['rows'], 'ratio': round(ratio, 3)})
+        print(f"  {result['target']:<15} {result['rows']:>9,} rows: "
+              f"{before['best']:.3f}s -> {result['best']:.3f}s ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def startup_commands(work_dir):
+    """Return [(target, argv)] of the start-up benchmark, preparing its small inputs."""
+    cli = os.path.join(SCRIPTS_DIR, 'om-import.py')
+    extracted_path = os.path.join(work_dir, 'startup.extracted.json')
+    with open(extracted_path, 'w', encoding='utf-8') as f:
+        json.dump(extracted_document(SyntheticSpec(rows=100)), f, ensure_ascii=False)
+    source_dir = os.path.join(work_dir, 'startup-src')
+    os.makedirs(source_dir, exist_ok=True)
+    with open(os.path.join(source_dir, 'page.tsx'), 'w', encoding='utf-8') as f:
+        f.write("import React from 'react';\nimport { useState } from 'react';\n")
+
+    commands = [('python -c pass', ['-c', 'pass']), ('--help', [cli, '--help'])]
+    commands += [(f"{name} --help", [cli, name, '--help']) for name in COMMANDS]
+    commands += [
+        ('reconcile (100 items)', [cli, 'reconcile', extracted_path,
+                                   '--output', os.path.join(work_dir, 'startup-reconciliation.json')]),
+        ('fix-imports --check (1 file)', [cli, 'fix-imports', source_dir, '--check']),
+    ]
+    return commands
+
+
+def imported_modules(argv):
+    """Top-level packages imported by one run (python -X importtime)."""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + argv, capture_output=True, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and line.count('|') == 2:
+            modules.add(line.rsplit('|', 1)[1].strip().split('.')[0])
+    return modules
+
+
+def run_startup(repeat=DEFAULT_STARTUP_REPEAT, limit_ms=DEFAULT_STARTUP_LIMIT_MS, work_dir=DEFAULT_WORK_DIR):
+    """
+    Time fresh interpreter runs of the om-import.py commands.
+
+    Returns:
+        results dict (see module docstring; rows is 0 for start-up targets)
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    for target, argv in startup_commands(work_dir):
+        seconds = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            seconds.append(time.perf_counter() - started)
+        best = min(seconds)
+        heavy = sorted(set(HEAVY_MODULES) & imported_modules(argv))
+        result = {
+            'target': f"startup: {target}",
+            'rows': 0,
+            'seconds': [round(s, 4) for s in seconds],
+            'best': round(best, 4),
+            'median': round(statistics.median(seconds), 4),
+            'heavy_modules': heavy,
+            'check': {
+                'ok': best * 1000 <= limit_ms and not heavy,
+                'expected': {'max_ms': limit_ms, 'heavy_modules': []},
+                'actual': {'best_ms': round(best * 1000, 1), 'heavy_modules': heavy},
+            },
+        }
+        results.append(result)
+        status = '' if result['check']['ok'] else ' [WARN] over the limit' if not heavy \
+            else f" [WARN] imports {', '.join(heavy)}"
+        print(f"  {target:<32} best {best * 1000:6.1f} ms, median {result['median'] * 1000:6.1f} ms{status}")
+
+    return results_document(results, {'repeat': repeat, 'startup_limit_ms': limit_ms})
+
+
+def diff_conversions(converter, workbook_path, work_dir):
+    """
+    Convert a workbook with both engines; return (outputs equal, {engine: seconds}).
+
+    A workbook the converter rejects (e.g. no known header layout) must be
+    rejected with the same error by both engines.
+    """
+    outputs = {}
+    seconds = {}
+    for engine in ('openpyxl', 'fast'):
+        output_path = os.path.join(work_dir, f'engines-{engine}.json')
+        started = time.perf_counter()
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                converter.convert_excel_to_import_json(workbook_path, output_path, streaming=True,
+                                                       output_format='json', engine=engine)
+            with open(output_path, 'rb') as f:
+                outputs[engine] = f.read()
+        except Exception as e:
+            outputs[engine] = f"{type(e).__name__}: {e}"
+        seconds[engine] = round(time.perf_counter() - started, 4)
+    return outputs['openpyxl'] == outputs['fast'], seconds
+
+
+def run_engine_diff(paths, work_dir=DEFAULT_WORK_DIR):
+    """
+    Compare the fast reader engine with openpyxl on each workbook.
+
+    Returns:
+        results dict (see module docstring; rows is the number of sheet rows compared)
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    converter = load_script('convert-excel-to-import-json.py')
+    results = []
+    for path in paths:
+        report = diff_engines(path)
+        same_output, seconds = diff_conversions(converter, path, work_dir)
+        result = {
+            'target': f"engines: {report['file']}",
+            'rows': report['rows'],
+            'sheet': report['sheet'],
+            'best': seconds['fast'],
+            'convert_seconds': seconds,
+            'check': {
+                'ok': report['mismatches'] == 0 and same_output,
+                'expected': {'row_mismatches': 0, 'same_output': True},
+                'actual': {'row_mismatches': report['mismatches'], 'same_output': same_output},
+            },
+            'samples': [{**sample, 'openpyxl': repr(sample['openpyxl']), 'fast': repr(sample['fast'])}
+                        for sample in report['samples']],
+        }
+        results.append(result)
+        status = 'same rows and output' if result['check']['ok'] else \
+            f"[WARN] {report['mismatches']} rows differ" + ('' if same_output else ', converter output differs')
+        print(f"  {report['file']}: {report['rows']:,} rows, convert {seconds['openpyxl']:.3f}s -> "
+              f"{seconds['fast']:.3f}s (fast): {status}")
+        for sample in result['samples'][:5]:
+            print(f"    row {sample['row']}: openpyxl {sample['openpyxl']} / fast {sample['fast']}")
+
+    return results_document(results, {'workbooks': [os.path.abspath(path) for path in paths]})
+
+
+def results_document(results, params):
+    """Wrap benchmark results with the run's environment."""
+    return {
+        'version': 1,
+        'createdAt': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'params': params,
+        'results': results,
+    }
+
+
+def run_benchmarks(sizes, targets, repeat=3, duplicate_rate=0.02, invalid_rate=0.01, seed=0,
+                   work_dir=DEFAULT_WORK_DIR):
+    """
+    Run every target on a synthetic workbook of each size.
+
+    Returns:
+        results dict (see module docstring)
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    for rows in sizes:
+        spec = SyntheticSpec(rows=rows, duplicate_rate=duplicate_rate, invalid_rate=invalid_rate, seed=seed)
+        workbook_path, extracted_path = prepare_inputs(spec, work_dir)
+        counts = expected(spec)
+        runners = make_runners(workbook_path, extracted_path, work_dir)
+
+        for target in targets:
+            print(f"[INFO] {target}: {rows:,} rows x {repeat}")
+            seconds, peak, summary = measure(runners[target], repeat)
+            best = min(seconds)
+            result = {
+                'target': target,
+                'rows': rows,
+                'workbook': os.path.basename(workbook_path),
+                'workbook_bytes': os.path.getsize(workbook_path),
+                'seconds': [round(s, 4) for s in seconds],
+                'best': round(best, 4),
+                'median': round(statistics.median(seconds), 4),
+                'rows_per_second': round(rows / best) if best else None,
+                'peak_memory_bytes': peak,
+                'summary': summary,
+                'check': check(target, summary, counts),
+            }
+            results.append(result)
+            status = ''
+            if result['check'] is not None:
+                status = ', counts OK' if result['check']['ok'] else ' [WARN] counts differ from generator'
+            print(f"  best {best:.3f}s, median {result['median']:.3f}s, "
+                  f"{result['rows_per_second']:,} rows/s, peak {peak / 1048576:.1f} MiB{status}")
+
+    return results_document(results, {
+        'duplicate_rate': duplicate_rate,
+        'invalid_rate': invalid_rate,
+        'seed': seed,
+        'repeat': repeat,
+    })
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Benchmark the OM Expense import scripts on synthetic workbooks.')
+    parser.add_argument('--rows', default=DEFAULT_ROWS,
+                        help=f'Comma-separated data row counts, e.g. 1k,100k,1m (default: {DEFAULT_ROWS})')
+    parser.add_argument('--targets', default=','.join(TARGETS),
+                        help=f"Comma-separated targets (default: {','.join(TARGETS)})")
+    parser.add_argument('--repeat', type=int,
+                        help=f'Timed runs per target and size (default: 3, {DEFAULT_STARTUP_REPEAT} with --startup)')
+    parser.add_argument('--duplicate-rate', type=float, default=0.02,
+                        help='Share of rows that duplicate an earlier row (default: 0.02)')
+    parser.add_argument('--invalid-rate', type=float, default=0.01,
+                        help='Share of rows missing a required field (default: 0.01)')
+    parser.add_argument('--seed', type=int, default=0, help='Generator seed (default: 0)')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR,
+                        help=f'Directory for generated workbooks (default: {DEFAULT_WORK_DIR})')
+    parser.add_argument('--output', help='Results JSON (default: <work-dir>/benchmark-results.json)')
+    parser.add_argument('--compare', metavar='BASELINE_JSON', help='Earlier results file to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Slowdown ratio reported as a regression (default: 0.1)')
+    parser.add_argument('--startup', action='store_true', help='Time om-import.py start-up instead of the targets')
+    parser.add_argument('--startup-limit', type=float, default=DEFAULT_STARTUP_LIMIT_MS,
+                        help=f'Slowest acceptable start-up in ms (default: {DEFAULT_STARTUP_LIMIT_MS})')
+    parser.add_argument('--diff-engines', nargs='*', metavar='WORKBOOK',
+                        help='Check the fast reader engine against openpyxl on these workbooks '
+                             '(default: the synthetic workbooks of --rows)')
+    args = parser.parse_args()
+
+    targets = [t.strip() for t in args.targets.split(',') if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        print(f"[ERROR] Unknown targets: {', '.join(unknown)} (choose from {', '.join(TARGETS)})")
+        sys.exit(1)
+
+    try:
+        if args.startup:
+            print(f"[INFO] Start-up of om-import.py, {args.repeat or DEFAULT_STARTUP_REPEAT} runs each")
+            results = run_startup(repeat=args.repeat or DEFAULT_STARTUP_REPEAT, limit_ms=args.startup_limit,
+                                  work_dir=args.work_dir)
+        elif args.diff_engines is not None:
+            paths = args.diff_engines
+            if not paths:
+                os.makedirs(args.work_dir, exist_ok=True)
+                specs = [SyntheticSpec(rows=rows, duplicate_rate=args.duplicate_rate,
+                                       invalid_rate=args.invalid_rate, seed=args.seed)
+                         for rows in parse_rows(args.rows)]
+                paths = [prepare_inputs(spec, args.work_dir)[0] for spec in specs]
+            print(f"[INFO] Reader engines: fast vs openpyxl on {len(paths)} workbooks")
+            results = run_engine_diff(paths, work_dir=args.work_dir)
+        else:
+            results = run_benchmarks(parse_rows(args.rows), targets, repeat=args.repeat or 3,
+                                     duplicate_rate=args.duplicate_rate, invalid_rate=args.invalid_rate,
+                                     seed=args.seed, work_dir=args.work_dir)
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        sys.exit(1)
+
+    output_path = args.output or os.path.join(args.work_dir, 'benchmark-results.json')
+    regressions = compare(results['results'], args.compare, args.threshold) if args.compare else []
+    results['regressions'] = regressions
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n[OK] Results written to: {output_path}")
+
+    failed_checks = [r for r in results['results'] if r['check'] and not r['check']['ok']]
+    if failed_checks or regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,12 +5,84 @@ FEAT-008: Excel to JSON Converter for OM Expense Data Import
 This script converts Excel data to the JSON format required by the importData API.
 
 Usage:
-    python scripts/convert-excel-to-import-json.py <excel_file> [output_file]
+    python scripts/convert-excel-to-import-json.py <excel_file> [output_file] [--stream]
+        [--engine openpyxl|fast]
+        [--format pretty|json|ndjson] [--gzip]
+        [--chunk-dir DIR] [--chunk-items N] [--chunk-monthly-records N]
+        [--jobs N] [--cache | --cache-dir DIR] [--budget-report]
+        [--analysis REPORT_JSON [--analysis-exact]]
+        [--profile [--profile-memory] [--profile-dump FILE.prof]]
+        [--dedupe-normalized] [--near-duplicates REPORT_JSON [--near-threshold 0.8]]
+        [--validation-report REPORT_JSON]
+        [--currency check|fill [--currency-rates FILE ...] [--currency-tolerance 0.01]]
+        [--bulk-dir DIR --financial-year YYYY [--bulk-mode skip|replace]]
 
 Arguments:
-    excel_file   - Path to the Excel file (.xlsx)
+    excel_file   - Path to the Excel file (.xlsx, or a .csv / .tsv export of the
+                   sheet), or a directory / quoted glob
+                   (e.g. 'docs/For Data Import/*.xlsx') to convert many workbooks
+                   in parallel into one combined, deduplicated output
     output_file  - (Optional) Path to output JSON file (default: import-data.json)
 
+Options:
+    --stream     - Constant-memory mode for very large workbooks: reads the sheet
+                   with openpyxl read-only iteration and writes each item as soon
+                   as it passes validation and dedupe (see om_import/pipeline.py)
+    --engine     - Sheet reader: openpyxl (default) or fast, which parses the xlsx
+                   XML directly into plain values - the same rows, read about
+                   three times faster (see om_import/readers.py)
+    --format     - pretty (indent=2, default), json (compact array) or ndjson
+    --gzip       - Gzip-compress the output (implied by a .gz output_file)
+    --chunk-dir  - Write transaction-sized chunk files plus manifest.json into DIR
+                   instead of one output file. Chunks never split a header group
+                   and respect --chunk-items / --chunk-monthly-records
+                   (default 500 items / 6000 monthly records, see om_import/chunking.py)
+    --bulk-dir   - Write PostgreSQL COPY-ready CSV files for the OpCo, category,
+                   header, item and monthly tables (pre-generated IDs and foreign
+                   keys) plus load.sql / load.sh into DIR instead of one output
+                   file, for full-year loads without importData (needs
+                   --financial-year; --bulk-mode replace first deletes the year,
+                   see om_import/bulkload.py)
+    --jobs       - Worker processes for directory / glob input (default: CPU count)
+    --cache      - Keep normalized rows in .om-import-cache/ keyed by workbook and
+                   sheet content hashes. Unchanged sheets skip openpyxl entirely;
+                   changed sheets report added / changed / removed keys
+                   (--cache-dir DIR for another location, see om_import/cache.py)
+    --budget-report - Read columns G/H/I/N into a columnar table (om_import/table.py)
+                   and report per-currency totals, empty cells, negative budgets
+                   and the largest header / OpCo totals
+    --analysis   - Also write the analyze-import-data.py report (om_import/profiler.py)
+                   from the same single read of the workbook, so the import JSON and
+                   the analysis describe exactly the same rows
+                   (single workbook only; --analysis-exact for exact counts)
+    --profile    - Record wall / CPU time and rows per second per pipeline stage
+                   (read, normalize, validate, dedupe, write), peak memory, the
+                   slowest rows and the per-column conversion cost; printed and
+                   written to <output_file>.metrics.json (see om_import/metrics.py)
+    --profile-memory - Also trace Python allocations (tracemalloc) for the peak heap
+                   and each stage's allocated bytes; several times slower
+    --dedupe-normalized - Dedupe on normalized keys (case, whitespace and Unicode
+                   width ignored), so "RHK " and "rhk" count as the same OpCo
+    --near-duplicates - Write candidate near-duplicate clusters of the output items
+                   (normalized-key collisions plus a fuzzy 3-gram pass over
+                   header / item names, see om_import/neardup.py) to REPORT_JSON;
+                   --near-threshold sets the minimum similarity (default 0.8)
+    --validation-report - Write every rule violation of importOMExpenseItemSchema
+                   (counts per rule, sampled cells such as 'OM Expense'!J42,
+                   see om_import/validation.py) to REPORT_JSON
+    --currency   - Cross-check Budget (USD) against HKD / MOP converted at the
+                   exchange rates (check), and also fill a blank USD cell from
+                   them (fill), so such rows no longer import budgetAmount 0
+                   (see om_import/currency.py); --currency-rates FILE adds or
+                   overrides rates (a {"HKD": 7.8} map or a currency.getAll
+                   export, repeatable), --currency-tolerance sets the allowed
+                   relative difference (default 0.01). Not with --cache
+    --profile-dump - Also run the conversion under cProfile and write the stats
+                   to FILE.prof (open with `python -m pstats FILE.prof` or snakeviz)
+
+Output is written incrementally to a temp file and atomically renamed into
+place, so a failed run never leaves a half-written output file.
+
 Expected Excel format (columns):
     A (0): Row number
     B (1): Header Name
@@ -27,6 +99,17 @@ Expected Excel format (columns):
     M (12): End Date
     N (13): Last FY Actual Expense (if available)
 
+The columns are located by their titles in row 1, not by position: the header
+row is matched against the layout profiles in om_import/layouts.py (v2 with,
+v1 without Last FY Actual Expense; moved or extra columns are fine), and a
+workbook whose header matches none is rejected before any row is converted.
+
+End dates (column M) are parsed per column (om_import/dates.py): the day/month
+order of d/m/Y vs m/d/Y values is inferred once from a sample and reported when
+ambiguous, Excel serial numbers and month-year values ("Jul-26") are converted,
+and sentinels such as "n/a" / "TBC" become null. "on-going" also becomes a null
+endDate, with "isOngoing": true (the key is left out for every other item).
+
 Output JSON format:
 [
   {
@@ -46,161 +129,194 @@ Author: IT Department
 Since: FEAT-008 - OM Expense Data Import
 """
 
-import openpyxl
+import argparse
 import json
 import sys
 import os
-from datetime import datetime
-
-def format_date(value):
-    """Convert date value to YYYY-MM-DD format string."""
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        return value.strftime('%Y-%m-%d')
-    if isinstance(value, str):
-        # Try to parse common date formats
-        for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y']:
-            try:
-                return datetime.strptime(value.strip(), fmt).strftime('%Y-%m-%d')
-            except ValueError:
-                continue
-        return value.strip() if value.strip() else None
-    return str(value)
-
-def safe_float(value, default=0):
-    """Convert value to float safely."""
-    if value is None:
-        return default
-    try:
-        return float(value)
-    except (ValueError, TypeError):
-        return default
 
-def safe_string(value):
-    """Convert value to string safely, handling None."""
-    if value is None or str(value).strip() == '':
-        return None
-    return str(value).strip()
-
-def convert_excel_to_import_json(excel_path, output_path='import-data.json'):
+# Only what the argument parser needs is imported here; the pipeline modules
+# are imported by convert_excel_to_import_json, so --help (and `om-import.py`)
+# start without loading them
+from om_import.bulkload import BULK_MODES
+from om_import.cache import DEFAULT_CACHE_DIR
+from om_import.chunking import DEFAULT_MAX_ITEMS, DEFAULT_MAX_MONTHLY_RECORDS
+from om_import.currency import CURRENCY_MODES, DEFAULT_TOLERANCE
+from om_import.neardup import DEFAULT_THRESHOLD
+from om_import.readers import DEFAULT_ENGINE, READER_ENGINES
+from om_import.normalize import format_date, safe_float, safe_string  # noqa: F401 (re-exported)
+from om_import.writers import OUTPUT_FORMATS
+
+
+def convert_excel_to_import_json(excel_path, output_path='import-data.json', streaming=False,
+                                 output_format='pretty', compress=None, chunk_dir=None,
+                                 max_chunk_items=DEFAULT_MAX_ITEMS,
+                                 max_chunk_monthly_records=DEFAULT_MAX_MONTHLY_RECORDS, jobs=None,
+                                 cache_dir=None, budget_report=False, analysis_path=None,
+                                 analysis_exact=False, profile=False, profile_memory=False,
+                                 profile_dump=None, dedupe_normalized=False, near_duplicates_path=None,
+                                 near_threshold=DEFAULT_THRESHOLD, validation_path=None, bulk_dir=None,
+                                 financial_year=None, bulk_mode='skip', currency_mode=None,
+                                 currency_rates=(), currency_tolerance=DEFAULT_TOLERANCE, engine=None):
     """
     Convert Excel file to importData JSON format.
 
     Args:
-        excel_path: Path to the Excel file
+        excel_path: Path to the Excel file, or a directory / glob pattern of
+            workbooks to convert in parallel into one combined output
         output_path: Path to output JSON file
+        streaming: Use read-only worksheet iteration so memory stays bounded
+            by the dedupe key set
+        output_format: 'pretty' (indent=2), 'json' (compact array) or 'ndjson'
+        compress: gzip the output (default: only when output_path ends in .gz)
+        chunk_dir: If set, write transaction-sized chunk files and a
+            manifest.json into this directory instead of one output file
+        max_chunk_items: Maximum items per chunk
+        max_chunk_monthly_records: Maximum estimated monthly records per chunk
+        jobs: Worker processes for directory / glob input (default: CPU count)
+        cache_dir: If set, reuse normalized rows of unchanged sheets from this
+            parsed-workbook cache and report row-level deltas for changed ones
+        budget_report: Also read the budget columns (USD/HKD/MOP, last-FY actual)
+            into a columnar ImportTable and report totals, nulls and
+            negative budgets as stats['budget']
+        analysis_path: If set, also write the analyze-import-data.py report to
+            this path, profiled from the same single read of the workbook
+        analysis_exact: Exact counts and full lists in the analysis report
+        profile: Record per-stage metrics (see om_import/metrics.py), returned
+            as stats['metrics'] and written next to the output as
+            <output_path>.metrics.json (<chunk_dir>/metrics.json for chunks)
+        profile_memory: With profile, also trace allocations per stage
+        profile_dump: If set, run the conversion under cProfile and write the
+            profile to this path
+        dedupe_normalized: Dedupe on case / whitespace-normalized keys
+        near_duplicates_path: If set, write near-duplicate clusters of the
+            output items to this path (summary in stats['near_duplicates'])
+        near_threshold: Minimum similarity for fuzzy near-duplicates
+        validation_path: If set, write the schema validation report to this
+            path (always returned as stats['validation'])
+        bulk_dir: If set, write COPY-ready CSV files and a psql loader into
+            this directory instead of one output file (see om_import/bulkload.py)
+        financial_year: financialYear of the bulk-loaded headers
+        bulk_mode: 'skip' (keep existing items) or 'replace' (delete the year first)
+        currency_mode: 'check' or 'fill' to run the currency stage on the
+            USD / HKD / MOP columns (report in stats['currency'])
+        currency_rates: Rate files overlaid on the default HKD / MOP rates
+        currency_tolerance: Allowed relative difference between the columns
+        engine: Sheet reader, 'openpyxl' (default) or 'fast' (see om_import/readers.py)
 
     Returns:
         dict with conversion statistics
     """
-    print(f"[INFO] Loading Excel file: {excel_path}")
-
-    # Load workbook
-    wb = openpyxl.load_workbook(excel_path, data_only=True)
-    ws = wb.active
-
-    # Read all data
-    items = []
-    skipped = 0
-    errors = []
-
-    # Track unique values for validation
-    headers_set = set()
-    opcos_set = set()
-    categories_set = set()
-
-    print("[INFO] Processing rows...")
-
-    for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), 2):
-        # Skip completely empty rows
-        if all(cell is None or cell == '' for cell in row):
-            skipped += 1
-            continue
-
-        # Extract values (adjust column indices based on actual Excel structure)
-        header_name = safe_string(row[1])    # Column B
-        header_desc = safe_string(row[2])    # Column C
-        item_name = safe_string(row[3])      # Column D
-        item_desc = safe_string(row[4])      # Column E
-        category = safe_string(row[5])       # Column F
-        budget_usd = safe_float(row[6], 0)   # Column G
-        opco_name = safe_string(row[9])      # Column J
-        end_date = format_date(row[12])      # Column M
-
-        # Get lastFYActualExpense if column N exists
-        last_fy_actual = None
-        if len(row) > 13:
-            last_fy_actual = safe_float(row[13], None) if row[13] is not None else None
-
-        # Validate required fields
-        if not header_name:
-            errors.append(f"Row {row_idx}: Missing header name")
-            skipped += 1
-            continue
-        if not item_name:
-            errors.append(f"Row {row_idx}: Missing item name")
-            skipped += 1
-            continue
-        if not category:
-            errors.append(f"Row {row_idx}: Missing category")
-            skipped += 1
-            continue
-        if not opco_name:
-            errors.append(f"Row {row_idx}: Missing OpCo name")
-            skipped += 1
-            continue
-
-        # Track unique values
-        headers_set.add(header_name)
-        opcos_set.add(opco_name)
-        categories_set.add(category)
-
-        # Create item object
-        item = {
-            "headerName": header_name,
-            "headerDescription": header_desc,
-            "category": category,
-            "itemName": item_name,
-            "itemDescription": item_desc,
-            "budgetAmount": budget_usd,
-            "opCoName": opco_name,
-            "endDate": end_date,
-            "lastFYActualExpense": last_fy_actual
-        }
+    from om_import.bulkload import write_bulk_load
+    from om_import.chunking import write_chunks
+    from om_import.currency import CurrencyNormalizer, load_rate_table
+    from om_import.metrics import PipelineMetrics
+    from om_import.neardup import NearDuplicateFinder, normalized_key
+    from om_import.parallel import expand_inputs, is_multi_input, iter_parallel_items
+    from om_import.pipeline import ConversionState, iter_import_items
+    from om_import.profiler import ImportProfiler
+    from om_import.table import ImportTable, budget_summary
+    from om_import.writers import ImportWriter
+
+    if bulk_dir and chunk_dir:
+        raise ValueError("--bulk-dir and --chunk-dir are alternative outputs; choose one")
+    if bulk_dir and not (financial_year and 2000 <= financial_year <= 2100):
+        raise ValueError("--bulk-dir needs --financial-year (2000-2100)")
+    if currency_mode and cache_dir:
+        raise ValueError("--currency reads the raw HKD / MOP columns; it cannot be combined with --cache")
 
-        items.append(item)
+    print(f"[INFO] Loading Excel file: {excel_path}")
 
-    # Check for duplicates (header + item + opco)
-    seen = set()
-    duplicates = []
-    unique_items = []
+    state = ConversionState()
+    table = ImportTable() if budget_report else None
+    profiler = ImportProfiler(exact=analysis_exact) if analysis_path else None
+    metrics = PipelineMetrics(trace_memory=profile_memory) if profile or profile_memory else None
+    cprofile = None
+    if profile_dump:
+        import cProfile
+        cprofile = cProfile.Profile()
+    finder = NearDuplicateFinder(threshold=near_threshold) if near_duplicates_path else None
+    dedupe_key = normalized_key if dedupe_normalized else None
+    currency = None
+    if currency_mode:
+        currency = CurrencyNormalizer(load_rate_table(currency_rates), mode=currency_mode,
+                                      tolerance=currency_tolerance)
+    if metrics is not None:
+        metrics.start()
+    if cprofile is not None:
+        cprofile.enable()
+
+    workbook_reports = None
+    if is_multi_input(excel_path):
+        if profiler is not None:
+            raise ValueError("--analysis needs a single workbook, not a directory or glob")
+        workbooks = expand_inputs(excel_path)
+        if not workbooks:
+            raise FileNotFoundError(f"No workbooks found: {excel_path}")
+        workers = max(1, min(jobs or os.cpu_count() or 1, len(workbooks)))
+        print(f"[INFO] Converting {len(workbooks)} workbooks with {workers} workers")
+        workbook_reports = []
+        items = iter_parallel_items(workbooks, state, jobs=workers, reports=workbook_reports,
+                                    cache_dir=cache_dir, table=table, metrics=metrics,
+                                    dedupe_key=dedupe_key, currency=currency, engine=engine)
+    else:
+        items = iter_import_items(excel_path, state, read_only=streaming, cache_dir=cache_dir,
+                                  table=table, profiler=profiler, metrics=metrics,
+                                  dedupe_key=dedupe_key, currency=currency, engine=engine)
+    if finder is not None:
+        items = finder.collect(items)
+        if metrics is not None:
+            items = metrics.stage('neardup', items)
+    if metrics is not None:
+        items = metrics.sink('write', items)
+
+    print("[INFO] Streaming rows..." if streaming else "[INFO] Processing rows...")
+
+    manifest = None
+    bulk = None
+    if bulk_dir:
+        print(f"[INFO] Writing bulk-load files to: {bulk_dir}")
+        bulk = write_bulk_load(items, bulk_dir, financial_year, mode=bulk_mode,
+                               source=os.path.basename(excel_path))
+    elif chunk_dir:
+        print(f"[INFO] Writing chunks to: {chunk_dir}")
+        base_name = os.path.basename(output_path).split('.')[0] or 'import-data'
+        manifest = write_chunks(
+            items, chunk_dir, base_name=base_name, fmt=output_format, compress=bool(compress),
+            max_items=max_chunk_items, max_monthly_records=max_chunk_monthly_records,
+            source=os.path.basename(excel_path)
+        )
+    else:
+        print(f"[INFO] Writing to: {output_path}")
+
+        # Items are written as they leave the pipeline; the file only appears
+        # under output_path once everything has been written successfully
+        with ImportWriter(output_path, fmt=output_format, compress=compress) as writer:
+            writer.write_all(items)
+
+    if cprofile is not None:
+        cprofile.disable()
+        cprofile.dump_stats(profile_dump)
+    if metrics is not None:
+        metrics.finish()
+
+    errors = state.errors
+    duplicates = state.duplicate_samples
 
-    for item in items:
-        key = (item['headerName'], item['itemName'], item['opCoName'])
-        if key in seen:
-            duplicates.append(key)
-        else:
-            seen.add(key)
-            unique_items.append(item)
+    # Print statistics
+    stats = state.to_stats()
 
-    # Write output
-    print(f"[INFO] Writing to: {output_path}")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(unique_items, f, ensure_ascii=False, indent=2)
+    if workbook_reports is not None:
+        stats['workbooks'] = workbook_reports
 
-    # Print statistics
-    stats = {
-        'total_processed': len(items) + skipped,
-        'valid_items': len(items),
-        'unique_items': len(unique_items),
-        'duplicates_removed': len(duplicates),
-        'skipped_rows': skipped,
-        'unique_headers': len(headers_set),
-        'unique_opcos': len(opcos_set),
-        'unique_categories': len(categories_set),
-        'errors': len(errors)
-    }
+        print("\n" + "="*50)
+        print("[STATS] Workbooks")
+        print("="*50)
+        for report in workbook_reports:
+            status = 'FAILED' if report['failed'] else f"{report['valid_items']} valid"
+            cache = f", cache {report['cache']}" if report['cache'] else ''
+            layout = f", {report['layout']}" if report['layout'] else ''
+            print(f"  {report['file']}: {status}, {report['skipped_rows']} skipped, "
+                  f"{report['errors']} errors ({report['seconds']}s{cache}{layout})")
 
     print("\n" + "="*50)
     print("[STATS] Conversion Statistics")
@@ -215,42 +331,303 @@ def convert_excel_to_import_json(excel_path, output_path='import-data.json'):
     print(f"  Unique categories: {stats['unique_categories']}")
 
     if errors:
-        print(f"\n[WARN] {len(errors)} errors found:")
+        print(f"\n[WARN] {stats['errors']} errors found:")
         for err in errors[:10]:  # Show first 10 errors
             print(f"    - {err}")
-        if len(errors) > 10:
-            print(f"    ... and {len(errors) - 10} more")
+        if stats['errors'] > 10:
+            print(f"    ... and {stats['errors'] - 10} more")
+
+    validation = stats['validation'] = state.validation.to_dict()
+    if validation['rules']:
+        print("\n" + "="*50)
+        print("[STATS] Schema Validation (importOMExpenseItemSchema)")
+        print("="*50)
+        print(f"  {validation['rejected']} of {validation['rows']} rows rejected, "
+              f"{validation['violations']} violations")
+        for rule in validation['rules']:
+            cells = ', '.join(sample['cell'] for sample in rule['samples'][:3])
+            more = ', ...' if rule['count'] > 3 else ''
+            print(f"  {rule['rule']:<32} {rule['count']:>7,}  {rule['error']} ({cells}{more})")
+    if validation_path:
+        tmp_path = validation_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(validation, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, validation_path)
+        print(f"\n[INFO] Validation report written to: {validation_path}")
+    if state.currency is not None:
+        report = stats['currency'] = {'mode': currency.mode, 'tolerance': currency.tolerance,
+                                      'rates': currency.rates.to_dict(), **state.currency.to_dict()}
+        print("\n" + "="*50)
+        print(f"[STATS] Currency ({currency.mode})")
+        print("="*50)
+        rates = currency.rates
+        print("  Rates per USD: " + ', '.join(f"{code} {rates.rates[code]:g} ({rates.sources[code]})"
+                                             for code in ('HKD', 'MOP')))
+        print(f"  Rows: {report['rows']:,}, cross-checked: {report['checked']:,}, "
+              f"USD blank: {report['usd_blank']:,}")
+        if currency.mode == 'fill':
+            print(f"  Filled from HKD: {report['filled']['HKD']:,}, from MOP: {report['filled']['MOP']:,}")
+        elif report['fillable']:
+            print(f"[WARN] {report['fillable']:,} rows have a blank USD budget but an HKD / MOP amount "
+                  f"(use --currency fill)")
+        if report['unfilled']:
+            print(f"  No amount in any currency: {report['unfilled']:,}")
+        if report['disagreements']:
+            print(f"[WARN] {report['disagreements']:,} rows where USD / HKD / MOP disagree "
+                  f"by more than {currency.tolerance:.1%}:")
+            for sample in report['samples'][:3]:
+                source = f"{sample['file']} " if sample.get('file') else ''
+                print(f"    - {source}row {sample['row']}: USD {sample['usd']}, HKD {sample['hkd']}, "
+                      f"MOP {sample['mop']} ({sample['difference_pct']}% apart)")
+    if not stats['unique_items']:
+        print("\n[WARN] No valid items: importData requires at least one item")
+
+    if state.layout:
+        layout = stats['layout'] = state.layout
+        moved = '' if layout['identity'] else ' (columns mapped by header: ' + ', '.join(
+            f"{key}={letter}" for key, letter in layout['columns'].items()) + ')'
+        print(f"\n[INFO] Layout: {layout['profile']}{moved}")
+        if layout['unmapped_headers']:
+            print(f"[WARN] Columns not in the import layout, ignored: {', '.join(layout['unmapped_headers'])}")
+
+    stats['dates'] = state.dates
+    for report in state.dates:
+        source = f"{report['file']} " if report.get('file') else ''
+        where = f"{source}column {report['column']} ({report['field']})"
+        if report['mixed']:
+            print(f"\n[WARN] {where} mixes day/month orders; all values read as {report['order']}")
+        elif report['ambiguous']:
+            print(f"\n[WARN] {where} is ambiguous (every sampled date fits d/m and m/d); "
+                  f"read as {report['order']}")
+        if report.get('ongoing'):
+            print(f"\n[INFO] {where}: {report['ongoing']} values mark ongoing items (isOngoing=true, endDate null)")
+        if report['unparsed']:
+            print(f"\n[WARN] {where}: {report['unparsed']} values are not dates, kept as text "
+                  f"(e.g. {', '.join(report['unparsed_samples'][:3])})")
+
+    if state.cache:
+        stats['cache'] = state.cache
+        cache = state.cache
+        print(f"\n[INFO] Cache {cache['status']} for sheet '{cache['sheet']}' ({cache['sheet_hash'][:12]})")
+        delta = cache['delta']
+        if delta:
+            print(f"[INFO] Changed since last run: {delta['added']} added, "
+                  f"{delta['changed']} changed, {delta['removed']} removed")
+            for kind in ('added', 'changed', 'removed'):
+                for key in delta['samples'][kind][:5]:
+                    print(f"    {kind:>7}: Header: {key[0]}, Item: {key[1]}, OpCo: {key[2]}")
+
+    if profiler is not None:
+        analysis = profiler.report()
+        analysis['conversion'] = {
+            'source': os.path.basename(excel_path),
+            'output': bulk_dir or chunk_dir or output_path,
+            'total_processed': stats['total_processed'],
+            'unique_items': stats['unique_items'],
+        }
+        tmp_path = analysis_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(analysis, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, analysis_path)
+        stats['analysis'] = analysis_path
+
+        # Both outputs come from the same row stream, so the row counts must agree
+        profiled = analysis['summary']['total_rows'] + analysis['profile']['empty_rows']
+        print(f"\n[INFO] Analysis written to: {analysis_path}")
+        if profiled != stats['total_processed']:
+            print(f"[WARN] Analysis saw {profiled} rows, conversion processed {stats['total_processed']}")
+
+    if finder is not None:
+        near = finder.report()
+        tmp_path = near_duplicates_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(near, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, near_duplicates_path)
+        stats['near_duplicates'] = {key: value for key, value in near.items() if key != 'clusters'}
+
+        print(f"\n[INFO] Near-duplicates written to: {near_duplicates_path}")
+        if near['normalized_clusters']:
+            print(f"[WARN] {near['normalized_clusters']} keys differ only in case / whitespace "
+                  f"(use --dedupe-normalized to merge them)")
+        if near['fuzzy_clusters']:
+            print(f"[WARN] {near['fuzzy_clusters']} groups of similar header / item names "
+                  f"(similarity >= {near['threshold']}, {near['numbers_only_clusters']} differ only in numbers):")
+            for cluster in [c for c in near['clusters'] if c['kind'] == 'fuzzy'][:5]:
+                names = ' ~ '.join(f"{m['header']} / {m['item']}" for m in cluster['members'][:3])
+                shared = f", shared OpCos: {', '.join(cluster['shared_opcos'][:5])}" if cluster['shared_opcos'] else ''
+                print(f"    - [{cluster['score']:.2f}] {names}{shared}")
+
+    if table is not None:
+        budget = stats['budget'] = budget_summary(table)
+        print("\n" + "="*50)
+        print("[STATS] Budget Summary")
+        print("="*50)
+        for name, column in budget['numeric'].items():
+            if column['count']:
+                print(f"  {name}: sum {column['sum']:,.2f}, min {column['min']:,.2f}, "
+                      f"max {column['max']:,.2f}, {column['nulls']} empty")
+            else:
+                print(f"  {name}: all {column['nulls']} empty")
+        for entry in budget['top_headers'][:5]:
+            print(f"  Header {entry['name']}: US${entry['budgetUsd']:,.2f} ({entry['rows']} rows)")
+        for entry in budget['top_opcos'][:5]:
+            print(f"  OpCo {entry['name']}: US${entry['budgetUsd']:,.2f} ({entry['rows']} rows)")
+        negative = budget['negative_budget_rows']
+        if negative:
+            print(f"\n[WARN] {len(negative)} rows have a negative USD budget "
+                  f"(rejected by importData): rows {', '.join(map(str, negative[:10]))}")
 
     if duplicates:
-        print(f"\n[WARN] {len(duplicates)} duplicate items removed:")
+        print(f"\n[WARN] {stats['duplicates_removed']} duplicate items removed:")
         for dup in duplicates[:5]:  # Show first 5 duplicates
             print(f"    - Header: {dup[0]}, Item: {dup[1]}, OpCo: {dup[2]}")
-        if len(duplicates) > 5:
-            print(f"    ... and {len(duplicates) - 5} more")
+        if stats['duplicates_removed'] > 5:
+            print(f"    ... and {stats['duplicates_removed'] - 5} more")
+
+    if metrics is not None:
+        report = stats['metrics'] = metrics.report()
+        output_dir = bulk_dir or chunk_dir
+        metrics_path = os.path.join(output_dir, 'metrics.json') if output_dir else output_path + '.metrics.json'
+        with open(metrics_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print("\n" + "="*50)
+        print("[STATS] Pipeline Profile")
+        print("="*50)
+        peak = report['peak_memory_bytes'] or report['peak_rss_bytes']
+        memory = f", peak {peak / 1048576:.1f} MiB" if peak else ''
+        print(f"  Total: {report['wall_seconds']:.3f}s wall, {report['cpu_seconds']:.3f}s CPU, "
+              f"{report['rows_per_second'] or 0:,} rows/s{memory}")
+        for stage in report['stages']:
+            allocated = stage['allocated_bytes']
+            allocated = f"  {allocated / 1048576:>+8.1f} MiB" if allocated is not None else ''
+            print(f"  {stage['name']:<10} {stage['wall_seconds']:>9.3f}s wall {stage['cpu_seconds']:>9.3f}s CPU "
+                  f"{(stage['share'] or 0):>6.1%}  {stage['rows_out']:>9,} rows out{allocated}")
+        for row in report['slowest_rows'][:5]:
+            print(f"  Slow row {row['row']} ({row['stage']}): {row['seconds'] * 1000:.2f} ms")
+        for column in report['columns'][:3]:
+            if column['median_ns'] is not None:
+                print(f"  Column {column['column']} ({column['field']}): {column['median_ns']:,} ns/cell (median)")
+        print(f"  Metrics: {metrics_path}")
+        if profile_dump:
+            stats['metrics']['cprofile'] = profile_dump
+            print(f"  cProfile: {profile_dump} (python -m pstats {profile_dump})")
+
+    if manifest:
+        print(f"\n[INFO] {manifest['totals']['chunks']} chunks written:")
+        for entry in manifest['chunks']:
+            flag = ' [WARN] oversized header group' if entry['oversized'] else ''
+            print(f"    - {entry['file']}: {entry['items']} items, "
+                  f"{entry['monthlyRecords']} monthly records, {entry['headers']} headers{flag}")
+
+    if bulk:
+        stats['bulk'] = bulk
+        totals = bulk['totals']
+        print(f"\n[INFO] Bulk-load files for FY{bulk['financialYear']} ({bulk['mode']} mode): "
+              f"{totals['opCos']} OpCos, {totals['categories']} categories, {totals['headers']} headers, "
+              f"{totals['items']} items, {totals['monthlyRecords']} monthly records")
+        print(f"[INFO] Load with: sh {os.path.join(bulk_dir, 'load.sh')} "
+              f"(or psql -f load.sql from {bulk_dir})")
 
     print("\n[OK] Conversion complete!")
-    print(f"   Output file: {output_path}")
+    if bulk:
+        print(f"   Manifest: {os.path.join(bulk_dir, 'manifest.json')}")
+    elif manifest:
+        print(f"   Manifest: {os.path.join(chunk_dir, 'manifest.json')}")
+    else:
+        print(f"   Output file: {output_path}")
 
     return stats
 
-def main():
+def main(argv=None, prog=None):
     """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python convert-excel-to-import-json.py <excel_file> [output_file]")
-        print("\nExample:")
-        print("  python scripts/convert-excel-to-import-json.py 'docs/OM Expense.xlsx'")
-        print("  python scripts/convert-excel-to-import-json.py 'docs/OM Expense.xlsx' 'import-data.json'")
-        sys.exit(1)
-
-    excel_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else 'import-data.json'
-
-    if not os.path.exists(excel_path):
-        print(f"[ERROR] File not found: {excel_path}")
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Convert an OM Expense Excel file to importData JSON.',
+        epilog="Example: python scripts/convert-excel-to-import-json.py 'docs/OM Expense.xlsx' 'import-data.json'"
+    )
+    parser.add_argument('excel_file',
+                        help='Path to the Excel file (.xlsx, .csv / .tsv), or a directory / glob of workbooks')
+    parser.add_argument('output_file', nargs='?', default='import-data.json',
+                        help='Path to output JSON file (default: import-data.json)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Constant-memory mode: read-only worksheet iteration')
+    parser.add_argument('--engine', choices=READER_ENGINES, default=DEFAULT_ENGINE,
+                        help=f'Sheet reader: openpyxl or fast (direct xlsx XML parse) (default: {DEFAULT_ENGINE})')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='pretty',
+                        help="Output format: pretty (indent=2, default), json (compact array) or ndjson")
+    parser.add_argument('--gzip', action='store_true', default=None,
+                        help='Gzip-compress the output (implied when output_file ends in .gz)')
+    parser.add_argument('--chunk-dir',
+                        help='Split output into transaction-sized chunk files plus manifest.json in this directory')
+    parser.add_argument('--chunk-items', type=int, default=DEFAULT_MAX_ITEMS,
+                        help=f'Maximum items per chunk (default: {DEFAULT_MAX_ITEMS})')
+    parser.add_argument('--chunk-monthly-records', type=int, default=DEFAULT_MAX_MONTHLY_RECORDS,
+                        help=f'Maximum monthly records per chunk (default: {DEFAULT_MAX_MONTHLY_RECORDS})')
+    parser.add_argument('--bulk-dir',
+                        help='Write PostgreSQL COPY CSV files plus load.sql / load.sh into this directory')
+    parser.add_argument('--financial-year', type=int,
+                        help='financialYear of the bulk-loaded headers (required with --bulk-dir)')
+    parser.add_argument('--bulk-mode', choices=BULK_MODES, default='skip',
+                        help="skip: keep existing items (default); replace: delete the financial year first")
+    parser.add_argument('--jobs', type=int,
+                        help='Worker processes for directory / glob input (default: CPU count)')
+    parser.add_argument('--cache', action='store_const', const=DEFAULT_CACHE_DIR, dest='cache_dir',
+                        help=f'Reuse normalized rows of unchanged sheets (cache in {DEFAULT_CACHE_DIR}/)')
+    parser.add_argument('--cache-dir', dest='cache_dir',
+                        help='Same as --cache, with a custom cache directory')
+    parser.add_argument('--budget-report', action='store_true',
+                        help='Report budget totals, empty cells and negative budgets per currency column')
+    parser.add_argument('--analysis', metavar='REPORT_JSON',
+                        help='Also write the analyze-import-data.py report, from the same read of the workbook')
+    parser.add_argument('--analysis-exact', action='store_true',
+                        help='Exact counts and full lists in the --analysis report')
+    parser.add_argument('--profile', action='store_true',
+                        help='Record per-stage time, CPU, rows/s and memory to <output_file>.metrics.json')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='With --profile, also trace allocations per stage (tracemalloc, slower)')
+    parser.add_argument('--dedupe-normalized', action='store_true',
+                        help='Dedupe on case / whitespace-normalized header, item and OpCo names')
+    parser.add_argument('--near-duplicates', metavar='REPORT_JSON',
+                        help='Write candidate near-duplicate item clusters to REPORT_JSON')
+    parser.add_argument('--near-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Minimum similarity for --near-duplicates (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--validation-report', metavar='REPORT_JSON',
+                        help='Write the importOMExpenseItemSchema violations with cell addresses to REPORT_JSON')
+    parser.add_argument('--currency', choices=CURRENCY_MODES, dest='currency_mode',
+                        help='Cross-check (check) or also fill (fill) Budget (USD) from the HKD / MOP columns')
+    parser.add_argument('--currency-rates', metavar='FILE', action='append', default=[],
+                        help='Exchange rate file (units per USD, or a currency.getAll export); repeatable')
+    parser.add_argument('--currency-tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed relative difference between the columns (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--profile-dump', metavar='FILE',
+                        help='Also write a cProfile dump of the conversion to FILE')
+    args = parser.parse_args(argv)
+
+    from om_import.parallel import is_multi_input
+
+    if not os.path.exists(args.excel_file) and not is_multi_input(args.excel_file):
+        print(f"[ERROR] File not found: {args.excel_file}")
         sys.exit(1)
 
     try:
-        convert_excel_to_import_json(excel_path, output_path)
+        convert_excel_to_import_json(args.excel_file, args.output_file, streaming=args.stream,
+                                     output_format=args.format, compress=args.gzip,
+                                     chunk_dir=args.chunk_dir, max_chunk_items=args.chunk_items,
+                                     max_chunk_monthly_records=args.chunk_monthly_records,
+                                     jobs=args.jobs, cache_dir=args.cache_dir,
+                                     budget_report=args.budget_report,
+                                     analysis_path=args.analysis, analysis_exact=args.analysis_exact,
+                                     profile=args.profile, profile_memory=args.profile_memory,
+                                     profile_dump=args.profile_dump,
+                                     dedupe_normalized=args.dedupe_normalized,
+                                     near_duplicates_path=args.near_duplicates,
+                                     near_threshold=args.near_threshold,
+                                     validation_path=args.validation_report,
+                                     bulk_dir=args.bulk_dir, financial_year=args.financial_year,
+                                     bulk_mode=args.bulk_mode, currency_mode=args.currency_mode,
+                                     currency_rates=args.currency_rates,
+                                     currency_tolerance=args.currency_tolerance, engine=args.engine)
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         sys.exit(1)
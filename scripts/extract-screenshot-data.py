@@ -1,220 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: IT Annual Maintenance Budget workbook extractor
+
+Extracts the header / sub-section / item / subtotal / notes structure of
+every category of an "IT Annual Maintenance Budget" workbook in one run
+(see om_import/annual_budget.py). This used to be a dict transcribed by hand
+from one screenshot ("A) Datalines"); the output keeps that JSON shape, one
+file per category.
+
+Usage:
+    python scripts/extract-screenshot-data.py <excel_file> [output_dir]
+        [--combined FILE] [--quiet]
+
+Arguments:
+    excel_file   - Path to the maintenance budget workbook (.xlsx)
+    output_dir   - (Optional) Directory for om-expense-<category>-extracted.json
+                   files (default: docs)
+
+Options:
+    --combined   - Also write all categories into one document, with the
+                   category set per header (the docs/om-expense-rhk-extracted.json
+                   form, read by om_import/extracted.py as well)
+    --quiet      - Print the totals only, not every header and item
+
+Author: IT Department
+Since: FEAT-008 - OM Expense Data Import
+"""
+
+import argparse
 import json
+import os
+import sys
+
+DEFAULT_OUTPUT_DIR = 'docs'
+
+
+def write_json(path, data):
+    """Write a JSON document atomically."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def print_summary(document):
+    """Print the headers and items of one category document."""
+    print("=" * 70)
+    print(f"EXTRACTION SUMMARY - {document['category']} (sheet {document['metadata']['sheet']})")
+    print("=" * 70)
+    for header in document['headers']:
+        print(f"  #{header['number']} {(header['name'] or '')[:55]}")
+
+        for item in header.get('items', []):
+            bud = f"US${item['budget_us']:,}" if item.get('budget_us') else "-"
+            end = item.get('end_date') or "-"
+            print(f"      [{item['item_number'] or '':4}] {item['name'][:42]} | {bud} | End: {end}")
 
-# Extracted data from screenshot analysis
-extracted_data = {
-    "metadata": {
-        "source": "om-expense-excel-screenshot-1.png",
-        "document_title": "IT Annual Maintenance Budget for FY26 - RHK & P&C (v1.1)",
-        "updated_on": "3-Nov-25",
-        "exchange_rate": "JPY1 = 0.060",
-        "financial_year": 2026
-    },
-    "category": "A) Datalines",
-    "headers": [
-        {
-            "number": 1,
-            "name": "R-WAN (Budget @US$65,712, charged by RCL quarterly)",
-            "notes": [
-                "**Item #1.1-1.3's cost to be evenly shared by 13 OpCos (excl. RA):",
-                "i.e. RAPO - 7.7%, RCN - 7.7%, Rest of OpCos** - 84.6%",
-                "(**RAPO, RHK, RMS, RSP, RPH, RTW, RCN, RTH, RVN, RAP, RNZ, RKR, RBS)",
-                "*Start chargeback RBS in Apr-25",
-                "*Start chargeback RIMV wef 1-Sep-25"
-            ],
-            "items": [
-                {
-                    "item_number": "1.1",
-                    "name": "TGT-DC (wef Sep-23) @US$2,724/mth",
-                    "charged_by": "RCL quarterly",
-                    "budget_us": 4694,
-                    "budget_hk": 36611,
-                    "increment_pct": -3.1,
-                    "charge_to": "RHK (IT pay 1st)",
-                    "actual_hk": 37784,
-                    "actual_us": 4844,
-                    "end_date": "on-going"
-                },
-                {
-                    "item_number": "1.2",
-                    "name": "RDC2 (8MB + 4MB@US$2,585/mth)",
-                    "charged_by": "RCL quarterly",
-                    "budget_us": None,
-                    "budget_hk": None,
-                    "increment_pct": None,
-                    "charge_to": None,
-                    "actual_hk": None,
-                    "actual_us": None,
-                    "end_date": None
-                },
-                {
-                    "item_number": "1.3",
-                    "name": "X-Connection x 2 (@HK$1,300/mth)",
-                    "charged_by": "DYXNet monthly",
-                    "budget_us": None,
-                    "budget_hk": None,
-                    "notes": [
-                        "2x External X-connect by DYXNet for NTT R-WAN Dataline (Ref: IT230903)",
-                        "Connect from DataCenter Rack to MMR Cable Room wef 28-Sep-23",
-                        "(24-mth contract signed in Sep-23 to Sep-25)",
-                        "(Apr-Aug/25: 13 OpCos)",
-                        "(Sep/25 onwards: 14 OpCos)"
-                    ]
-                }
-            ],
-            "subtotal": {
-                "budget_us": 4694,
-                "budget_hk": 36611,
-                "increment_pct": -3.1,
-                "actual_hk": 37784,
-                "actual_us": 4844
-            }
-        },
-        {
-            "number": 2,
-            "name": "SD-WAN (HK & AP)",
-            "items": [
-                {
-                    "item_number": "2.1",
-                    "name": "HK SD-WAN (HKT) (Budget @HK$115,920)",
-                    "budget_us": 6723,
-                    "budget_hk": 52440,
-                    "increment_pct": 0.0,
-                    "charge_to": "RHK",
-                    "actual_hk": 52440,
-                    "actual_us": 6723,
-                    "end_date": "Jul-26",
-                    "notes": [
-                        "Renewed 2-yr contract until Jul-2026",
-                        "**Mthly cost: RDC1- HK$2,070, RDC2-HK$2,070, ASPC-HK$1,150",
-                        "RHK - Pts Ctr ($1,150), Fotan ($1,150), MTL L.Ctr ($2,070)"
-                    ]
-                }
-            ],
-            "subtotal": {
-                "budget_us": 6723,
-                "budget_hk": 52440,
-                "increment_pct": 0.0,
-                "actual_hk": 52440,
-                "actual_us": 6723
-            }
-        },
-        {
-            "number": 4,
-            "name": "Internet Lines",
-            "ref": "15-5",
-            "sub_sections": [
-                {
-                    "name": "4.1 HGC",
-                    "items": [
-                        {
-                            "item_number": "ii)",
-                            "name": "1x 500M Broadband for RHK Demo (HK$480/mth)",
-                            "budget_us": 738,
-                            "budget_hk": 5760,
-                            "increment_pct": 0.0,
-                            "charge_to": "RHK",
-                            "actual_hk": 5760,
-                            "actual_us": 738,
-                            "end_date": "4/13/2025",
-                            "notes": [
-                                "*renewed 2-yr in Apr-23",
-                                "(cost to be borne by RHK wef Jun-2025 as it's 100% for demo purpose)"
-                            ]
-                        },
-                        {
-                            "item_number": "iii)",
-                            "name": "1x 500M Broadband for Live Demo, Guest Wifi,...(HK$3,050/mth)",
-                            "budget_us": 4692,
-                            "budget_hk": 36600,
-                            "increment_pct": 0.0,
-                            "charge_to": "RHK",
-                            "actual_hk": 36600,
-                            "actual_us": 4692,
-                            "end_date": "4/17/2025",
-                            "notes": ["*Renewed 2-yr contract in Apr-23"]
-                        }
-                    ]
-                }
-            ],
-            "subtotal": {
-                "budget_us": 5431,
-                "budget_hk": 42360,
-                "increment_pct": 0.0,
-                "actual_hk": 42360,
-                "actual_us": 5431
-            }
-        },
-        {
-            "number": 5,
-            "name": "Telephone Lines",
-            "ref": "15-3",
-            "items": [
-                {
-                    "item_number": "5.2",
-                    "name": "9 lines (8 for Rightfax & 1 for CMI)",
-                    "budget_us": 3084,
-                    "budget_hk": 24053,
-                    "increment_pct": 0.0,
-                    "charge_to": "RHK",
-                    "actual_hk": 24053,
-                    "actual_us": 3084,
-                    "end_date": "on-going",
-                    "notes": [
-                        "*Being follow-up by RHK",
-                        "*reduced from 3 to 2 lines wef 7/5/25"
-                    ]
-                }
-            ],
-            "subtotal": {
-                "budget_us": 3084,
-                "budget_hk": 24053,
-                "increment_pct": 0.0,
-                "actual_hk": 24053,
-                "actual_us": 3084
-            }
-        }
-    ]
-}
-
-# Save to file
-output_path = "C:/Users/rci.ChrisLai/Documents/GitHub/ai-it-project-process-management-webapp/docs/om-expense-screenshot-extracted.json"
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(extracted_data, f, ensure_ascii=False, indent=2)
-
-print("Data extracted and saved!")
-print(f"Output: {output_path}")
-print()
-print("=" * 70)
-print("EXTRACTION SUMMARY - Screenshot 1 (A) Datalines)")
-print("=" * 70)
-print(f"Category: {extracted_data['category']}")
-print(f"Headers extracted: {len(extracted_data['headers'])}")
-print()
-
-total_items = 0
-for header in extracted_data["headers"]:
-    print(f"  #{header['number']} {header['name'][:55]}")
-
-    # Count and show items
-    items = header.get("items", [])
-    for item in items:
-        total_items += 1
-        bud = f"US${item['budget_us']:,}" if item.get("budget_us") else "-"
-        end = item.get("end_date", "-") or "-"
-        print(f"      [{item['item_number']:4}] {item['name'][:42]} | {bud} | End: {end}")
-
-    # Sub-sections
-    for sub in header.get("sub_sections", []):
-        print(f"      Sub: {sub['name']}")
-        for item in sub.get("items", []):
-            total_items += 1
-            bud = f"US${item['budget_us']:,}" if item.get("budget_us") else "-"
-            end = item.get("end_date", "-") or "-"
-            print(f"        [{item['item_number']:4}] {item['name'][:38]} | {bud} | End: {end}")
-
-    st = header.get("subtotal", {})
-    if st:
-        print(f"      --- Subtotal: US${st.get('budget_us',0):,} / HK${st.get('budget_hk',0):,}")
+        for sub in header.get('sub_sections', []):
+            print(f"      Sub: {sub['name']}")
+            for item in sub.get('items', []):
+                bud = f"US${item['budget_us']:,}" if item.get('budget_us') else "-"
+                end = item.get('end_date') or "-"
+                print(f"        [{item['item_number'] or '':4}] {item['name'][:38]} | {bud} | End: {end}")
+
+        st = header.get('subtotal', {})
+        if st:
+            print(f"      --- Subtotal: US${st.get('budget_us') or 0:,} / HK${st.get('budget_hk') or 0:,}")
     print()
 
-print(f"Total Items extracted: {total_items}")
+
+def extract_budget_workbook(excel_path, output_dir=DEFAULT_OUTPUT_DIR, combined_path=None, quiet=False):
+    """
+    Extract every category of the workbook and write one JSON file per category.
+
+    Returns:
+        list of (category, output path, headers, items)
+    """
+    from om_import.annual_budget import category_slug, combined_document, count_items, extract_workbook
+
+    print(f"[INFO] Reading workbook: {excel_path}")
+    documents, skipped = extract_workbook(excel_path)
+    for sheet, reason in skipped:
+        print(f"[WARN] Skipped sheet '{sheet}': {reason}")
+    if not documents:
+        raise ValueError("No budget layout found: expected column titles such as 'Budget (US$)' "
+                         "above rows like 'A) Datalines' / '1) R-WAN'")
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for document in documents:
+        path = os.path.join(output_dir, f"om-expense-{category_slug(document['category'])}-extracted.json")
+        write_json(path, document)
+        written.append((document['category'], path, len(document['headers']), count_items(document)))
+        if not quiet:
+            print_summary(document)
+
+    if combined_path:
+        write_json(combined_path, combined_document(documents))
+
+    print("[STATS] Extraction Statistics:")
+    for category, path, headers, items in written:
+        print(f"   {category}: {headers} headers, {items} items -> {path}")
+    print(f"   Total: {len(written)} categories, {sum(w[2] for w in written)} headers, "
+          f"{sum(w[3] for w in written)} items")
+    if combined_path:
+        print(f"   Combined: {combined_path}")
+    print("\n[OK] Extraction complete!")
+    return written
+
+
+def main(argv=None, prog=None):
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Extract every category of an IT Annual Maintenance Budget workbook to JSON.',
+        epilog="Example: python scripts/extract-screenshot-data.py 'docs/IT Annual Maintenance Budget FY26.xlsx'"
+    )
+    parser.add_argument('excel_file', help='Path to the maintenance budget workbook (.xlsx)')
+    parser.add_argument('output_dir', nargs='?', default=DEFAULT_OUTPUT_DIR,
+                        help=f'Directory for the per-category JSON files (default: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--combined', metavar='FILE',
+                        help='Also write all categories into one JSON document')
+    parser.add_argument('--quiet', action='store_true', help='Print totals only')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.excel_file):
+        print(f"[ERROR] File not found: {args.excel_file}")
+        sys.exit(1)
+
+    try:
+        extract_budget_workbook(args.excel_file, args.output_dir, combined_path=args.combined, quiet=args.quiet)
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -2,138 +2,609 @@
 """
 自動修復重複 import 語句
 
-掃描並修復所有文件中重複的 import { useTranslations } from 'next-intl'
+掃描 apps/ 和 packages/ 下所有 TS/JS 文件, 合併同一模組的重複或重疊 import:
+
+    import { useTranslations } from 'next-intl';
+    import { useTranslations, useLocale } from 'next-intl';
+      -> import { useTranslations, useLocale } from 'next-intl';
+
+    import React from 'react';
+    import { useState } from 'react';
+      -> import React, { useState } from 'react';
+
+規則:
+    - 只處理文件開頭的 import 區塊 (import、空行、註解、'use client' 等指令),
+      遇到第一行其他程式碼即停止; 之後 template literal / 註解 / 程式碼中
+      看起來像 import 的文字不會被修改
+    - 同一模組、同一種類 (import / import type) 的具名 import 合併到第一個語句,
+      保留原本的引號、分號、單行/多行格式, 重複的 specifier 只保留一次
+    - `import type { A }` 與 `import { A }` 並存時, type 語句中的 A 移除
+    - namespace import (`* as ns`) 只移除完全相同的重複語句
+    - 無法安全合併的情況 (兩個不同的 default、同一個本地名稱對應不同的 export、
+      被移除的語句帶有行尾註解或大括號內有註解) 跳過並列為 [CONFLICT], 需手動處理
+
+效能:
+    - os.scandir 遞迴走訪 (跳過 node_modules / .next / dist 等目錄)
+    - 先用 bytes 層級的預篩選 (至少兩個 import, 且有重複的模組字串) 排除絕大多數文件,
+      只有候選文件才解碼和解析
+    - 文件在 thread pool 中處理, 寫入採用暫存檔 + os.replace (原子寫入)
+    - --incremental: 快取每個文件的大小、mtime、內容 hash 與上次的掃描結果
+      (.fix-imports-cache.json), 只重新掃描新增或變更的文件; size/mtime 變了但
+      hash 相同 (例如 touch / checkout) 時不重新解析。--since REF 另外強制重新掃描
+      `git diff --name-only REF` 列出的文件和未追蹤的新文件, 適合 pre-commit
 
 使用方法:
-python scripts/fix-duplicate-imports.py
+    python scripts/fix-duplicate-imports.py [path ...] [--dry-run] [--check]
+        [--jobs N] [--ext .ts,.tsx,...] [--verbose]
+        [--incremental [--cache-file FILE]] [--since REF]
+
+參數:
+    path         - 要掃描的目錄或文件 (預設: apps packages)
+
+選項:
+    --dry-run    - 只顯示 unified diff, 不寫入文件
+    --check      - 不寫入; 有需要修復的文件時以狀態碼 1 結束 (適用於 CI)
+    --jobs       - 工作執行緒數 (預設: min(32, CPU 數 + 4))
+    --ext        - 要處理的副檔名 (預設: .ts,.tsx,.js,.jsx,.mjs,.cjs)
+    --verbose    - 同時列出沒有變更的候選文件
+    --incremental - 使用掃描快取, 只處理新增 / 變更的文件
+    --cache-file - 快取文件路徑 (預設: .fix-imports-cache.json)
+    --since      - 強制重新掃描相對於 git REF 有變更的文件 (隱含 --incremental)
 """
 
+import argparse
+import hashlib
+import json
 import os
+import re
 import sys
+import time
+
+DEFAULT_ROOTS = ('apps', 'packages')
+DEFAULT_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs')
+SKIP_DIRS = frozenset({
+    'node_modules', '.next', '.turbo', '.git', 'dist', 'build', 'out', 'coverage', '.vercel',
+})
+
+DEFAULT_CACHE_FILE = '.fix-imports-cache.json'
+# 合併規則變更時遞增, 讓舊的快取結果失效
+CACHE_VERSION = 2
+# mtime 在掃描開始前這段時間內的文件, 下次一律以 hash 確認 (同一個 mtime 刻度內的修改)
+RACY_WINDOW_NS = 2 * 10**9
+
+# 預篩選: 行首的 import, 以及 from 之後的模組字串 (bytes, 不解碼)
+_IMPORT_PREFIX = b'\nimport'
+_MODULE_BYTES = re.compile(rb'''\bfrom[ \t]*(['"])([^'"\r\n]+)\1''')
+
+# 行首的一個完整 import 語句 (可跨行), 可選的行尾註解
+_IMPORT = re.compile(
+    r'''^import[ \t]+(?P<type>type[ \t]+(?=[{*\w]))?'''
+    r'''(?P<clause>[^'";]*?)[ \t\r\n]*\bfrom[ \t]*(?P<quote>['"])(?P<module>[^'"\r\n]+)(?P=quote)'''
+    r'''(?P<semi>[ \t]*;)?(?P<comment>[ \t]*//[^\r\n]*)?[ \t]*(?P<eol>\r?\n|$)''',
+    re.M
+)
+# 文件開頭 import 區塊中除了 import 語句以外可出現的一行 (或一個區塊註解):
+# 空行、// 註解、/* */ 註解、指令 ('use client')、副作用 import、shebang、BOM
+_PREAMBLE = re.compile(
+    r'''\ufeff|[ \t]*(?:\r?\n'''
+    r'''|//[^\r\n]*(?:\r?\n|$)'''
+    r'''|/\*.*?\*/[ \t]*(?:\r?\n|$)'''
+    r'''|(['"])use [\w ]+\1[ \t]*;?[ \t]*(?:\r?\n|$)'''
+    r'''|import[ \t]*(['"])[^'"\r\n]+\2[ \t]*;?[ \t]*(?:\r?\n|$)'''
+    r'''|\#![^\r\n]*(?:\r?\n|$))''',
+    re.S
+)
+_NAMESPACE = re.compile(r'^(?:(?P<default>[\w$]+)[ \t]*,[ \t]*)?\*[ \t]*as[ \t]+(?P<ns>[\w$]+)$')
+_NAMED = re.compile(r'^(?:(?P<default>[\w$]+)[ \t\r\n]*,[ \t\r\n]*)?\{(?P<names>[^{}]*)\}$', re.S)
+_DEFAULT = re.compile(r'^[\w$]+$')
+
+
+class ImportStatement:
+    """一個解析後的 import 語句 (位置、模組、default / namespace / 具名 specifier)"""
+
+    def __init__(self, match):
+        self.start, self.end = match.start(), match.end()
+        self.text = match.group(0)
+        self.is_type = bool(match.group('type'))
+        self.module = match.group('module')
+        self.quote = match.group('quote')
+        self.semi = match.group('semi') or ''
+        self.comment = match.group('comment') or ''
+        self.eol = match.group('eol')
+        self.default = None
+        self.namespace = None
+        self.names = None       # 具名 specifier 文字 (例如 'type A', 'a as b'), 依出現順序
+        self.multiline = False
+        self.indent = '  '
+        self.padded = True      # '{ a }' 或 '{a}'
+        self.trailing_comma = False
+        self.mergeable = True
+
+        clause = match.group('clause').strip()
+        namespace = _NAMESPACE.match(clause)
+        named = _NAMED.match(clause)
+        if namespace:
+            self.default, self.namespace = namespace.group('default'), namespace.group('ns')
+        elif named:
+            self.default = named.group('default')
+            body = named.group('names')
+            if '//' in body or '/*' in body:
+                self.mergeable = False
+            self.multiline = '\n' in body
+            self.padded = body[:1].isspace() if body.strip() else True
+            parts = [part.strip() for part in body.split(',')]
+            self.trailing_comma = len(parts) > 1 and not parts[-1]
+            self.names = [' '.join(part.split()) for part in parts if part]
+            if self.multiline:
+                for line in body.splitlines():
+                    if line.strip():
+                        self.indent = line[:len(line) - len(line.lstrip())] or '  '
+                        break
+        elif _DEFAULT.match(clause):
+            self.default = clause
+        else:
+            self.mergeable = False
+
+
+def specifier_names(specifier):
+    """'type A as B' -> (imported 'A', local 'B', is_type)"""
+    is_type = specifier.startswith('type ')
+    if is_type:
+        specifier = specifier[5:].strip()
+    imported, _, local = specifier.partition(' as ')
+    return imported.strip(), (local or imported).strip(), is_type
+
+
+def merge_specifiers(statements):
+    """
+    合併多個語句的具名 specifier
+
+    Returns:
+        (specifiers, conflict): 依出現順序的 specifier 文字, 或衝突說明
+    """
+    by_local = {}
+    for statement in statements:
+        for specifier in statement.names:
+            imported, local, is_type = specifier_names(specifier)
+            known = by_local.get(local)
+            if known is None:
+                by_local[local] = (imported, is_type, specifier)
+            elif known[0] != imported:
+                return None, f"'{local}' 同時對應 '{known[0]}' 和 '{imported}'"
+            elif known[1] and not is_type:
+                # `A` 已涵蓋 `type A`
+                by_local[local] = (imported, False, specifier)
+    return [entry[2] for entry in by_local.values()], None
+
+
+def render(target, template, default, specifiers):
+    """
+    產生合併後的 import: 引號、分號、行尾註解沿用 target (被取代的語句),
+    大括號的格式 (單行/多行、縮排、尾逗號) 沿用 template
+    """
+    head = 'import type ' if target.is_type else 'import '
+    parts = [default] if default else []
+    if specifiers:
+        if template.multiline:
+            newline = target.eol or '\n'
+            body = f",{newline}".join(template.indent + specifier for specifier in specifiers)
+            parts.append('{' + newline + body + (',' if template.trailing_comma else '') + newline + '}')
+        else:
+            pad = ' ' if template.padded else ''
+            parts.append('{' + pad + ', '.join(specifiers) + pad + '}')
+    module = f"{target.quote}{target.module}{target.quote}"
+    return f"{head}{', '.join(parts)} from {module}{target.semi}{target.comment}{target.eol}"
+
+
+def import_block_end(text):
+    """
+    文件開頭 import 區塊的結束位置: 第一行不是 import / 空行 / 註解 / 指令的程式碼
+    之前。之後的 import 樣式文字可能在字串或註解中, 不處理
+    """
+    pos = 0
+    while pos < len(text):
+        match = _IMPORT.match(text, pos) or _PREAMBLE.match(text, pos)
+        if match is None or match.end() == pos:
+            break
+        pos = match.end()
+    return pos
 
-# 受影響的文件清單 (從 check-duplicate-imports.js 的輸出)
-AFFECTED_FILES = [
-    "apps/web/src/app/[locale]/budget-pools/new/page.tsx",
-    "apps/web/src/app/[locale]/budget-pools/[id]/edit/page.tsx",
-    "apps/web/src/app/[locale]/budget-pools/[id]/page.tsx",
-    "apps/web/src/app/[locale]/charge-outs/new/page.tsx",
-    "apps/web/src/app/[locale]/charge-outs/page.tsx",
-    "apps/web/src/app/[locale]/charge-outs/[id]/edit/page.tsx",
-    "apps/web/src/app/[locale]/charge-outs/[id]/page.tsx",
-    "apps/web/src/app/[locale]/expenses/new/page.tsx",
-    "apps/web/src/app/[locale]/expenses/page.tsx",
-    "apps/web/src/app/[locale]/expenses/[id]/edit/page.tsx",
-    "apps/web/src/app/[locale]/expenses/[id]/page.tsx",
-    "apps/web/src/app/[locale]/notifications/page.tsx",
-    "apps/web/src/app/[locale]/om-expenses/new/page.tsx",
-    "apps/web/src/app/[locale]/om-expenses/page.tsx",
-    "apps/web/src/app/[locale]/om-expenses/[id]/edit/page.tsx",
-    "apps/web/src/app/[locale]/om-expenses/[id]/page.tsx",
-    "apps/web/src/app/[locale]/projects/[id]/quotes/page.tsx",
-    "apps/web/src/app/[locale]/proposals/new/page.tsx",
-    "apps/web/src/app/[locale]/proposals/[id]/edit/page.tsx",
-    "apps/web/src/app/[locale]/proposals/[id]/page.tsx",
-    "apps/web/src/app/[locale]/purchase-orders/new/page.tsx",
-    "apps/web/src/app/[locale]/purchase-orders/page.tsx",
-    "apps/web/src/app/[locale]/purchase-orders/[id]/edit/page.tsx",
-    "apps/web/src/app/[locale]/purchase-orders/[id]/page.tsx",
-    "apps/web/src/app/[locale]/quotes/new/page.tsx",
-    "apps/web/src/app/[locale]/quotes/page.tsx",
-    "apps/web/src/app/[locale]/quotes/[id]/edit/page.tsx",
-    "apps/web/src/app/[locale]/settings/page.tsx",
-    "apps/web/src/app/[locale]/users/new/page.tsx",
-    "apps/web/src/app/[locale]/users/page.tsx",
-    "apps/web/src/app/[locale]/users/[id]/edit/page.tsx",
-    "apps/web/src/app/[locale]/users/[id]/page.tsx",
-    "apps/web/src/app/[locale]/vendors/new/page.tsx",
-    "apps/web/src/app/[locale]/vendors/page.tsx",
-    "apps/web/src/app/[locale]/vendors/[id]/edit/page.tsx",
-    "apps/web/src/app/[locale]/vendors/[id]/page.tsx",
-    "apps/web/src/components/budget-pool/BudgetPoolForm.tsx",
-    "apps/web/src/components/proposal/BudgetProposalForm.tsx",
-    "apps/web/src/components/proposal/ProposalActions.tsx",
-]
-
-def fix_duplicate_imports(file_path):
+
+def plan_edits(text):
     """
-    移除文件中重複的 import { useTranslations } from 'next-intl'
-    保留第一個,刪除其他所有重複的
+    找出需要合併 / 移除的 import 語句 (只看文件開頭的 import 區塊)
 
     Returns:
-        int: 移除的重複 import 數量
+        (edits, removed, conflicts): edits 為 (start, end, replacement) 列表
     """
-    if not os.path.exists(file_path):
-        print(f"[WARNING] 文件不存在: {file_path}")
-        return 0
+    statements = [ImportStatement(match) for match in _IMPORT.finditer(text, 0, import_block_end(text))]
+    groups = {}
+    for statement in statements:
+        kind = 'namespace' if statement.namespace else ('type' if statement.is_type else 'value')
+        groups.setdefault((statement.module, kind), []).append(statement)
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+    edits = []
+    removed = 0
+    conflicts = []
+    value_locals = {}           # module -> {local: imported} (值 import, 用於清理 type import)
 
-    # 找到所有 useTranslations import 的行號
-    import_line_indices = []
-    for i, line in enumerate(lines):
-        if "import { useTranslations } from 'next-intl'" in line:
-            import_line_indices.append(i)
+    def replace_group(group, default, specifiers):
+        nonlocal removed
+        first = group[0]
+        # 第一個語句只有 default 時, 大括號格式取自第一個具名語句
+        template = next((statement for statement in group if statement.names is not None), first)
+        if default is None and not specifiers:
+            edits.append((first.start, first.end, ''))
+            removed += 1
+        else:
+            merged = render(first, template, default, specifiers)
+            if merged != first.text:
+                edits.append((first.start, first.end, merged))
+        for statement in group[1:]:
+            edits.append((statement.start, statement.end, ''))
+            removed += 1
 
-    if len(import_line_indices) <= 1:
-        return 0  # 沒有重複
+    for kind in ('value', 'type', 'namespace'):
+        for (module, group_kind), group in groups.items():
+            if group_kind != kind:
+                continue
+            if kind == 'namespace':
+                seen = set()
+                for statement in group:
+                    key = (statement.is_type, statement.default, statement.namespace)
+                    if key in seen and not statement.comment:
+                        edits.append((statement.start, statement.end, ''))
+                        removed += 1
+                    seen.add(key)
+                continue
 
-    # 保留第一個,標記其他為刪除
-    lines_to_remove = import_line_indices[1:]
+            named = [statement for statement in group if statement.names is not None]
+            defaults = {statement.default for statement in group if statement.default}
+            if kind == 'value':
+                value_locals[module] = {local: imported for statement in named
+                                        for imported, local, _ in map(specifier_names, statement.names)}
+            shadowed = {}
+            if kind == 'type':
+                shadowed = value_locals.get(module, {})
+            if len(group) == 1 and not shadowed:
+                continue
+            if not all(statement.mergeable for statement in group):
+                if len(group) > 1:
+                    conflicts.append(f"{module}: 語句含有註解或無法解析, 請手動合併")
+                continue
+            if any(statement.comment for statement in group[1:]):
+                conflicts.append(f"{module}: 重複的語句帶有行尾註解, 請手動合併")
+                continue
+            if len(defaults) > 1:
+                conflicts.append(f"{module}: 多個不同的 default import ({', '.join(sorted(defaults))})")
+                continue
+            specifiers, conflict = merge_specifiers(named)
+            if conflict:
+                conflicts.append(f"{module}: {conflict}")
+                continue
+            if shadowed:
+                kept = [specifier for specifier in specifiers
+                        if shadowed.get(specifier_names(specifier)[1]) != specifier_names(specifier)[0]]
+                if len(kept) == len(specifiers) and len(group) == 1:
+                    continue
+                specifiers = kept
+            replace_group(group, next(iter(defaults), None), specifiers)
 
-    # 從後往前刪除,避免索引變化
-    for i in sorted(lines_to_remove, reverse=True):
-        del lines[i]
+    return sorted(edits), removed, conflicts
 
-    # 寫回文件
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.writelines(lines)
 
-    return len(lines_to_remove)
+def apply_edits(text, edits):
+    pieces = []
+    position = 0
+    for start, end, replacement in edits:
+        pieces.append(text[position:start])
+        pieces.append(replacement)
+        position = end
+    pieces.append(text[position:])
+    return ''.join(pieces)
 
-def main():
-    print("[START] 開始批量修復重複 import...\n")
 
-    total_files = len(AFFECTED_FILES)
-    total_removed = 0
-    success_count = 0
+def has_duplicate_modules(data):
+    """bytes 預篩選: 至少兩個行首 import, 且同一個模組字串出現兩次以上"""
+    if data.count(_IMPORT_PREFIX) + data.startswith(b'import') < 2:
+        return False
+    modules = [match.group(2) for match in _MODULE_BYTES.finditer(data)]
+    return len(set(modules)) < len(modules)
 
-    for i, file_path in enumerate(AFFECTED_FILES, 1):
-        # 轉換為 Windows 路徑
-        file_path = file_path.replace('/', '\\')
 
+def iter_source_files(paths, extensions):
+    """以 os.scandir 遞迴列出符合副檔名的文件 (跳過 SKIP_DIRS)"""
+    stack = []
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+        elif os.path.isdir(path):
+            stack.append(path)
+    while stack:
+        directory = stack.pop()
         try:
-            removed = fix_duplicate_imports(file_path)
-            if removed > 0:
-                print(f"[{i}/{total_files}] [SUCCESS] {file_path}")
-                print(f"         移除 {removed} 個重複 import")
-                total_removed += removed
-                success_count += 1
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(extensions) and entry.is_file(follow_symlinks=False):
+                        yield entry.path
+        except OSError as e:
+            print(f"[WARNING] 無法讀取目錄: {directory} ({e})")
+
+
+def write_atomic(path, data):
+    """寫入暫存檔後 os.replace, 保留原文件權限"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def display_path(path):
+    """以 / 分隔的相對路徑 (跨平台輸出一致)"""
+    relative = os.path.relpath(path)
+    return (path if relative.startswith('..') else relative).replace(os.sep, '/')
+
+
+def content_digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def fix_duplicate_imports(file_path, write=True, known_digest=None):
+    """
+    合併單一文件中的重複 import
+
+    known_digest: 快取中的內容 hash; 給定時會計算 digest, 相同則不重新解析
+    (result['unchanged'] = True)
+
+    Returns:
+        dict: path, candidate, removed, conflicts, diff (無變更時為 None), error, digest
+    """
+    result = {'path': file_path, 'candidate': False, 'removed': 0, 'conflicts': [], 'diff': None,
+              'error': None, 'digest': None, 'unchanged': False}
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if known_digest is not None:
+            result['digest'] = content_digest(data)
+            if result['digest'] == known_digest:
+                result['unchanged'] = True
+                return result
+        if not has_duplicate_modules(data):
+            return result
+        result['candidate'] = True
+        text = data.decode('utf-8')
+        edits, removed, conflicts = plan_edits(text)
+        result['conflicts'] = conflicts
+        if not edits:
+            return result
+        import difflib
+
+        fixed = apply_edits(text, edits)
+        result['removed'] = removed
+        name = display_path(file_path)
+        result['diff'] = ''.join(difflib.unified_diff(
+            text.splitlines(keepends=True), fixed.splitlines(keepends=True),
+            fromfile=f"a/{name.lstrip('/')}", tofile=f"b/{name.lstrip('/')}"))
+        if write:
+            data = fixed.encode('utf-8')
+            write_atomic(file_path, data)
+            if known_digest is not None:
+                result['digest'] = content_digest(data)
+    except (OSError, UnicodeDecodeError) as e:
+        result['error'] = str(e)
+    return result
+
+
+class ScanCache:
+    """
+    增量模式的掃描快取: 路徑 -> [size, mtime_ns, digest, candidate, conflicts]
+
+    只記錄已經沒有待修復內容的文件 (乾淨或只有 conflict), 有待修復內容的文件
+    每次都重新掃描, 讓 --check / --dry-run 的輸出保持完整。
+    """
+
+    def __init__(self, path, extensions):
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        self.extensions = list(extensions)
+        self.entries = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION and data.get('extensions') == self.extensions:
+                self.entries = data['files']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def key(self, file_path):
+        return os.path.relpath(os.path.abspath(file_path), self.root).replace(os.sep, '/')
+
+    def lookup(self, file_path, stat):
+        """(entry 或 None, 是否可直接沿用)"""
+        entry = self.entries.get(self.key(file_path))
+        if entry is None:
+            return None, False
+        return entry, entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns
+
+    def store(self, file_path, digest, result, started_ns):
+        key = self.key(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.entries.pop(key, None)
+            return
+        # 太新的 mtime 不可信: 記為 0, 下次以 hash 確認
+        mtime = stat.st_mtime_ns if stat.st_mtime_ns < started_ns - RACY_WINDOW_NS else 0
+        self.entries[key] = [stat.st_size, mtime, digest, result['candidate'], result['conflicts']]
+
+    def discard(self, file_path):
+        self.entries.pop(self.key(file_path), None)
+
+    def prune(self, seen):
+        """移除本次沒看到且已不存在的文件"""
+        seen_keys = {self.key(path) for path in seen}
+        for key in [key for key in self.entries if key not in seen_keys]:
+            if not os.path.exists(os.path.join(self.root, key)):
+                del self.entries[key]
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'extensions': self.extensions, 'files': self.entries},
+                      f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+
+def git_changed_files(ref):
+    """
+    `git diff --name-only REF` 加上未追蹤的新文件, 以絕對路徑回傳
+
+    Raises:
+        RuntimeError: 不是 git repo 或 REF 不存在
+    """
+    import subprocess
+
+    def git(*args):
+        completed = subprocess.run(('git',) + args, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip() or f"git {' '.join(args)} 失敗")
+        return completed.stdout
+
+    top = git('rev-parse', '--show-toplevel').strip()
+    names = git('diff', '--name-only', ref, '--').splitlines()
+    names += git('ls-files', '--others', '--exclude-standard').splitlines()
+    return {os.path.normcase(os.path.abspath(os.path.join(top, name))) for name in names if name}
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='合併 TS/JS 文件中重複或重疊的 import 語句')
+    parser.add_argument('paths', nargs='*', default=list(DEFAULT_ROOTS),
+                        help=f"要掃描的目錄或文件 (預設: {' '.join(DEFAULT_ROOTS)})")
+    parser.add_argument('--dry-run', action='store_true', help='只顯示 diff, 不寫入文件')
+    parser.add_argument('--check', action='store_true', help='不寫入; 有需要修復的文件時以狀態碼 1 結束')
+    parser.add_argument('--jobs', type=int, help='工作執行緒數')
+    parser.add_argument('--ext', default=','.join(DEFAULT_EXTENSIONS),
+                        help=f"副檔名, 逗號分隔 (預設: {','.join(DEFAULT_EXTENSIONS)})")
+    parser.add_argument('--verbose', action='store_true', help='同時列出沒有變更的候選文件')
+    parser.add_argument('--incremental', action='store_true', help='使用掃描快取, 只處理新增 / 變更的文件')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE,
+                        help=f'增量模式的快取文件 (預設: {DEFAULT_CACHE_FILE})')
+    parser.add_argument('--since', metavar='REF', help='強制重新掃描相對於 git REF 有變更的文件')
+    args = parser.parse_args(argv)
+
+    extensions = tuple(ext if ext.startswith('.') else f".{ext}" for ext in args.ext.split(',') if ext)
+    write = not (args.dry_run or args.check)
+    missing = [path for path in args.paths if not os.path.exists(path)]
+    for path in missing:
+        print(f"[WARNING] 路徑不存在: {path}")
+
+    print(f"[START] 掃描重複 import: {' '.join(args.paths)}{'' if write else ' (不寫入)'}\n")
+    started = time.perf_counter()
+    started_ns = time.time_ns()
+    files = list(iter_source_files(args.paths, extensions))
+    cache = ScanCache(args.cache_file, extensions) if args.incremental or args.since else None
+    forced = set()
+    if args.since:
+        try:
+            forced = git_changed_files(args.since)
+        except (OSError, RuntimeError) as e:
+            print(f"[ERROR] 無法取得 git diff: {e}")
+            return 1
+
+    results = []
+    pending = []        # (path, 快取 entry)
+    for path in files:
+        if cache is None:
+            pending.append((path, None))
+            continue
+        try:
+            entry, fresh = cache.lookup(path, os.stat(path))
+        except OSError:
+            entry, fresh = None, False
+        if fresh and os.path.normcase(os.path.abspath(path)) not in forced:
+            results.append({'path': path, 'candidate': entry[3], 'removed': 0, 'conflicts': entry[4],
+                            'diff': None, 'error': None, 'cached': True})
+        else:
+            pending.append((path, entry))
+
+    def scan(item):
+        path, entry = item
+        # 增量模式下一律計算 digest ('' 不會與任何 hash 相同)
+        known_digest = None if cache is None else (entry[2] if entry else '')
+        result = fix_duplicate_imports(path, write=write, known_digest=known_digest)
+        if result['unchanged']:
+            result.update(candidate=entry[3], conflicts=entry[4])
+        return result
+
+    # 只在真正掃描時才載入 (--help 不需要)
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        scanned = list(pool.map(scan, pending))
+    results.extend(scanned)
+
+    if cache is not None:
+        for result in scanned:
+            if result['error'] or (result['diff'] and not write):
+                cache.discard(result['path'])
             else:
-                print(f"[{i}/{total_files}] [SKIP] {file_path}")
-                print(f"         無重複 import")
-        except Exception as e:
-            print(f"[{i}/{total_files}] [ERROR] {file_path}")
-            print(f"         錯誤: {str(e)}")
+                cache.store(result['path'], result['digest'], result, started_ns)
+        cache.prune(files)
+        cache.save()
 
+    changed = [result for result in results if result['diff']]
+    errors = [result for result in results if result['error']]
+    for result in sorted(results, key=lambda result: result['path']):
+        name = display_path(result['path'])
+        if result['error']:
+            print(f"[ERROR] {name}")
+            print(f"         錯誤: {result['error']}")
+            continue
+        if result['diff']:
+            print(f"[{'SUCCESS' if write else 'CHANGE'}] {name}")
+            print(f"         移除 {result['removed']} 個重複 import")
+            if args.dry_run:
+                print(result['diff'], end='' if result['diff'].endswith('\n') else '\n')
+        elif result['candidate'] and args.verbose:
+            print(f"[SKIP] {name}")
+            print("         無可合併的重複 import")
+        for conflict in result['conflicts']:
+            print(f"[CONFLICT] {name}")
+            print(f"         {conflict}")
+
+    conflicts = sum(len(result['conflicts']) for result in results)
     print(f"\n" + "="*60)
     print(f"[SUMMARY] 修復完成統計:")
-    print(f"   總文件數: {total_files}")
-    print(f"   成功修復: {success_count}")
-    print(f"   移除重複 import 總數: {total_removed}")
+    print(f"   掃描文件數: {len(files)} (候選: {sum(result['candidate'] for result in results)})")
+    if cache is not None:
+        print(f"   重新掃描: {len(scanned)} (快取沿用: {len(files) - len(scanned)}"
+              f"{f', git diff: {len(forced)}' if args.since else ''})")
+    print(f"   {'成功修復' if write else '需要修復'}: {len(changed)}")
+    print(f"   移除重複 import 總數: {sum(result['removed'] for result in changed)}")
+    print(f"   需手動處理: {conflicts}")
+    print(f"   錯誤: {len(errors)}")
+    print(f"   耗時: {time.perf_counter() - started:.2f}s")
     print("="*60)
 
-    if success_count > 0:
-        print("\n[COMPLETE] 批量修復完成!")
+    if changed and write:
         print("\n下一步:")
-        print("   1. 運行檢查腳本驗證: node scripts/check-duplicate-imports.js")
-        print("   2. TypeScript 類型檢查: pnpm typecheck")
-        print("   3. 啟動開發服務器: pnpm dev")
-        print("   4. 提交修復: git add . && git commit -m 'fix: remove duplicate imports'")
-    else:
-        print("\n[WARNING] 沒有文件被修復")
-
-    return 0 if success_count == total_files else 1
+        print("   1. TypeScript 類型檢查: pnpm typecheck")
+        print("   2. 檢查變更: git diff")
+
+    if errors or missing:
+        return 1
+    if args.check and changed:
+        return 1
+    return 0
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Local stub of the importData tRPC endpoint
+
+Answers `POST /api/trpc/omExpense.importData` the way the web app does
+(superjson envelope, ImportResult body) without a database, so
+upload-import-data.py can be tried out and load-tested locally, including
+retries and resume:
+
+    - Items are remembered by (headerName, itemName, opCoName, financialYear);
+      'skip' reports known items as skippedDuplicates, 'update' as
+      updatedItems, 'replace' forgets the year first
+    - --latency adds a delay per request, --fail-rate answers that share of
+      requests with 503 before doing anything
+    - Input is checked like the router does (financialYear 2000-2100, at
+      least one item, known importMode) and answered with a BAD_REQUEST error
+
+State lives in memory and is lost when the stub stops.
+
+Usage:
+    python scripts/import-stub-server.py [--port 3000] [--latency 0.2]
+        [--fail-rate 0.1] [--seed 0] [--require-cookie]
+
+Author: IT Department
+Since: FEAT-008 - OM Expense Data Import
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PATH = '/api/trpc/omExpense.importData'
+IMPORT_MODES = ('skip', 'update', 'replace')
+
+
+class StubState:
+    """Known items, OpCos, categories and headers, shared by all request threads."""
+
+    def __init__(self, latency=0.0, fail_rate=0.0, seed=None, require_cookie=False):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.require_cookie = require_cookie
+        self.lock = threading.Lock()
+        self.items = set()
+        self.opcos = set()
+        self.categories = set()
+        self.headers = set()
+        self.requests = 0
+
+    def should_fail(self):
+        with self.lock:
+            self.requests += 1
+            return self.random.random() < self.fail_rate
+
+    def import_data(self, financial_year, items, import_mode):
+        """Apply one importData call and return its ImportResult."""
+        stats = dict.fromkeys((
+            'createdOpCos', 'createdCategories', 'createdHeaders', 'createdItems',
+            'createdMonthlyRecords', 'skippedDuplicates', 'updatedItems', 'deletedBeforeReplace'), 0)
+        stats['totalItems'] = len(items)
+        skipped = []
+        with self.lock:
+            if import_mode == 'replace':
+                year_items = {key for key in self.items if key[3] == financial_year}
+                stats['deletedBeforeReplace'] = len(year_items)
+                self.items -= year_items
+                self.headers = {key for key in self.headers if key[1] != financial_year}
+            for item in items:
+                if item['opCoName'] not in self.opcos:
+                    self.opcos.add(item['opCoName'])
+                    stats['createdOpCos'] += 1
+                if item['category'] not in self.categories:
+                    self.categories.add(item['category'])
+                    stats['createdCategories'] += 1
+                header = (item['headerName'], financial_year)
+                if header not in self.headers:
+                    self.headers.add(header)
+                    stats['createdHeaders'] += 1
+                key = (item['headerName'], item['itemName'], item['opCoName'], financial_year)
+                if key in self.items:
+                    if import_mode == 'update':
+                        stats['updatedItems'] += 1
+                    else:
+                        stats['skippedDuplicates'] += 1
+                        skipped.append({'headerName': key[0], 'itemName': key[1], 'opCoName': key[2],
+                                        'reason': 'duplicate'})
+                    continue
+                self.items.add(key)
+                stats['createdItems'] += 1
+                stats['createdMonthlyRecords'] += 12
+        return {
+            'success': True,
+            'statistics': stats,
+            'details': {'opCos': [], 'categories': [], 'headers': [], 'skippedItems': skipped},
+            'importMode': import_mode,
+        }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'       # keep-alive, like the web app
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, code, message):
+        self._send(status, {'error': {'json': {
+            'message': message, 'code': -32600,
+            'data': {'code': code, 'httpStatus': status, 'path': 'omExpense.importData'},
+        }}})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        state = self.state
+        if self.path.split('?')[0] != PATH:
+            return self._error(404, 'NOT_FOUND', f'No "mutation"-procedure on path "{self.path}"')
+        if state.should_fail():
+            return self._send(503, {'error': 'Service Unavailable'}, {'Retry-After': '0'})
+        if state.latency:
+            time.sleep(state.latency)
+        if state.require_cookie and not self.headers.get('Cookie'):
+            return self._error(401, 'UNAUTHORIZED', 'UNAUTHORIZED')
+
+        try:
+            payload = json.loads(body)['json']
+            financial_year = payload['financialYear']
+            items = payload['items']
+            import_mode = payload.get('importMode', 'skip')
+        except (ValueError, KeyError, TypeError):
+            return self._error(400, 'PARSE_ERROR', 'Invalid superjson body')
+        if not isinstance(financial_year, int) or not 2000 <= financial_year <= 2100:
+            return self._error(400, 'BAD_REQUEST', 'financialYear must be between 2000 and 2100')
+        if not items:
+            return self._error(400, 'BAD_REQUEST', '至少需要一筆資料')
+        if import_mode not in IMPORT_MODES:
+            return self._error(400, 'BAD_REQUEST', f'Invalid importMode: {import_mode}')
+
+        result = state.import_data(financial_year, items, import_mode)
+        self._send(200, {'result': {'data': {'json': result}}})
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Local stub of the omExpense.importData tRPC endpoint.')
+    parser.add_argument('--port', type=int, default=3000, help='Port to listen on (default: 3000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of delay per request')
+    parser.add_argument('--fail-rate', type=float, default=0.0,
+                        help='Share of requests answered with 503 (0-1)')
+    parser.add_argument('--seed', type=int, help='Random seed for --fail-rate')
+    parser.add_argument('--require-cookie', action='store_true',
+                        help='Answer UNAUTHORIZED to requests without a Cookie header')
+    args = parser.parse_args()
+
+    StubHandler.state = StubState(args.latency, args.fail_rate, args.seed, args.require_cookie)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), StubHandler)
+    print(f"[INFO] importData stub listening on http://127.0.0.1:{args.port}{PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n[STATS] {StubHandler.state.requests} requests, {len(StubHandler.state.items)} items stored")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Unified command line for the OM Expense data import scripts
+
+Runs the import scripts as subcommands of one entry point (see
+om_import/cli.py). Only the chosen command's script is loaded, and heavy
+dependencies such as openpyxl are imported when a command actually runs, so
+`--help` and the light commands start in a few tens of milliseconds.
+
+Usage:
+    python scripts/om-import.py <command> [options]
+    python scripts/om-import.py <command> --help
+
+Commands:
+    convert      - convert-excel-to-import-json.py
+    analyze      - analyze-import-data.py
+    extract      - extract-screenshot-data.py
+    reconcile    - reconcile-extracted-budget.py
+    fix-imports  - fix-duplicate-imports.py
+
+Example:
+    python scripts/om-import.py convert 'docs/OM Expense.xlsx' import-data.json --stream
+
+Author: IT Department
+Since: FEAT-008 - OM Expense Data Import
+"""
+
+import sys
+
+from om_import.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
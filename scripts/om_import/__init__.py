@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Shared helpers for the OM Expense data import scripts
+
+The standalone scripts in this folder (convert-excel-to-import-json.py,
+analyze-import-data.py, benchmark-om-import.py, ...) import their building
+blocks from this package. Because Python puts the script's own directory on
+sys.path, running `python scripts/<script>.py` from the repo root is enough -
+no install step.
+
+Modules:
+    normalize - Cell value helpers (safe_string, safe_float, format_date)
+    dates     - Column-level date format inference + memoized date parser
+    profiler  - Single-pass streaming profiler behind analyze-import-data.py
+    sketches  - HyperLogLog / Space-Saving sketches for fixed-memory profiling
+    pipeline  - Generator pipeline: read -> normalize -> validate -> dedupe
+    readers   - Sheet reader engines: openpyxl, fast direct xlsx XML parse, CSV / TSV
+    layouts   - Header-matched layout profiles compiled into itemgetter row extractors
+    validation - importOMExpenseItemSchema rules compiled into per-field checkers
+    currency  - USD / HKD / MOP cross-check and blank-USD fill from a cached rate table
+    metrics   - Opt-in per-stage time / CPU / memory instrumentation (--profile)
+    neardup   - Normalized-key and fuzzy (blocked 3-gram) near-duplicate detection
+    table     - Columnar ImportTable (typed arrays + dictionary-encoded strings)
+    writers   - Incremental, atomic JSON / NDJSON / gzip output writers
+    chunking  - Transaction-sized chunk files + manifest for importData
+    bulkload  - PostgreSQL COPY CSV files + psql loader (staging tables, set-based merge)
+    upload    - Concurrent, resumable importData client (keep-alive, retries, checkpoint)
+    watch     - Drop-folder scan / lock / status / quarantine for watch-import-folder.py
+    parallel  - Process-pool conversion of many workbooks into one output
+    cache     - Parsed-workbook cache (content fingerprints, mmap row files)
+    xlsx      - Low-level xlsx zip helpers (sheet name -> XML part)
+    annual_budget - Layout-aware IT Annual Maintenance Budget workbook extraction
+    extracted - Flattening of screenshot-extraction JSON into flat items
+    reconcile - Subtotal / total / increment reconciliation of extracted budget JSON
+    synthetic - Deterministic synthetic workbooks / extraction JSON for benchmarks
+    cli       - om-import.py / `python -m om_import`: lazily loaded script subcommands
+
+Author: IT Department
+Since: FEAT-008 - OM Expense Data Import
+"""
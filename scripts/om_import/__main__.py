@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""`python -m om_import <command>`: see cli.py."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main(prog='python -m om_import'))
@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Layout-aware extraction of the IT Annual Maintenance Budget workbook
+
+Reads the "IT Annual Maintenance Budget for FYxx" workbook directly and
+recovers the structure extract-screenshot-data.py used to transcribe by hand
+from screenshots, for every category in one run:
+
+    A) Datalines                              category row (or the sheet name)
+    1) R-WAN (Budget @US$65,712, ...)         header
+       **Item #1.1-1.3's cost to be ...       header notes
+       1.1 TGT-DC (wef Sep-23) ...  4,694 ... item (amounts from the columns)
+       - 2x External X-connect by DYXNet ...  item notes
+    4) Internet Lines
+       4.1 HGC                                sub-section (a numbered row
+       ii) 1x 500M Broadband ...  738 ...     without amounts followed by
+                                              i) / ii) / iii) items)
+       Sub-total                   5,431 ...  header subtotal
+    Total                                     category total
+
+Each worksheet is read once (openpyxl read-only) into a CellIndex of its
+non-empty cells; merged ranges come from the sheet XML. Columns are not
+hard-coded: the column titles above the first category / header row
+(merged titles such as "FY26 Budget" over "US$" | "HK$" are resolved onto
+every column they span) are matched to the fields of the extraction JSON:
+
+    budget_us, budget_hk, increment_pct, charge_to, actual_hk, actual_us,
+    end_date, notes (Remarks), ref, charged_by
+
+Everything left of the first matched column holds the row labels. Data
+rows use the anchor cell of a merge only, so an amount merged down over
+three item rows counts once (as in the screenshots). Sheets without a
+budget column title are skipped and reported.
+
+Output documents have the screenshot-extraction shape (see extracted.py):
+
+    {"metadata": {...}, "category": "A) Datalines", "headers": [...], "total": {...}}
+"""
+
+import os
+import re
+import zipfile
+from datetime import date, datetime
+
+from .xlsx import merged_ranges, workbook_sheets
+
+AMOUNT_FIELDS = ('budget_us', 'budget_hk', 'increment_pct', 'actual_hk', 'actual_us')
+
+# Row labels
+_CATEGORY = re.compile(r'([A-Z])\)\s*(\S.*)')
+_HEADER = re.compile(r'(\d+)\)\s*(\S.*)')
+_NUMBERED = re.compile(r'(\d+\.\d+)\.?(?:\s+(\S.*))?')
+_ROMAN = re.compile(r'([ivx]+\))\s*(\S.*)?')
+_SUBTOTAL = re.compile(r'sub[\s-]*total\b', re.IGNORECASE)
+_TOTAL = re.compile(r'(grand\s+)?total\b', re.IGNORECASE)
+_NUMBER_ONLY = re.compile(r'(\d+\)|\d+\.\d+\.?|[ivx]+\)|[A-Z]\))')
+
+# Parts of a label that become fields of their own
+_CHARGED_BY = re.compile(r'\s*\(charged by ([^)]*)\)', re.IGNORECASE)
+_REF = re.compile(r'\s*\(ref[:.]?\s*([\w-]+)\)', re.IGNORECASE)
+_INLINE_NOTE = re.compile(r'\s+(?=\*)')
+_BULLET = re.compile(r'^[-•–]\s*')
+
+# Preamble metadata
+_UPDATED_ON = re.compile(r'updated\s+on\s*:?\s*(.*)', re.IGNORECASE)
+_EXCHANGE_RATE = re.compile(r'[A-Z]{3}\s*1\s*=\s*[\d.]+')
+_FINANCIAL_YEAR = re.compile(r'\bFY\s?(\d{4}|\d{2})\b')
+
+_SPACES = re.compile(r'\s+')
+_US = re.compile(r'\bus\$?|usd')
+_HK = re.compile(r'\bhk\$?|hkd')
+
+
+def _text(value):
+    """Cell value as single-spaced text (numbers as they read: 1.1, 15)."""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        value = f"{value:g}"
+    elif isinstance(value, (datetime, date)):
+        return None
+    text = _SPACES.sub(' ', str(value)).strip()
+    return text or None
+
+
+def column_role(title):
+    """Field of the extraction JSON a column title stands for, or None."""
+    text = title.lower()
+    currency = 'hk' if _HK.search(text) else 'us' if _US.search(text) else None
+    if 'actual' in text and currency:
+        return f'actual_{currency}'
+    if 'budget' in text and currency:
+        return f'budget_{currency}'
+    if 'incr' in text or '%' in text:
+        return 'increment_pct'
+    if 'charged by' in text:
+        return 'charged_by'
+    if 'charge' in text and ' to' in text:
+        return 'charge_to'
+    if 'end date' in text or 'expir' in text:
+        return 'end_date'
+    if 'remark' in text or 'note' in text:
+        return 'notes'
+    if re.match(r'ref\b', text):
+        return 'ref'
+    return None
+
+
+class CellIndex:
+    """
+    Non-empty cells of one worksheet by (row, column), built in one pass.
+
+    `formats` keeps the number format of percentage and date cells only;
+    `merged` maps every covered cell of a merged range to its anchor.
+    """
+
+    def __init__(self, title):
+        self.title = title
+        self.rows = {}
+        self.formats = {}
+        self.merged = {}
+
+    @classmethod
+    def from_worksheet(cls, ws, ranges=()):
+        index = cls(ws.title)
+        rows = index.rows
+        for row in ws.iter_rows():
+            for cell in row:
+                value = cell.value
+                if value is None or (isinstance(value, str) and not value.strip()):
+                    continue
+                rows.setdefault(cell.row, {})[cell.column] = value
+                if isinstance(value, (datetime, date)) or (
+                        isinstance(value, (int, float)) and '%' in (cell.number_format or '')):
+                    index.formats[cell.row, cell.column] = cell.number_format
+        for min_row, min_col, max_row, max_col in ranges:
+            for r in range(min_row, max_row + 1):
+                for c in range(min_col, max_col + 1):
+                    if (r, c) != (min_row, min_col):
+                        index.merged[r, c] = (min_row, min_col)
+        return index
+
+    def get(self, row, column, resolve=False):
+        """Value of a cell; with resolve=True a merged cell reads its anchor's value."""
+        if resolve:
+            row, column = self.merged.get((row, column), (row, column))
+        return self.rows.get(row, {}).get(column)
+
+
+class SheetLayout:
+    """Row of the first category / header, label columns and field -> column."""
+
+    def __init__(self, first_row, label_columns, columns):
+        self.first_row = first_row
+        self.label_columns = label_columns
+        self.columns = columns
+
+
+def _first_label(cells):
+    for column in sorted(cells):
+        text = _text(cells[column])
+        if text:
+            return text
+    return None
+
+
+def detect_layout(index):
+    """
+    Find the column titles above the first category / header row and map
+    them to fields. Returns a SheetLayout, or None when no budget column is
+    found (not a budget sheet).
+    """
+    first_row = None
+    for r in sorted(index.rows):
+        label = _first_label(index.rows[r])
+        if label and (_CATEGORY.fullmatch(label) or _HEADER.fullmatch(label)):
+            first_row = r
+            break
+    if first_row is None:
+        return None
+
+    # Title rows: three or more text cells (the document title and metadata lines have one)
+    title_rows = [r for r in sorted(index.rows) if r < first_row
+                  and sum(1 for v in index.rows[r].values() if isinstance(v, str)) >= 3]
+    if not title_rows:
+        return None
+    span = {c for r in title_rows for c in index.rows[r]}
+    span.update(c for (r, c) in index.merged if r in title_rows)
+
+    columns = {}
+    for column in sorted(span):
+        title = ' '.join(text for text in (_text(index.get(r, column, resolve=True)) for r in title_rows)
+                         if text and not text.isdigit())
+        role = column_role(title) if title else None
+        if role and role not in columns:
+            columns[role] = column
+    if 'budget_us' not in columns and 'budget_hk' not in columns:
+        return None
+    return SheetLayout(first_row, min(columns.values()), columns)
+
+
+def _amount(value, fmt=None, percent=False):
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value.replace(',', '').replace('$', '').rstrip('%'))
+        except ValueError:
+            return None
+    elif not isinstance(value, (int, float)):
+        return None
+    if percent:
+        # Stored as a fraction when the cell is formatted as a percentage
+        return round(float(value) * 100 if fmt and '%' in fmt else float(value), 2)
+    value = round(value, 2)
+    return int(value) if value == int(value) else value
+
+
+def _end_date(value, fmt):
+    if isinstance(value, (datetime, date)):
+        # mmm-yy cells read "Jul-26"; full dates m/d/Y, as in the screenshots
+        if fmt and 'd' not in fmt.lower().replace('[', ' ').split(';')[0]:
+            return value.strftime('%b-%y')
+        return f"{value.month}/{value.day}/{value.year}"
+    return _text(value)
+
+
+def _split_label(label):
+    """'1.1 Name (charged by X) *note' -> (name, charged_by, ref, [notes])."""
+    charged_by = None
+    match = _CHARGED_BY.search(label)
+    if match:
+        charged_by = match.group(1).strip()
+        label = label[:match.start()] + label[match.end():]
+    ref = None
+    match = _REF.search(label)
+    if match:
+        ref = match.group(1)
+        label = label[:match.start()] + label[match.end():]
+    name, *notes = _INLINE_NOTE.split(label.strip(), maxsplit=1)
+    return name.strip(), charged_by, ref, notes
+
+
+class _SheetParser:
+    """Turns the rows of one budget sheet into category documents."""
+
+    def __init__(self, index, layout, default_category):
+        self.index = index
+        self.layout = layout
+        self.default_category = default_category
+        self.categories = []
+        self.category = None
+        self.header = None
+        self.section = None
+        self.target = None          # where note rows go: an item, a section or the header
+
+    def _fields(self, row):
+        cells = self.index.rows[row]
+        fields = {}
+        for field, column in self.layout.columns.items():
+            value = cells.get(column)
+            if value is None:
+                continue
+            fmt = self.index.formats.get((row, column))
+            if field in AMOUNT_FIELDS:
+                value = _amount(value, fmt, percent=field == 'increment_pct')
+            elif field == 'end_date':
+                value = _end_date(value, fmt)
+            else:
+                value = _text(value)
+            if value is not None:
+                fields[field] = value
+        return fields
+
+    def _label(self, row):
+        """Label text of a row; a bare '1.1' cell is joined with the name cell after it."""
+        texts = [text for text in (_text(v) for c, v in sorted(self.index.rows[row].items())
+                                   if c < self.layout.label_columns) if text]
+        if len(texts) > 1 and _NUMBER_ONLY.fullmatch(texts[0]):
+            return f"{texts[0]} {texts[1]}", texts[2:]
+        return (texts[0], texts[1:]) if texts else (None, [])
+
+    def _open_category(self, name):
+        for category in self.categories:
+            if category['category'] == name:
+                self.category = category
+                break
+        else:
+            self.category = {'category': name, 'headers': []}
+            self.categories.append(self.category)
+        self.header = self.section = self.target = None
+
+    def _add_notes(self, target, notes):
+        notes = [_BULLET.sub('', note) for note in notes if note]
+        if target is not None and notes:
+            target.setdefault('notes', []).extend(notes)
+
+    def _new_item(self, number, label, fields):
+        name, charged_by, _, notes = _split_label(label or '')
+        item = {'item_number': number, 'name': name}
+        if charged_by or 'charged_by' in fields:
+            item['charged_by'] = fields.get('charged_by', charged_by)
+        for field in ('budget_us', 'budget_hk', 'increment_pct', 'charge_to', 'actual_hk', 'actual_us',
+                      'end_date'):
+            item[field] = fields.get(field)
+        self._add_notes(item, notes + [fields.get('notes')])
+        return item
+
+    def _add_item(self, item):
+        if self.header is None:
+            self.header = {'number': None, 'name': None, 'items': []}
+            self.category['headers'].append(self.header)
+        container = self.section if self.section is not None else self.header
+        container.setdefault('items', []).append(item)
+        self.target = item
+
+    def _roman_item(self, number, label, fields):
+        header = self.header
+        if self.section is None and header is not None and header.get('items'):
+            last = header['items'][-1]
+            # A numbered row without figures followed by i) / ii) items is a sub-section title
+            if last['item_number'] and all(last.get(f) is None for f in AMOUNT_FIELDS + ('charge_to', 'end_date')):
+                header['items'].pop()
+                if not header['items']:
+                    del header['items']
+                self.section = {'name': f"{last['item_number']} {last['name']}", 'items': []}
+                if last.get('notes'):
+                    self.section['notes'] = last['notes']
+                header.setdefault('sub_sections', []).append(self.section)
+        self._add_item(self._new_item(number, label, fields))
+
+    def parse(self):
+        rows = self.index.rows
+        self._open_category(self.default_category)
+        for row in sorted(rows):
+            if row < self.layout.first_row:
+                continue
+            label, extra = self._label(row)
+            fields = self._fields(row)
+            if label is None and not fields:
+                continue
+            has_amounts = any(field in fields for field in AMOUNT_FIELDS)
+
+            if label and _SUBTOTAL.match(label):
+                if self.header is not None:
+                    self.header['subtotal'] = {f: fields.get(f) for f in AMOUNT_FIELDS}
+                self.target = None
+                continue
+            if label and _TOTAL.match(label):
+                self.category['total'] = {f: fields.get(f) for f in AMOUNT_FIELDS}
+                self.target = None
+                continue
+
+            match = _CATEGORY.fullmatch(label or '')
+            if match and not has_amounts:
+                self._open_category(f"{match.group(1)}) {match.group(2)}")
+                continue
+
+            match = _HEADER.fullmatch(label or '')
+            if match:
+                name, _, ref, notes = _split_label(match.group(2))
+                self.header = {'number': int(match.group(1)), 'name': name}
+                ref = fields.get('ref', ref)
+                if ref:
+                    self.header['ref'] = ref
+                self._add_notes(self.header, notes + extra + [fields.get('notes')])
+                self.category['headers'].append(self.header)
+                self.section = None
+                self.target = self.header
+                continue
+
+            match = _NUMBERED.fullmatch(label or '')
+            if match:
+                self.section = None
+                self._add_item(self._new_item(match.group(1).rstrip('.'), match.group(2), fields))
+                self._add_notes(self.target, extra)
+                continue
+
+            match = _ROMAN.fullmatch(label or '')
+            if match:
+                self._roman_item(match.group(1), match.group(2), fields)
+                self._add_notes(self.target, extra)
+                continue
+
+            if has_amounts:
+                # An unnumbered row with figures is still an item
+                self._add_item(self._new_item(None, label, fields))
+                self._add_notes(self.target, extra)
+            else:
+                # Note lines belong to the item (or header) above them
+                target = self.target if self.target is not None else self.header
+                self._add_notes(target, [label] + extra + [fields.get('notes')])
+        return [category for category in self.categories if category['headers']]
+
+
+def _preamble_metadata(index, first_row):
+    """Document title, 'Updated on' date, exchange rate and financial year above the first header."""
+    metadata = {'document_title': None, 'updated_on': None, 'exchange_rate': None, 'financial_year': None}
+    for row in sorted(index.rows):
+        if row >= first_row:
+            break
+        cells = sorted(index.rows[row].items())
+        for position, (_, value) in enumerate(cells):
+            text = _text(value)
+            if text is None:
+                continue
+            match = _UPDATED_ON.search(text)
+            if match and metadata['updated_on'] is None:
+                after = match.group(1) or (cells[position + 1][1] if position + 1 < len(cells) else None)
+                if isinstance(after, (datetime, date)):
+                    after = f"{after.day}-{after.strftime('%b-%y')}"
+                metadata['updated_on'] = _text(after)
+            match = _EXCHANGE_RATE.search(text)
+            if match and metadata['exchange_rate'] is None:
+                metadata['exchange_rate'] = match.group(0)
+            if metadata['document_title'] is None and 'budget' in text.lower():
+                metadata['document_title'] = text
+                match = _FINANCIAL_YEAR.search(text)
+                if match:
+                    year = int(match.group(1))
+                    metadata['financial_year'] = year if year > 100 else 2000 + year
+    return metadata
+
+
+def extract_workbook(path):
+    """
+    Extract every category of a maintenance budget workbook.
+
+    Returns:
+        (documents, skipped): one screenshot-shaped document per category, in
+        workbook order, and a list of (sheet name, reason) for sheets that
+        do not have the budget layout
+    """
+    import openpyxl
+
+    with zipfile.ZipFile(path) as zf:
+        parts = dict(workbook_sheets(zf))
+        ranges = {name: merged_ranges(zf, part) for name, part in parts.items() if part in zf.namelist()}
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    documents = {}
+    skipped = []
+    try:
+        for ws in wb.worksheets:
+            index = CellIndex.from_worksheet(ws, ranges.get(ws.title, ()))
+            layout = detect_layout(index)
+            if layout is None:
+                skipped.append((ws.title, 'no category / header rows under budget column titles'))
+                continue
+            metadata = {'source': os.path.basename(path), 'sheet': ws.title,
+                        **_preamble_metadata(index, layout.first_row)}
+            match = _CATEGORY.fullmatch(ws.title.strip())
+            default = f"{match.group(1)}) {match.group(2)}" if match else ws.title.strip()
+            categories = _SheetParser(index, layout, default).parse()
+            if not categories:
+                skipped.append((ws.title, 'no headers found'))
+            for category in categories:
+                document = documents.get(category['category'])
+                if document is None:
+                    document = documents[category['category']] = {
+                        'metadata': metadata, 'category': category['category'], 'headers': []}
+                document['headers'].extend(category['headers'])
+                if 'total' in category:
+                    document['total'] = category['total']
+    finally:
+        wb.close()
+    return list(documents.values()), skipped
+
+
+def category_slug(category):
+    """'A) Datalines' -> 'a-datalines' (for om-expense-<slug>-extracted.json)."""
+    return re.sub(r'[^a-z0-9]+', '-', category.lower()).strip('-') or 'uncategorized'
+
+
+def combined_document(documents, source=None):
+    """All categories in one document, category set per header (the whole-workbook form)."""
+    headers = [{'category': document['category'], **header}
+               for document in documents for header in document['headers']]
+    first = documents[0]['metadata'] if documents else {}
+    return {
+        'metadata': {
+            'source': source or first.get('source'),
+            'document_title': first.get('document_title'),
+            'financial_year': first.get('financial_year'),
+            'total_headers': len(headers),
+            'total_items': sum(count_items(document) for document in documents),
+        },
+        'headers': headers,
+    }
+
+
+def count_items(document):
+    """Items of a document, including those inside sub-sections."""
+    return sum(len(header.get('items', [])) + sum(len(s.get('items', [])) for s in header.get('sub_sections', []))
+               for header in document['headers'])
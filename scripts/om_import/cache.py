@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Parsed-workbook cache keyed by content fingerprints
+
+Finance re-sends the same workbook many times with small edits. The cache
+stores the normalized rows of each converted sheet so unchanged sheets are
+never parsed by openpyxl again:
+
+    1. workbook hash  - SHA-256 of the .xlsx bytes. A known hash maps straight
+                        to its sheet hash, without opening the zip.
+    2. sheet hash     - SHA-256 of the sheet XML part plus sharedStrings.xml and
+                        styles.xml (cell values and date formats live there).
+                        A workbook with edits elsewhere still reuses the sheet.
+                        A CSV / TSV file is its own single sheet: its bytes.
+    3. sheet file     - Normalized rows in a compact binary file (below) that is
+                        read through mmap, so a hit costs one page-in per row.
+
+When a sheet has changed, it is re-parsed and compared with the previous
+cached version of the same path, and a row-level delta of added, changed and
+removed (header, item, OpCo) keys is reported.
+
+Cache layout (default: .om-import-cache/):
+    workbooks/<workbook_hash>.json  - {"sheet": name, "sheet_hash": ...}
+    paths/<sha1(abs path)>.json     - last sheet hash converted from a path
+    sheets/<sheet_hash>.omrc        - normalized rows
+    sheets/<sheet_hash>.dates.json  - date column reports from the parse
+    sheets/<sheet_hash>.omtab       - columnar ImportTable (only when a table
+                                      was requested, see table.py)
+
+.omrc format (little-endian):
+    header   '<4sHHIII'  magic b'OMRC', version, reserved, row_count,
+                         string_count, empty_rows
+    rows     row_count fixed-width records '<I7IddB':
+                         row_idx, 7 string refs (ITEM_FIELDS string columns),
+                         budgetAmount, lastFYActualExpense, flags
+    offsets  (string_count + 1) x u32, string i = blob[offsets[i]:offsets[i+1]]
+    blob     UTF-8 string data (every distinct string stored once)
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from .pipeline import ITEM_FIELDS, ConversionState, ImportItem, normalize_rows, read_tapped_rows
+from .table import ImportTable
+
+DEFAULT_CACHE_DIR = '.om-import-cache'
+
+# Bump when normalization changes so stale sheet files are never reused
+CACHE_VERSION = 4
+
+MAGIC = b'OMRC'
+HEADER = struct.Struct('<4sHHIII')
+ROW = struct.Struct('<I7IddB')
+
+NONE_REF = 0xFFFFFFFF
+FLAG_BUDGET_DEFAULT = 0x01   # budgetAmount is safe_float's int default (0)
+FLAG_LAST_FY_NONE = 0x02     # lastFYActualExpense is None
+FLAG_ONGOING = 0x04          # isOngoing is true
+
+STRING_FIELDS = tuple(f for f in ITEM_FIELDS if f not in ('budgetAmount', 'lastFYActualExpense', 'isOngoing'))
+
+MAX_DELTA_SAMPLES = 20
+
+
+def _sha256_file(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sheet_fingerprint(excel_path):
+    """Return (sheet_name, sheet_hash) for the active sheet of a workbook."""
+    import zipfile
+
+    from .readers import DelimitedSheet, is_delimited
+    from .xlsx import SHARED_STRINGS_PART, STYLES_PART, active_sheet
+
+    if is_delimited(excel_path):
+        name = DelimitedSheet(excel_path).title
+        digest = hashlib.sha256(f'omrc-v{CACHE_VERSION}:{name}'.encode('utf-8'))
+        with open(excel_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return name, digest.hexdigest()
+
+    with zipfile.ZipFile(excel_path) as zf:
+        name, part = active_sheet(zf)
+        digest = hashlib.sha256(f'omrc-v{CACHE_VERSION}:{name}'.encode('utf-8'))
+        names = set(zf.namelist())
+        for member in (part, SHARED_STRINGS_PART, STYLES_PART):
+            if member in names:
+                digest.update(member.encode('utf-8'))
+                with zf.open(member) as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+    return name, digest.hexdigest()
+
+
+class SheetCacheWriter:
+    """Accumulates normalized rows in compact form and saves them as .omrc."""
+
+    def __init__(self):
+        self._strings = {}
+        self._rows = bytearray()
+        self.row_count = 0
+        self.empty_rows = 0
+
+    def _ref(self, value):
+        if value is None:
+            return NONE_REF
+        ref = self._strings.get(value)
+        if ref is None:
+            ref = self._strings[value] = len(self._strings)
+        return ref
+
+    def add(self, row_idx, item):
+        """Append one normalized (row_idx, item) pair."""
+        flags = 0
+        budget = item.budgetAmount
+        if budget == 0 and not isinstance(budget, float):
+            flags |= FLAG_BUDGET_DEFAULT
+        last_fy = item.lastFYActualExpense
+        if last_fy is None:
+            flags |= FLAG_LAST_FY_NONE
+            last_fy = 0.0
+        if item.isOngoing:
+            flags |= FLAG_ONGOING
+        self._rows += ROW.pack(
+            row_idx, *(self._ref(getattr(item, f)) for f in STRING_FIELDS), float(budget), last_fy, flags
+        )
+        self.row_count += 1
+
+    def save(self, path):
+        """Write the .omrc file atomically."""
+        encoded = [s.encode('utf-8') for s in self._strings]
+        offsets = [0]
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, CACHE_VERSION, 0, self.row_count, len(encoded), self.empty_rows))
+            f.write(self._rows)
+            f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+            for data in encoded:
+                f.write(data)
+        os.replace(tmp_path, path)
+
+
+class CachedSheet:
+    """Read-only, memory-mapped view over an .omrc file."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.row_count, string_count, self.empty_rows = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != CACHE_VERSION:
+            self.close()
+            raise ValueError(f"Not a v{CACHE_VERSION} sheet cache file: {path}")
+
+        offsets_at = HEADER.size + self.row_count * ROW.size
+        self._offsets = struct.unpack_from(f'<{string_count + 1}I', self._mm, offsets_at)
+        self._blob_at = offsets_at + (string_count + 1) * 4
+        self._decoded = [None] * string_count
+
+    def _string(self, ref):
+        if ref == NONE_REF:
+            return None
+        value = self._decoded[ref]
+        if value is None:
+            start = self._blob_at + self._offsets[ref]
+            end = self._blob_at + self._offsets[ref + 1]
+            value = self._decoded[ref] = self._mm[start:end].decode('utf-8')
+        return value
+
+    def __len__(self):
+        return self.row_count
+
+    def row(self, index):
+        """Return (row_idx, item) for the index-th cached row."""
+        values = ROW.unpack_from(self._mm, HEADER.size + index * ROW.size)
+        flags = values[10]
+        # String refs are in STRING_FIELDS order
+        header, header_desc, category, item_name, item_desc, opco, end_date = map(self._string, values[1:8])
+        item = ImportItem(
+            header, header_desc, category, item_name, item_desc,
+            0 if flags & FLAG_BUDGET_DEFAULT else values[8],
+            opco, end_date,
+            None if flags & FLAG_LAST_FY_NONE else values[9],
+            bool(flags & FLAG_ONGOING),
+        )
+        return values[0], item
+
+    def __iter__(self):
+        for index in range(self.row_count):
+            yield self.row(index)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _row_key(item):
+    return (item.headerName, item.itemName, item.opCoName)
+
+
+def sheet_delta(old_path, new_path, max_samples=MAX_DELTA_SAMPLES):
+    """
+    Compare two cached sheets by (header, item, OpCo) key.
+
+    The first row per key is compared, matching the converter's dedupe.
+
+    Returns:
+        dict with added/changed/removed counts and sample keys
+    """
+    with CachedSheet(old_path) as old:
+        previous = {}
+        for _, item in old:
+            previous.setdefault(_row_key(item), item)
+
+    added, changed = [], []
+    counts = {'added': 0, 'changed': 0, 'removed': 0}
+    seen = set()
+    with CachedSheet(new_path) as new:
+        for _, item in new:
+            key = _row_key(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            before = previous.pop(key, None)
+            if before is None:
+                counts['added'] += 1
+                if len(added) < max_samples:
+                    added.append(key)
+            elif before != item:
+                counts['changed'] += 1
+                if len(changed) < max_samples:
+                    changed.append(key)
+
+    counts['removed'] = len(previous)
+    removed = list(previous)[:max_samples]
+    return {
+        **counts,
+        'samples': {
+            'added': [list(k) for k in added],
+            'changed': [list(k) for k in changed],
+            'removed': [list(k) for k in removed],
+        },
+    }
+
+
+class WorkbookCache:
+    """On-disk cache of normalized workbook rows."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        for sub in ('workbooks', 'paths', 'sheets'):
+            os.makedirs(os.path.join(cache_dir, sub), exist_ok=True)
+
+    def _json_path(self, kind, key):
+        return os.path.join(self.cache_dir, kind, f'{key}.json')
+
+    def sheet_path(self, sheet_hash):
+        return os.path.join(self.cache_dir, 'sheets', f'{sheet_hash}.omrc')
+
+    def _dates_path(self, sheet_hash):
+        return os.path.join(self.cache_dir, 'sheets', f'{sheet_hash}.dates.json')
+
+    def _layout_path(self, sheet_hash):
+        return os.path.join(self.cache_dir, 'sheets', f'{sheet_hash}.layout.json')
+
+    def _read_json(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json(self, path, data):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _table_path(self, sheet_hash):
+        return os.path.join(self.cache_dir, 'sheets', f'{sheet_hash}.omtab')
+
+    def iter_rows(self, excel_path, state, read_only=True, table=None, profiler=None, engine=None):
+        """
+        Yield normalized (row_idx, item) pairs, from the cache when possible.
+
+        Drop-in replacement for normalize_rows(read_rows(...)). Sets
+        state.cache to a report dict: status ('hit', 'sheet-hit', 'miss'),
+        fingerprints and, for a changed sheet, the row-level delta.
+
+        If `table` is given, it is filled from the cached .omtab file (or from
+        the raw rows, which are then cached too). A `profiler` needs the raw
+        rows, so it forces a re-parse (the cache is still refreshed).
+        `engine` selects the sheet reader for a re-parse (see readers.py).
+        """
+        workbook_hash = _sha256_file(excel_path)
+        path_key = hashlib.sha1(os.path.abspath(excel_path).encode('utf-8')).hexdigest()
+        previous = self._read_json(self._json_path('paths', path_key))
+
+        status = 'hit'
+        known = self._read_json(self._json_path('workbooks', workbook_hash))
+        if known and os.path.exists(self.sheet_path(known['sheet_hash'])):
+            sheet_name, sheet_hash = known['sheet'], known['sheet_hash']
+        else:
+            sheet_name, sheet_hash = sheet_fingerprint(excel_path)
+            status = 'sheet-hit' if os.path.exists(self.sheet_path(sheet_hash)) else 'miss'
+
+        report = {
+            'status': status,
+            'workbook_hash': workbook_hash,
+            'sheet': sheet_name,
+            'sheet_hash': sheet_hash,
+            'delta': None,
+        }
+        state.cache = report
+        state.sheet = sheet_name
+
+        if status != 'miss' and table is not None and not os.path.exists(self._table_path(sheet_hash)):
+            # Rows are cached but the table was never built for this sheet
+            status = report['status'] = 'miss'
+        if status != 'miss' and profiler is not None:
+            status = report['status'] = 'miss'
+
+        if status == 'miss':
+            # Count empty rows separately: downstream stages also bump state.skipped
+            writer = SheetCacheWriter()
+            empty = ConversionState()
+            rows = read_tapped_rows(excel_path, read_only=read_only, table=table, profiler=profiler, state=state,
+                                    engine=engine)
+            for row_idx, item in normalize_rows(rows, empty):
+                writer.add(row_idx, item)
+                yield row_idx, item
+            writer.empty_rows = empty.skipped
+            state.skipped += empty.skipped
+            state.dates.extend(empty.dates)
+            self._write_json(self._dates_path(sheet_hash), empty.dates)
+            self._write_json(self._layout_path(sheet_hash), state.layout)
+            writer.save(self.sheet_path(sheet_hash))
+            if table is not None:
+                table.save(self._table_path(sheet_hash))
+        else:
+            if table is not None:
+                table.extend(ImportTable.load(self._table_path(sheet_hash)))
+            state.set_layout(self._read_json(self._layout_path(sheet_hash)))
+            with CachedSheet(self.sheet_path(sheet_hash)) as cached:
+                state.skipped += cached.empty_rows
+                yield from cached
+            state.dates.extend(self._read_json(self._dates_path(sheet_hash)) or [])
+
+        self._write_json(self._json_path('workbooks', workbook_hash),
+                         {'sheet': sheet_name, 'sheet_hash': sheet_hash})
+        self._write_json(self._json_path('paths', path_key),
+                         {'path': os.path.abspath(excel_path), 'sheet': sheet_name, 'sheet_hash': sheet_hash})
+
+        if previous and previous['sheet_hash'] != sheet_hash \
+                and os.path.exists(self.sheet_path(previous['sheet_hash'])):
+            report['delta'] = sheet_delta(self.sheet_path(previous['sheet_hash']), self.sheet_path(sheet_hash))
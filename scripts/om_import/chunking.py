@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Transaction-sized chunked export for importData
+
+`omExpense.importData` runs the whole payload inside one prisma.$transaction
+(5 minute timeout, "enough for 500+ items"). Large workbooks are split into
+chunk files that each fit comfortably inside one transaction:
+
+    - Limits: item count and estimated monthly-record count (every imported
+      item creates MONTHS_PER_ITEM OMExpenseMonthly rows)
+    - All items of one (headerName, category) group go into the same chunk, so
+      a header is never created by one transaction and filled by another
+    - A group larger than the limits gets a chunk of its own (flagged
+      "oversized" in the manifest) rather than being split
+
+A manifest.json next to the chunks records per-chunk counts and SHA-256
+checksums so chunks can be verified, loaded one at a time and resumed.
+
+Note: importMode 'replace' deletes the whole financial year before importing.
+When loading chunks, only the first chunk may use 'replace'; the remaining
+chunks must use 'skip' or 'update'.
+
+Grouping needs every item in memory (groups can be scattered across the
+sheet), so chunked export buffers the deduped items - not the raw rows.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from .writers import ImportWriter
+
+# Monthly records created per imported item (omExpense.importData Step 6)
+MONTHS_PER_ITEM = 12
+
+DEFAULT_MAX_ITEMS = 500
+DEFAULT_MAX_MONTHLY_RECORDS = DEFAULT_MAX_ITEMS * MONTHS_PER_ITEM
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+_EXTENSIONS = {'pretty': '.json', 'json': '.json', 'ndjson': '.ndjson'}
+
+
+def group_items(items):
+    """Group items by (headerName, category), preserving first-seen order."""
+    groups = {}
+    for item in items:
+        groups.setdefault((item.headerName, item.category), []).append(item)
+    return list(groups.values())
+
+
+def plan_chunks(groups, max_items=DEFAULT_MAX_ITEMS, max_monthly_records=DEFAULT_MAX_MONTHLY_RECORDS):
+    """
+    Pack header groups into chunks without splitting a group.
+
+    Groups are packed in order (first-fit on the current chunk) so chunk
+    contents follow the workbook order.
+
+    Returns:
+        list of lists of groups
+    """
+    limit = max(1, min(max_items, max_monthly_records // MONTHS_PER_ITEM))
+    chunks = []
+    current = []
+    current_size = 0
+
+    for group in groups:
+        size = len(group)
+        if current and current_size + size > limit:
+            chunks.append(current)
+            current = []
+            current_size = 0
+        current.append(group)
+        current_size += size
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_chunks(items, output_dir, base_name='import-data', fmt='json', compress=False,
+                 max_items=DEFAULT_MAX_ITEMS, max_monthly_records=DEFAULT_MAX_MONTHLY_RECORDS,
+                 source=None):
+    """
+    Split items into transaction-sized chunk files plus a manifest.
+
+    Args:
+        items: Iterable of ImportItem records (already validated and deduped)
+        output_dir: Directory for chunk files and manifest.json
+        base_name: File name prefix for chunks (<base_name>.part-0001.json)
+        fmt: Output format for chunk files (see writers.OUTPUT_FORMATS)
+        compress: Gzip chunk files
+        max_items: Maximum items per chunk
+        max_monthly_records: Maximum estimated monthly records per chunk
+        source: Source workbook path recorded in the manifest
+
+    Returns:
+        manifest dict (also written to <output_dir>/manifest.json)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    limit = max(1, min(max_items, max_monthly_records // MONTHS_PER_ITEM))
+    extension = _EXTENSIONS[fmt] + ('.gz' if compress else '')
+
+    entries = []
+    for index, chunk in enumerate(plan_chunks(group_items(items), max_items, max_monthly_records), 1):
+        file_name = f"{base_name}.part-{index:04d}{extension}"
+        path = os.path.join(output_dir, file_name)
+        item_count = 0
+        budget_total = 0.0
+        opcos = set()
+
+        with ImportWriter(path, fmt=fmt, compress=compress) as writer:
+            for group in chunk:
+                for item in group:
+                    writer.write(item)
+                    item_count += 1
+                    budget_total += item.budgetAmount or 0
+                    opcos.add(item.opCoName)
+
+        entries.append({
+            'index': index,
+            'file': file_name,
+            'items': item_count,
+            'monthlyRecords': item_count * MONTHS_PER_ITEM,
+            'headers': len(chunk),
+            'opCos': len(opcos),
+            'budgetAmount': round(budget_total, 2),
+            'oversized': item_count > limit,
+            'bytes': os.path.getsize(path),
+            'sha256': file_sha256(path),
+        })
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'source': source,
+        'createdAt': datetime.now().isoformat(timespec='seconds'),
+        'format': fmt,
+        'compressed': bool(compress),
+        'limits': {
+            'maxItems': max_items,
+            'maxMonthlyRecords': max_monthly_records,
+        },
+        'totals': {
+            'chunks': len(entries),
+            'items': sum(e['items'] for e in entries),
+            'monthlyRecords': sum(e['monthlyRecords'] for e in entries),
+            'headers': sum(e['headers'] for e in entries),
+        },
+        'chunks': entries,
+    }
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    return manifest
+
+
+def load_manifest(output_dir):
+    """Read manifest.json from a chunk directory."""
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def verify_chunk(output_dir, entry):
+    """Return True if a chunk file exists and matches its manifest checksum."""
+    path = os.path.join(output_dir, entry['file'])
+    return os.path.exists(path) and file_sha256(path) == entry['sha256']
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: One command line for the OM Expense data import scripts
+
+    python scripts/om-import.py <command> [options]
+    python -m om_import <command> [options]        (from scripts/)
+
+Each command runs the main() of one of the standalone scripts, which stay
+runnable on their own:
+
+    convert      convert-excel-to-import-json.py
+    analyze      analyze-import-data.py
+    extract      extract-screenshot-data.py
+    reconcile    reconcile-extracted-budget.py
+    fix-imports  fix-duplicate-imports.py
+
+Start-up is kept to the interpreter plus the command that runs: this module
+imports nothing beyond os / sys / importlib (the top-level help is plain
+text, not argparse), a script is loaded only once its command is chosen, and
+the scripts import their heavy dependencies (openpyxl, the conversion
+pipeline, process pools) inside the functions that use them, so
+`<command> --help` never loads them. Importing a script has no side
+effects - its functions can be used from other code (see
+benchmark-om-import.py). `benchmark-om-import.py --startup` measures the
+start-up time of every command.
+"""
+
+import importlib.util
+import os
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROG = 'om-import.py'
+
+# command -> (script in SCRIPTS_DIR, summary)
+COMMANDS = {
+    'convert': ('convert-excel-to-import-json.py', 'Convert an OM Expense workbook (or many) to importData JSON'),
+    'analyze': ('analyze-import-data.py', 'Profile an OM Expense import workbook into an analysis report'),
+    'extract': ('extract-screenshot-data.py', 'Extract an IT Annual Maintenance Budget workbook to JSON'),
+    'reconcile': ('reconcile-extracted-budget.py', 'Reconcile subtotals and totals of extracted budget JSON'),
+    'fix-imports': ('fix-duplicate-imports.py', 'Merge duplicate import statements in the TS/JS sources'),
+}
+
+
+def load_script(file_name):
+    """Import one of the hyphenated scripts in SCRIPTS_DIR as a module."""
+    name = file_name[:-3].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def usage(prog=PROG):
+    width = max(len(name) for name in COMMANDS) + 2
+    lines = [
+        f"usage: {prog} <command> [options]",
+        "",
+        "OM Expense data import tools.",
+        "",
+        "commands:",
+    ]
+    lines += [f"  {name:<{width}} {summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ["", f"Run '{prog} <command> --help' for the options of a command."]
+    return '\n'.join(lines)
+
+
+def main(argv=None, prog=PROG):
+    """
+    Run a command.
+
+    Returns:
+        exit status (the command's main() may also call sys.exit itself)
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage(prog))
+        return 0 if argv else 1
+    if argv[0] == 'help' and len(argv) > 1:
+        argv = [argv[1], '--help']
+
+    command = argv[0]
+    if command not in COMMANDS:
+        print(f"[ERROR] Unknown command: {command} (choose from {', '.join(COMMANDS)})")
+        return 1
+    script = load_script(COMMANDS[command][0])
+    return script.main(argv[1:], prog=f"{prog} {command}") or 0
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Multi-currency normalization of the budget columns
+
+The import layout carries each budget three times - G (USD), H (HKD) and
+I (MOP) - but normalize_rows() reads G only, so a row with a blank G
+becomes budgetAmount 0 (safe_float's default) even when H or I has the
+amount. This stage sits between reading and normalizing the raw rows:
+
+    check  - compare G with H and I converted to USD and report rows whose
+             columns disagree by more than `tolerance` (relative)
+    fill   - the same, and write the converted amount into a blank G
+             (HKD first, then MOP), so budgetAmount is no longer 0
+
+Rows are processed in blocks (DEFAULT_BLOCK_SIZE): each block's G / H / I
+columns become typed arrays (NaN = blank) and are converted and compared
+as whole columns, so streaming conversions keep bounded memory.
+
+Rates follow the app's Currency.exchangeRate convention - units of the
+currency per 1 USD ("1 USD = exchangeRate HKD", see DualCurrency.tsx) - and
+come from, in order:
+
+    DEFAULT_RATES            HKD 7.8 (the peg), MOP 8.034 (HK$1 = MOP1.03)
+    --currency-rates FILE    one or more of:
+                             {"HKD": 7.8, ...} or a RateTable.to_dict() file
+                             an export of currency.getAll / getActive (a list
+                             of Currency rows or the tRPC response envelope)
+                             an extracted budget document whose metadata has
+                             "exchange_rate": "JPY1 = 0.060" (local currency HKD)
+
+load_rate_table() caches each file by path and modification time, so the
+table is parsed once per process however often it is asked for.
+"""
+
+import json
+import math
+import os
+import re
+from array import array
+from functools import lru_cache
+
+DEFAULT_RATES = {'USD': 1.0, 'HKD': 7.8, 'MOP': 8.034}
+
+# (currency, 0-based Excel column) of the budget amounts in the import layout
+BUDGET_COLUMNS = (('USD', 6), ('HKD', 7), ('MOP', 8))
+
+CURRENCY_MODES = ('check', 'fill')
+DEFAULT_TOLERANCE = 0.01
+DEFAULT_BLOCK_SIZE = 4096
+DEFAULT_MAX_SAMPLES = 20
+
+# Below this (in USD) two amounts always agree, whatever the relative difference
+CENT = 0.01
+
+NAN = float('nan')
+
+_RATE_TEXT = re.compile(r'([A-Z]{3})\s*1\s*=\s*([A-Z]{3})?\s*([\d.]+)')
+
+
+def _to_number(value):
+    """Cell value as float, NaN when blank or not numeric."""
+    if value is None or isinstance(value, bool):
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class RateTable:
+    """Units of each currency per 1 USD, with where each rate came from."""
+
+    def __init__(self, rates=None, source='default'):
+        self.rates = {}
+        self.sources = {}
+        self.update(DEFAULT_RATES, 'default')
+        if rates:
+            self.update(rates, source)
+
+    def update(self, rates, source):
+        for code, rate in rates.items():
+            if rate is None:
+                continue
+            rate = float(rate)
+            if not rate > 0 or not math.isfinite(rate):
+                raise ValueError(f"Invalid exchange rate for {code}: {rate}")
+            self.rates[code.upper()] = rate
+            self.sources[code.upper()] = source
+
+    def per_usd(self, code):
+        try:
+            return self.rates[code]
+        except KeyError:
+            raise ValueError(f"No exchange rate for {code}") from None
+
+    def to_dict(self):
+        return {'base': 'USD', 'rates': dict(self.rates), 'sources': dict(self.sources)}
+
+
+def parse_rate_text(text, local='HKD', rates=None):
+    """
+    'JPY1 = 0.060' (1 JPY = 0.060 of the local currency) -> ('JPY', units per USD).
+
+    Returns None when the text is not a rate.
+    """
+    match = _RATE_TEXT.search(text or '')
+    if not match:
+        return None
+    code, quote, value = match.group(1), match.group(2) or local, float(match.group(3))
+    if value <= 0:
+        return None
+    quote_per_usd = (rates or DEFAULT_RATES).get(quote)
+    if quote_per_usd is None:
+        return None
+    return code, quote_per_usd / value
+
+
+def rates_from_document(data):
+    """Rates of a rate file, a currency router export or an extracted document, as {code: per USD}."""
+    if isinstance(data, dict) and 'result' in data:
+        data = data['result'].get('data', {})
+        data = data.get('json', data)
+    if isinstance(data, list):
+        # currency.getAll / getActive: Currency rows, exchangeRate = units per 1 USD
+        return {row['code']: row.get('exchangeRate') for row in data
+                if isinstance(row, dict) and row.get('code') and row.get('exchangeRate')}
+    if isinstance(data, dict) and isinstance(data.get('metadata'), dict):
+        parsed = parse_rate_text(data['metadata'].get('exchange_rate'))
+        return dict([parsed]) if parsed else {}
+    if isinstance(data, dict):
+        rates = data.get('rates', data)
+        return {code: rate for code, rate in rates.items() if isinstance(rate, (int, float))}
+    raise ValueError("Unrecognized rate file")
+
+
+@lru_cache(maxsize=32)
+def _read_rates(path, mtime_ns, size):
+    with open(path, encoding='utf-8') as f:
+        return tuple(sorted(rates_from_document(json.load(f)).items()))
+
+
+def load_rate_table(paths=()):
+    """
+    DEFAULT_RATES overlaid with the rates of each file in `paths` (later files win).
+
+    Files are parsed once per (path, mtime, size) and then served from cache.
+    """
+    table = RateTable()
+    for path in paths:
+        path = os.path.abspath(path)
+        info = os.stat(path)
+        table.update(dict(_read_rates(path, info.st_mtime_ns, info.st_size)), os.path.basename(path))
+    return table
+
+
+class CurrencyReport:
+    """Counters and capped disagreement samples of the currency stage."""
+
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.rows = 0
+        self.usd_blank = 0
+        self.fillable = 0               # blank G with an H / I amount ('check' mode)
+        self.filled = {'HKD': 0, 'MOP': 0}
+        self.unfilled = 0               # no amount in any currency column
+        self.checked = 0
+        self.disagreements = 0
+        self.samples = []
+
+    def merge(self, other, file=None):
+        """Add another report's to_dict() (e.g. from a worker process)."""
+        self.rows += other['rows']
+        self.usd_blank += other['usd_blank']
+        self.fillable += other['fillable']
+        for code, count in other['filled'].items():
+            self.filled[code] = self.filled.get(code, 0) + count
+        self.unfilled += other['unfilled']
+        self.checked += other['checked']
+        self.disagreements += other['disagreements']
+        for sample in other['samples'][:max(0, self.max_samples - len(self.samples))]:
+            self.samples.append({**sample, 'file': file} if file else sample)
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'usd_blank': self.usd_blank,
+            'fillable': self.fillable,
+            'filled': dict(self.filled),
+            'unfilled': self.unfilled,
+            'checked': self.checked,
+            'disagreements': self.disagreements,
+            'truncated': self.disagreements > len(self.samples),
+            'samples': self.samples,
+        }
+
+
+class CurrencyNormalizer:
+    """
+    The currency stage: apply(rows, report) passes raw (row_idx, row) pairs
+    through, checking (and in 'fill' mode filling) column G block by block.
+
+    Holds configuration only (picklable for worker processes); counters go
+    to the CurrencyReport given to apply().
+    """
+
+    def __init__(self, rates=None, mode='check', tolerance=DEFAULT_TOLERANCE, block_size=DEFAULT_BLOCK_SIZE):
+        if mode not in CURRENCY_MODES:
+            raise ValueError(f"Unknown currency mode: {mode}")
+        self.rates = rates or RateTable()
+        self.mode = mode
+        self.tolerance = tolerance
+        self.block_size = block_size
+        # Fail now rather than on the first block
+        self.hkd = self.rates.per_usd('HKD')
+        self.mop = self.rates.per_usd('MOP')
+
+    def new_report(self):
+        return CurrencyReport()
+
+    def apply(self, rows, report):
+        block = []
+        for pair in rows:
+            block.append(pair)
+            if len(block) >= self.block_size:
+                yield from self._process(block, report)
+                block = []
+        if block:
+            yield from self._process(block, report)
+
+    def _differs(self, a, b):
+        difference = abs(a - b)
+        return difference > CENT and difference > self.tolerance * max(abs(a), abs(b))
+
+    def _process(self, block, report):
+        usd = array('d', (_to_number(row[6]) for _, row in block))
+        hkd = array('d', (_to_number(row[7]) for _, row in block))
+        mop = array('d', (_to_number(row[8]) for _, row in block))
+        # Whole-column conversions; NaN stays NaN
+        from_hkd = array('d', (v / self.hkd for v in hkd))
+        from_mop = array('d', (v / self.mop for v in mop))
+
+        fill = self.mode == 'fill'
+        report.rows += len(block)
+        for i, (u, h, m) in enumerate(zip(usd, from_hkd, from_mop)):
+            pair = block[i]
+            known = [v for v in (u, h, m) if v == v]
+            if len(known) > 1:
+                report.checked += 1
+                if any(self._differs(known[0], other) for other in known[1:]) or (
+                        len(known) == 3 and self._differs(known[1], known[2])):
+                    self._disagree(report, pair[0], u, hkd[i], mop[i], h, m)
+            if u != u:
+                report.usd_blank += 1
+                if h == h or m == m:
+                    if fill:
+                        value = round(h if h == h else m, 2)
+                        row = pair[1]
+                        block[i] = (pair[0], row[:6] + (value,) + row[7:])
+                        report.filled['HKD' if h == h else 'MOP'] += 1
+                    else:
+                        report.fillable += 1
+                else:
+                    report.unfilled += 1
+        return block
+
+    def _disagree(self, report, row_idx, usd, hkd, mop, from_hkd, from_mop):
+        report.disagreements += 1
+        if len(report.samples) >= report.max_samples:
+            return
+        values = [v for v in (usd, from_hkd, from_mop) if v == v]
+        spread = (max(values) - min(values)) / max(abs(v) for v in values) if any(values) else 0.0
+
+        def clean(value, digits=2):
+            return None if value != value else round(value, digits)
+
+        report.samples.append({
+            'row': row_idx,
+            'usd': clean(usd),
+            'hkd': clean(hkd),
+            'mop': clean(mop),
+            'usd_from_hkd': clean(from_hkd),
+            'usd_from_mop': clean(from_mop),
+            'difference_pct': round(spread * 100, 2),
+        })
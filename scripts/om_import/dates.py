@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Column-level date parsing for OM Expense import
+
+format_date() tries up to four strptime formats per cell and decides
+day/month order row by row, so one column can silently mix 03/04/2026 read
+as 3 Apr and 04/13/2026 read as 13 Apr. DateColumnParser instead:
+
+    1. Infers the day/month order once per column from a sample of values
+       and locks it in. A column whose sample fits both orders is reported as
+       ambiguous, one whose sample needs both orders is reported as mixed;
+       either way one order is used for every row (day-first, like
+       format_date's format priority).
+    2. Parses with precompiled regexes instead of raised ValueErrors.
+    3. Memoizes results per raw value (end dates repeat heavily).
+    4. Handles Excel serial numbers (45747 -> 2025-03-31), month-year values
+       such as "Jul-26" (-> last day of the month, 2026-07-31), "3-Nov-25",
+       and sentinels such as "on-going" / "TBC" (-> None). parse_outcome()
+       also tells an ongoing item ("on-going") apart from a missing date
+       ("n/a", "TBC"), so the caller can set isOngoing.
+
+Values that match no known format are returned stripped, as format_date()
+does, and counted in the column report.
+"""
+
+import calendar
+import re
+from datetime import date, datetime, timedelta
+
+DATE_SAMPLE_SIZE = 200
+
+# Strings that mean "no end date" in Finance's sheets (compared lower-cased)
+SENTINELS = frozenset({
+    'on-going', 'ongoing', 'on going', 'n/a', 'na', 'tbc', 'tbd', '-', '--', 'nil', 'none',
+})
+# The sentinels that mark an ongoing item (importData's isOngoing) rather than
+# an unknown end date
+ONGOING = frozenset({'on-going', 'ongoing', 'on going'})
+
+# Excel's day zero (serial 1 = 1900-01-01, including the 1900 leap-year bug)
+EXCEL_EPOCH = date(1899, 12, 30)
+# Serials accepted as dates: 1954-10-03 .. 2099-12-31
+SERIAL_RANGE = (20000, 73415)
+
+MONTHS = {name.lower(): index for index, name in enumerate(calendar.month_abbr) if name}
+
+_YMD = re.compile(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:[ T]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?$')
+_SLASH = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})$')
+_DAY_MON_YEAR = re.compile(r'(\d{1,2})[- ]([A-Za-z]{3})[A-Za-z]*\.?[- ](\d{4}|\d{2})$')
+_MON_YEAR = re.compile(r'([A-Za-z]{3})[A-Za-z]*\.?[- ](\d{4}|\d{2})$')
+
+MAX_MEMO_ENTRIES = 100000
+MAX_UNPARSED_SAMPLES = 10
+
+
+def _year(text):
+    year = int(text)
+    if len(text) == 2:
+        year += 2000 if year < 70 else 1900
+    return year
+
+
+def _iso(year, month, day):
+    """Return YYYY-MM-DD, or None for impossible dates."""
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def _slash_candidates(a, b, year):
+    """Return {'dmy': iso, 'mdy': iso} for the orders that give a valid date."""
+    candidates = {}
+    dmy = _iso(year, b, a)
+    if dmy:
+        candidates['dmy'] = dmy
+    mdy = _iso(year, a, b)
+    if mdy:
+        candidates['mdy'] = mdy
+    return candidates
+
+
+def serial_to_iso(value):
+    """Convert an Excel serial day number to YYYY-MM-DD, or None if out of range."""
+    if isinstance(value, bool) or not SERIAL_RANGE[0] <= value <= SERIAL_RANGE[1]:
+        return None
+    return (EXCEL_EPOCH + timedelta(days=int(value))).isoformat()
+
+
+def parse_unambiguous(text):
+    """
+    Parse formats whose field order is fixed (ISO, 3-Nov-25, Jul-26).
+
+    Returns:
+        YYYY-MM-DD string, or None if text is not in one of these formats
+    """
+    m = _YMD.match(text)
+    if m:
+        return _iso(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    m = _DAY_MON_YEAR.match(text)
+    if m and m.group(2).lower() in MONTHS:
+        return _iso(_year(m.group(3)), MONTHS[m.group(2).lower()], int(m.group(1)))
+    m = _MON_YEAR.match(text)
+    if m and m.group(1).lower() in MONTHS:
+        year, month = _year(m.group(2)), MONTHS[m.group(1).lower()]
+        return _iso(year, month, calendar.monthrange(year, month)[1])
+    return None
+
+
+class DateColumnParser:
+    """Parses one column's date cells with a per-column day/month order."""
+
+    def __init__(self, field, column=None):
+        self.field = field
+        self.column = column
+        self.order = 'dmy'
+        self.ambiguous = False
+        self.mixed = False
+        self._memo = {}
+        self.counts = {'parsed': 0, 'serials': 0, 'sentinels': 0, 'ongoing': 0, 'unparsed': 0, 'memo_hits': 0}
+        self.unparsed_samples = []
+
+    def infer(self, values):
+        """Lock the day/month order from a sample of raw cell values."""
+        orders = {'dmy': 0, 'mdy': 0}
+        fits_both = 0
+        for value in values:
+            if not isinstance(value, str):
+                continue
+            m = _SLASH.match(value.strip())
+            if not m:
+                continue
+            candidates = _slash_candidates(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+            if len(candidates) == 2:
+                fits_both += 1
+            elif candidates:
+                orders[next(iter(candidates))] += 1
+
+        if orders['dmy'] and orders['mdy']:
+            self.mixed = True
+            self.order = 'mdy' if orders['mdy'] > orders['dmy'] else 'dmy'
+        elif orders['mdy']:
+            self.order = 'mdy'
+        elif orders['dmy']:
+            self.order = 'dmy'
+        elif fits_both:
+            # Every sampled slash date fits both orders: keep day-first, report it
+            self.ambiguous = True
+        self._memo.clear()
+        return self
+
+    def parse(self, value):
+        """Convert one raw cell value to YYYY-MM-DD (or None / stripped text)."""
+        return self.parse_outcome(value)[0]
+
+    def parse_outcome(self, value):
+        """
+        Convert one raw cell value, returning (result, outcome).
+
+        outcome is the self.counts entry the value was counted under, e.g.
+        'ongoing' for "on-going" (result None), or None for an empty cell.
+        """
+        if value is None:
+            return None, None
+        if isinstance(value, datetime):
+            self.counts['parsed'] += 1
+            return value.strftime('%Y-%m-%d'), 'parsed'
+        if isinstance(value, date):
+            self.counts['parsed'] += 1
+            return value.isoformat(), 'parsed'
+
+        try:
+            result = self._memo[value]
+        except KeyError:
+            pass
+        except TypeError:
+            return str(value), None
+        else:
+            self.counts['memo_hits'] += 1
+            self.counts[result[1]] += 1
+            return result
+
+        result = self._parse_uncached(value)
+        if len(self._memo) < MAX_MEMO_ENTRIES:
+            self._memo[value] = result
+        self.counts[result[1]] += 1
+        if result[1] == 'unparsed' and len(self.unparsed_samples) < MAX_UNPARSED_SAMPLES:
+            self.unparsed_samples.append(str(value))
+        return result
+
+    def _parse_uncached(self, value):
+        """Return (result, outcome) where outcome names a self.counts entry."""
+        if isinstance(value, (int, float)):
+            iso = serial_to_iso(value)
+            if iso:
+                return iso, 'serials'
+            return str(value), 'unparsed'
+        if not isinstance(value, str):
+            return str(value), 'unparsed'
+
+        text = value.strip()
+        if not text:
+            return None, 'sentinels'
+        lowered = text.lower()
+        if lowered in ONGOING:
+            return None, 'ongoing'
+        if lowered in SENTINELS:
+            return None, 'sentinels'
+
+        iso = parse_unambiguous(text)
+        if iso:
+            return iso, 'parsed'
+
+        m = _SLASH.match(text)
+        if m:
+            candidates = _slash_candidates(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+            iso = candidates.get(self.order)
+            if iso:
+                return iso, 'parsed'
+            # Impossible in the locked order (e.g. 13/31/2026 in a d/m column)
+            return text, 'unparsed'
+
+        return text, 'unparsed'
+
+    def report(self):
+        """Return the column report dict."""
+        return {
+            'field': self.field,
+            'column': self.column,
+            'order': self.order,
+            'ambiguous': self.ambiguous,
+            'mixed': self.mixed,
+            **self.counts,
+            'unparsed_samples': list(self.unparsed_samples),
+        }
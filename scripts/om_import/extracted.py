@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Flattening of screenshot-extraction JSON
+
+docs/om-expense-*-extracted.json files (written by extract-screenshot-data.py)
+nest items two ways: directly under a header, or under a header's
+sub_sections. The category is set per document (screenshot extraction) or
+per header (whole-workbook extraction, docs/om-expense-rhk-extracted.json).
+
+flatten_items() turns a document into one flat record per item, in document
+order, carrying its header (and sub-section) context:
+
+    {
+        'category': 'A) Datalines',
+        'header_number': 4,
+        'header': 'Internet Lines',
+        'section': '4.1 HGC',          # None for items directly under the header
+        'item_number': 'ii)',
+        'name': '...',
+        'budget_us': 738, 'budget_hk': 5760, ...   # the item's own fields
+    }
+"""
+
+
+def iter_items(document):
+    """Yield the flat items of one extracted document (see module docstring)."""
+    category = document.get('category')
+    for header in document.get('headers', []):
+        context = {
+            'category': header.get('category', category),
+            'header_number': header.get('number'),
+            'header': header.get('name'),
+        }
+        for item in header.get('items', []):
+            yield {**context, 'section': None, **item}
+        for section in header.get('sub_sections', []):
+            for item in section.get('items', []):
+                yield {**context, 'section': section.get('name'), **item}
+
+
+def flatten_items(document):
+    """Return the flat items of one extracted document as a list."""
+    return list(iter_items(document))
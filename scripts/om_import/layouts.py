@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Header-driven layout profiles for OM Expense import workbooks
+
+The pipeline reads rows in the import layout (A..N, see
+convert-excel-to-import-json.py): normalize_rows, the budget table, the
+profiler and the currency stage all index cells by those positions. Finance's
+workbooks do not always have that shape - v1 has no "Last FY Actual Expense"
+column, and columns get inserted or moved between versions.
+
+A LayoutProfile declares, per import-layout column, the header titles it is
+recognized by. read_rows() matches the registered profiles (LAYOUT_PROFILES,
+most specific first) against the header row once; the first profile whose
+required columns are all present is compiled into a CompiledLayout whose
+extract() is a single itemgetter over the row: every data row comes out as a
+14-cell tuple in import-layout order, with None for a column the workbook
+does not have, without any per-cell branching.
+
+Header titles are compared after normalization (case, punctuation and a
+leading financial year such as "FY26" are ignored), so
+"FY26 OM Expense Budget Amount (USD)" and "fy27 om expense budget amount usd"
+are the same title. Where the year is all that tells two columns apart
+("FY25 Actual OM Expense Charges" next to "FY26 Actual OM Expense Charges"),
+a column declared with earliest_year=True takes the earliest one - last FY's
+actuals. When no profile matches, read_rows raises LayoutError naming the
+missing columns of each profile - before any row is converted. It also raises
+when the matched profile leaves out a column that the header row appears to
+have under an unknown title (LOOKALIKE_TITLES, e.g. an "... Actual ..."
+column when falling back to v1), rather than importing that column as null.
+
+New layouts are added with register_profile(LayoutProfile(...)).
+"""
+
+import re
+from operator import itemgetter
+
+# Import layout columns: (key, 0-based index, Excel letter)
+IMPORT_COLUMNS = (
+    ('row_number', 0, 'A'),
+    ('header_name', 1, 'B'),
+    ('header_description', 2, 'C'),
+    ('item_name', 3, 'D'),
+    ('item_description', 4, 'E'),
+    ('category', 5, 'F'),
+    ('budget_usd', 6, 'G'),
+    ('budget_hkd', 7, 'H'),
+    ('budget_mop', 8, 'I'),
+    ('opco', 9, 'J'),
+    ('start_date', 10, 'K'),
+    ('contact', 11, 'L'),
+    ('end_date', 12, 'M'),
+    ('last_fy_actual', 13, 'N'),
+)
+IMPORT_WIDTH = len(IMPORT_COLUMNS)
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+_FINANCIAL_YEAR = re.compile(r'^fy ?(\d{2,4}) ')
+
+# Import column -> pattern of normalized titles that probably mean it; such a
+# header left unmapped by a profile without the column is an error
+LOOKALIKE_TITLES = {
+    'last_fy_actual': re.compile(r'\bactual\b'),
+}
+
+
+class LayoutError(ValueError):
+    """The header row matches no registered layout profile."""
+
+
+def normalize_title(value):
+    """
+    'FY26 OM Expense Budget Amount (USD)' -> 'om expense budget amount usd'.
+    Titles without letters or digits ('#') are kept as they are.
+    """
+    if value is None:
+        return ''
+    raw = str(value).strip()
+    text = _NON_WORD.sub(' ', raw.casefold()).strip()
+    return _FINANCIAL_YEAR.sub('', text) if text else raw
+
+
+def financial_year(value):
+    """'FY25 Actual OM Expense Charges' -> 2025; None without a leading financial year."""
+    if value is None:
+        return None
+    match = _FINANCIAL_YEAR.match(_NON_WORD.sub(' ', str(value).casefold()).strip())
+    if match is None:
+        return None
+    year = int(match.group(1))
+    return year + 2000 if year < 100 else year
+
+
+def column_letter(index):
+    """0-based column index -> Excel letter (0 -> 'A', 26 -> 'AA')."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+class LayoutColumn:
+    """One import-layout column and the header titles it appears under."""
+
+    def __init__(self, key, titles, required=True, earliest_year=False):
+        self.key = key
+        self.label = titles[0]              # for error messages
+        self.titles = frozenset(normalize_title(title) for title in titles) - {''}
+        self.required = required
+        # Several matching headers: take the earliest financial year, not the leftmost
+        self.earliest_year = earliest_year
+
+
+class LayoutProfile:
+    """A named set of LayoutColumns; columns not listed are always None."""
+
+    def __init__(self, name, description, columns):
+        self.name = name
+        self.description = description
+        self.columns = columns
+        known = {key for key, _, _ in IMPORT_COLUMNS}
+        for column in columns:
+            if column.key not in known:
+                raise ValueError(f"Unknown import column in layout {name}: {column.key}")
+
+    def match(self, header_row):
+        """
+        Locate every column of the profile in the header row.
+
+        Returns:
+            (CompiledLayout or None, titles of the missing required columns)
+        """
+        titles = [normalize_title(cell) for cell in header_row]
+        taken = set()
+        sources = {}
+        missing = []
+        for column in self.columns:
+            candidates = [i for i, title in enumerate(titles) if title in column.titles and i not in taken]
+            if not candidates:
+                if column.required:
+                    missing.append(f"'{column.label}'")
+                continue
+            index = candidates[0]
+            if column.earliest_year and len(candidates) > 1:
+                years = {i: financial_year(header_row[i]) for i in candidates}
+                dated = [i for i in candidates if years[i] is not None]
+                if dated:
+                    index = min(dated, key=lambda i: (years[i], i))
+            taken.add(index)
+            sources[column.key] = index
+        if missing:
+            return None, missing
+        return CompiledLayout(self, sources, header_row), []
+
+
+class CompiledLayout:
+    """
+    A profile bound to one header row.
+
+    extract(row) returns the row's cells in import-layout order. Rows must be
+    read with max_col=width (see read_rows): the itemgetter runs over
+    row + padding, so a cell past the end of a short row and a column the
+    workbook lacks (mapped to index `width`) both come out as None.
+    """
+
+    def __init__(self, profile, sources, header_row):
+        self.profile = profile
+        self.sources = sources                  # column key -> 0-based source index
+        self.width = max(sources.values()) + 1
+        indexes = tuple(sources.get(key, self.width) for key, _, _ in IMPORT_COLUMNS)
+        self.identity = indexes == tuple(range(IMPORT_WIDTH))
+        self._getter = itemgetter(*indexes)
+        self._padding = (None,) * (self.width + 1)
+        self.header_row = list(header_row)
+        used = set(sources.values())
+        self.unmapped = [str(cell) for i, cell in enumerate(header_row)
+                         if i not in used and cell is not None and str(cell).strip()]
+
+    def extract(self, row):
+        return self._getter(row + self._padding)
+
+    def to_dict(self):
+        return {
+            'profile': self.profile.name,
+            'identity': self.identity,
+            'columns': {key: column_letter(index) for key, index in self.sources.items()},
+            'missing_optional': [column.key for column in self.profile.columns if column.key not in self.sources],
+            'unmapped_headers': self.unmapped,
+        }
+
+
+_V2_COLUMNS = (
+    LayoutColumn('row_number', ('#', 'No', 'No.', 'Row'), required=False),
+    LayoutColumn('header_name', ('OM Expense Header', 'Header Name', 'Header')),
+    LayoutColumn('header_description', ('OM Expense Description', 'Header Description')),
+    LayoutColumn('item_name', ('OM Expense Item Details', 'Item Name', 'Item')),
+    LayoutColumn('item_description', ('OM Expense Item Details Description', 'Item Description')),
+    LayoutColumn('category', ('Expense Category', 'Category')),
+    LayoutColumn('budget_usd', ('OM Expense Budget Amount (USD)', 'Budget Amount (USD)', 'Budget (USD)')),
+    LayoutColumn('budget_hkd', ('OM Expense Budget Amount (HKD)', 'Budget Amount (HKD)', 'Budget (HKD)'),
+                 required=False),
+    LayoutColumn('budget_mop', ('OM Expense Budget Amount (MOP)', 'Budget Amount (MOP)', 'Budget (MOP)'),
+                 required=False),
+    LayoutColumn('opco', ('Charge to OpCos', 'Charge to OpCo', 'OpCo', 'OpCos')),
+    LayoutColumn('start_date', ('Start', 'Start Date'), required=False),
+    LayoutColumn('contact', ('Contact',), required=False),
+    LayoutColumn('end_date', ('OM Expense End Date', 'End Date')),
+)
+# Finance titles it "FY25 Actual OM Expense Charges" (next to the unimported FY26 one)
+_LAST_FY_ACTUAL = LayoutColumn('last_fy_actual', ('Last FY Actual Expense', 'Last FY Actual',
+                                                  'FY25 Actual OM Expense Charges'), earliest_year=True)
+
+# Most specific first: a v2 sheet also satisfies v1 (minus the last-FY column)
+LAYOUT_PROFILES = [
+    LayoutProfile('om-expense-v2', 'OM Expense import data v2 (with Last FY Actual Expense)',
+                  _V2_COLUMNS + (_LAST_FY_ACTUAL,)),
+    LayoutProfile('om-expense-v1', 'OM Expense import data v1 (no Last FY Actual Expense)', _V2_COLUMNS),
+]
+
+
+def layout_letters(layout):
+    """Import-layout letter -> workbook letter of a CompiledLayout.to_dict(), for cell addresses."""
+    columns = layout['columns']
+    return {letter: columns[key] for key, _, letter in IMPORT_COLUMNS if key in columns}
+
+
+def register_profile(profile, first=True):
+    """Add a profile to the registry; `first` makes it win over the built-in ones."""
+    if first:
+        LAYOUT_PROFILES.insert(0, profile)
+    else:
+        LAYOUT_PROFILES.append(profile)
+
+
+def match_layout(header_row, sheet=None, profiles=None):
+    """
+    Compile the first profile that matches the header row.
+
+    Raises:
+        LayoutError: listing what each profile is missing, or naming an
+            unmapped header that looks like a column the matched profile lacks
+    """
+    header_row = tuple(header_row or ())
+    where = f"Header row of sheet '{sheet}'" if sheet else "Header row"
+    reasons = []
+    for profile in LAYOUT_PROFILES if profiles is None else profiles:
+        layout, missing = profile.match(header_row)
+        if layout is not None:
+            _check_lookalikes(layout, where)
+            return layout
+        reasons.append(f"{profile.name} is missing {', '.join(missing)}")
+    titles = [str(cell) for cell in header_row if cell is not None and str(cell).strip()]
+    if not titles:
+        raise LayoutError(f"{where} is empty: expected the import column titles in row 1")
+    raise LayoutError(f"{where} matches no known layout ({'; '.join(reasons)}). "
+                      f"Found: {', '.join(titles)}")
+
+
+def _check_lookalikes(layout, where):
+    """Raise LayoutError if an unmapped header looks like a column the layout reads as None."""
+    for key, pattern in LOOKALIKE_TITLES.items():
+        if key in layout.sources:
+            continue
+        lookalikes = [title for title in layout.unmapped if pattern.search(normalize_title(title))]
+        if lookalikes:
+            raise LayoutError(
+                f"{where} matched {layout.profile.name}, which has no {key} column, but "
+                f"{', '.join(repr(t) for t in lookalikes)} looks like one: its values would be imported as "
+                f"null. Rename the column (e.g. to '{_LAST_FY_ACTUAL.label}') or register a layout profile")
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Opt-in per-stage instrumentation for the conversion pipeline
+
+The pipeline stages are nested generators (see pipeline.py), so the time a
+stage spends producing one row includes the time its upstream stage spent
+producing the rows it consumed. PipelineMetrics.stage() wraps each generator
+and charges every step the *exclusive* difference:
+
+    read       openpyxl row iteration (first step includes opening the workbook)
+    tap        feeding the ImportTable / ImportProfiler (only when enabled)
+    cache      rows replayed from the workbook cache (replaces read..normalize)
+    workers    merged results of the process pool (multi-workbook input)
+    normalize  cell conversion, date inference and parsing
+    validate   required-field checks
+    dedupe     (header, item, OpCo) key check
+    write      JSON serialization and output (time spent by the consumer)
+
+For every stage the report has rows in / out, wall and CPU seconds and rows
+per second. It also lists the slowest individual rows (read / normalize) and
+the conversion cost per column (median and mean), sampled on every
+`column_sample`-th row.
+
+Memory: by default only the process peak RSS is reported (Unix). With
+trace_memory=True tracemalloc also records the peak Python heap and each
+stage's net allocated bytes - the heap growth it leaves behind, e.g. the
+dedupe key set (negative when a stage frees more than it allocates). Tracing
+slows the pipeline down several times over, so it is a separate option.
+
+Timings include the instrumentation overhead; use them to compare stages,
+and benchmark-om-import.py for absolute throughput.
+"""
+
+import heapq
+import statistics
+import sys
+import time
+import tracemalloc
+from array import array
+
+from .dates import DateColumnParser
+from .normalize import safe_float, safe_string
+
+DEFAULT_SLOW_ROWS = 10
+DEFAULT_COLUMN_SAMPLE = 100
+
+# Converter per import field, as normalize_rows() applies them: (field, column index, converter)
+COLUMN_CONVERTERS = (
+    ('headerName', 1, safe_string),
+    ('headerDescription', 2, safe_string),
+    ('itemName', 3, safe_string),
+    ('itemDescription', 4, safe_string),
+    ('category', 5, safe_string),
+    ('budgetAmount', 6, lambda value: safe_float(value, 0)),
+    ('opCoName', 9, safe_string),
+    ('endDate', 12, None),              # DateColumnParser.parse, see ColumnSampler
+    ('lastFYActualExpense', 13, lambda value: safe_float(value, None) if value is not None else None),
+)
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:     # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageMetrics:
+    """Exclusive counters for one pipeline stage."""
+
+    def __init__(self, name, upstream=None, traced=False):
+        self.name = name
+        self.upstream = upstream
+        self.traced = traced
+        self.rows_out = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.allocated = 0
+        self.first_step = None
+        # Including upstream stages, for the next stage's subtraction
+        self.inclusive = [0.0, 0.0, 0]
+
+    def report(self, total_wall):
+        rows_in = self.upstream.rows_out if self.upstream is not None else None
+        return {
+            'name': self.name,
+            'rows_in': rows_in,
+            'rows_out': self.rows_out,
+            'wall_seconds': round(self.wall, 4),
+            'cpu_seconds': round(self.cpu, 4),
+            'share': round(self.wall / total_wall, 4) if total_wall else None,
+            'rows_per_second': round((rows_in or self.rows_out) / self.wall) if self.wall else None,
+            'allocated_bytes': self.allocated if self.traced else None,
+            'first_step_seconds': round(self.first_step, 4) if self.first_step is not None else None,
+        }
+
+
+class ColumnSampler:
+    """Conversion time per column over sampled raw rows."""
+
+    def __init__(self, every=DEFAULT_COLUMN_SAMPLE):
+        self.every = every
+        self.seen = 0
+        self.nanos = [array('q') for _ in COLUMN_CONVERTERS]
+        self.dates = DateColumnParser('endDate', column='M')
+        # Cost of an empty timed call, subtracted from every measurement
+        self.overhead = min(self._time(lambda value: value, None) for _ in range(1000))
+
+    @staticmethod
+    def _time(convert, value):
+        started = time.perf_counter_ns()
+        convert(value)
+        return time.perf_counter_ns() - started
+
+    def add(self, row):
+        self.seen += 1
+        if self.seen % self.every:
+            return
+        for nanos, (_, index, convert) in zip(self.nanos, COLUMN_CONVERTERS):
+            nanos.append(max(0, self._time(convert or self.dates.parse, row[index]) - self.overhead))
+
+    def report(self):
+        columns = []
+        for (field, index, _), nanos in zip(COLUMN_CONVERTERS, self.nanos):
+            mean = sum(nanos) / len(nanos) if nanos else None
+            columns.append({
+                'field': field,
+                'column': chr(ord('A') + index),
+                'samples': len(nanos),
+                # The median ignores samples hit by a GC pause; the mean does not
+                'median_ns': round(statistics.median(nanos)) if nanos else None,
+                'mean_ns': round(mean) if mean is not None else None,
+                'estimated_seconds': round(mean * self.seen / 1e9, 4) if mean is not None else None,
+            })
+        return sorted(columns, key=lambda c: c['median_ns'] or 0, reverse=True)
+
+
+class PipelineMetrics:
+    """
+    Collects per-stage metrics for one conversion.
+
+    Usage:
+        metrics = PipelineMetrics()
+        metrics.start()
+        rows = metrics.stage('read', read_rows(path), slow_rows=True, columns=True)
+        rows = metrics.stage('normalize', normalize_rows(rows, state), slow_rows=True)
+        for item in metrics.sink('write', rows):
+            ...
+        metrics.finish()
+        report = metrics.report()
+    """
+
+    def __init__(self, trace_memory=False, slow_rows=DEFAULT_SLOW_ROWS, column_sample=DEFAULT_COLUMN_SAMPLE):
+        self.trace_memory = trace_memory
+        self.slow_rows = slow_rows
+        self.stages = []
+        self.columns = ColumnSampler(column_sample)
+        self._slowest = []      # min-heap of (seconds, row_idx, stage)
+        self._started = None
+        self._cpu_started = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_memory = None
+        self.peak_rss = None
+        self._owns_tracing = False
+
+    def _memory(self):
+        return tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    def finish(self):
+        self.wall = time.perf_counter() - self._started
+        self.cpu = time.process_time() - self._cpu_started
+        self.peak_rss = peak_rss()
+        if self.trace_memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+
+    def _record_slow(self, seconds, row_idx, stage):
+        entry = (seconds, row_idx, stage)
+        if len(self._slowest) < self.slow_rows:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def stage(self, name, rows, slow_rows=False, columns=False):
+        """
+        Wrap a pipeline generator, charging it the exclusive time of every step.
+
+        The previously wrapped stage is taken as its upstream, so stages must
+        be wrapped in pipeline order. With slow_rows=True the stage yields
+        (row_idx, ...) pairs and its slowest rows are recorded; columns=True
+        feeds the raw rows to the column sampler.
+        """
+        upstream = self.stages[-1] if self.stages else None
+        metrics = StageMetrics(name, upstream, self.trace_memory)
+        self.stages.append(metrics)
+        return self._run(metrics, iter(rows), slow_rows, columns)
+
+    def _run(self, metrics, rows, slow_rows, columns):
+        upstream = metrics.upstream
+        clock, cpu_clock, memory = time.perf_counter, time.process_time, self._memory
+        first = True
+        totals = metrics.inclusive
+        while True:
+            up_wall, up_cpu, up_mem = upstream.inclusive if upstream is not None else (0, 0, 0)
+            mem = memory()
+            started, cpu_started = clock(), cpu_clock()
+            try:
+                value = next(rows)
+            except StopIteration:
+                value = None
+                done = True
+            else:
+                done = False
+            wall = clock() - started
+            cpu = cpu_clock() - cpu_started
+            allocated = memory() - mem
+            totals[0] += wall
+            totals[1] += cpu
+            totals[2] += allocated
+            if upstream is not None:
+                wall -= upstream.inclusive[0] - up_wall
+                cpu -= upstream.inclusive[1] - up_cpu
+                allocated -= upstream.inclusive[2] - up_mem
+
+            metrics.wall += wall
+            metrics.cpu += cpu
+            metrics.allocated += allocated
+            if first:
+                metrics.first_step = wall
+            if done:
+                return
+            metrics.rows_out += 1
+            if slow_rows and not first:
+                # The first step includes opening the workbook / buffering the date sample
+                self._record_slow(wall, value[0], metrics.name)
+            if columns and value[0] != 1:
+                self.columns.add(value[1])
+            first = False
+            yield value
+
+    def sink(self, name, items):
+        """Wrap the last stage's output, charging the consumer's time between items to `name`."""
+        metrics = StageMetrics(name, self.stages[-1] if self.stages else None, self.trace_memory)
+        self.stages.append(metrics)
+        return self._consume(metrics, items)
+
+    def _consume(self, metrics, items):
+        clock, cpu_clock, memory = time.perf_counter, time.process_time, self._memory
+        for item in items:
+            mem = memory()
+            started, cpu_started = clock(), cpu_clock()
+            yield item
+            metrics.wall += clock() - started
+            metrics.cpu += cpu_clock() - cpu_started
+            metrics.allocated += memory() - mem
+            metrics.rows_out += 1
+
+    def report(self):
+        """Return the metrics dict (see module docstring)."""
+        stages = [stage.report(self.wall) for stage in self.stages]
+        rows = self.stages[0].rows_out if self.stages else 0
+        return {
+            'version': 1,
+            'wall_seconds': round(self.wall, 4),
+            'cpu_seconds': round(self.cpu, 4),
+            'rows': rows,
+            'rows_per_second': round(rows / self.wall) if self.wall else None,
+            'peak_memory_bytes': self.peak_memory,
+            'peak_rss_bytes': self.peak_rss,
+            'memory_traced': self.trace_memory,
+            'stages': stages,
+            'unaccounted_seconds': round(self.wall - sum(stage.wall for stage in self.stages), 4),
+            'slowest_rows': [
+                {'row': row_idx, 'stage': stage, 'seconds': round(seconds, 6)}
+                for seconds, row_idx, stage in sorted(self._slowest, reverse=True)
+            ],
+            'columns': self.columns.report(),
+        }
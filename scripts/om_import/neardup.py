@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Near-duplicate detection for import items
+
+dedupe_rows() only drops items whose (headerName, itemName, opCoName) key is
+identical, so "RHK " / "RHK", "Anaplan License" / "ANAPLAN  license" or a
+renamed "TGT-DC (wef Sep-23) @US$2,724/mth" still become separate
+OMExpenseItem rows. Two passes catch them:
+
+    1. Normalized-key exact pass. normalize_text() applies NFKC, casefolds,
+       collapses whitespace and drops spaces inside brackets; items whose
+       normalized (header, item, OpCo) keys collide are reported as
+       'normalized' clusters (score 1.0). normalized_key() can also be used
+       as the dedupe key (convert --dedupe-normalized) to drop them.
+
+    2. Fuzzy pass over the distinct normalized (header, item) pairs, scored by
+       Jaccard similarity of their character 3-gram sets. Candidates come from
+       a blocking index over word tokens (prefix filter, Bayardo et al.):
+       with words ordered rarest first, two word sets with Jaccard >= t share
+       one of the first |x| - ceil(t|x|) + 1 words, so only those are indexed
+       and probed. Words shared by more than max_block entities are left out
+       and every posting list stops growing at max_block entries, so each
+       entity is compared with at most (probe words x max_block) others;
+       pairs are never enumerated all-against-all. That is still the bulk of
+       the cost: ~150k distinct (header, item) texts take 25-40 s.
+
+Similar pairs are joined into clusters (union-find). A pair whose texts only
+differ in digits ("... item 1" / "... item 2", "@US$2,724" / "@US$2,800") is
+flagged `numbers_only`: it is as likely a sibling item as a rename. Members
+list how many OpCos they are charged to and how many OpCos they share with
+other members; a shared OpCo means the same cost may be imported twice.
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_BLOCK_THRESHOLD = 0.5
+# Words shared by more entities than this are not used for blocking
+DEFAULT_MAX_BLOCK = 100
+DEFAULT_MAX_CLUSTERS = 1000
+MAX_CLUSTER_MEMBERS = 20
+SHINGLE_SIZE = 3
+
+_SPACES = re.compile(r'\s+')
+_BRACKET_SPACES = re.compile(r'\s*([()\[\]/])\s*')
+_DIGITS = re.compile(r'\d+')
+_WORDS = re.compile(r'\w+')
+
+
+def normalize_text(value):
+    """Canonical form of a key field: NFKC, casefolded, whitespace collapsed."""
+    if value is None:
+        return ''
+    text = unicodedata.normalize('NFKC', str(value)).casefold()
+    text = _SPACES.sub(' ', text).strip()
+    return _BRACKET_SPACES.sub(r'\1', text)
+
+
+def normalized_key(item):
+    """Dedupe key of an import item with every field normalized."""
+    return (normalize_text(item.headerName), normalize_text(item.itemName),
+            normalize_text(item.opCoName))
+
+
+def _shingles(text):
+    padded = f" {text} "
+    return frozenset(padded[i:i + SHINGLE_SIZE] for i in range(max(1, len(padded) - SHINGLE_SIZE + 1)))
+
+
+def _words(text):
+    return set(_WORDS.findall(text)) or {text}
+
+
+def _blocking_index(token_sets, threshold, max_block):
+    """
+    Candidate pairs from a prefix-filter index over token sets.
+
+    With tokens ordered rarest first, sets with Jaccard >= threshold share a
+    token within the first |x| - ceil(threshold |x|) + 1 tokens of each, so
+    only those are indexed and probed. Tokens found in more than max_block
+    sets (vendor names, "license", "item", ...) are left out of the index;
+    they would pair almost everything with everything. A set made only of
+    such tokens is blocked on its whole token set instead. No posting list
+    grows past max_block entries (only whole-set keys can reach it, since
+    indexed tokens occur at most max_block times): later sets still probe
+    the list but are not added to it, which bounds the candidates per set.
+
+    Yields:
+        (i, j) candidate pairs with i < j, each once
+    """
+    frequency = Counter(token for tokens in token_sets for token in tokens)
+    rare = sorted((token for token, count in frequency.items() if count <= max_block),
+                  key=lambda token: (frequency[token], token))
+    rank = {token: r for r, token in enumerate(rare)}
+
+    index = {}
+    for r, tokens in enumerate(token_sets):
+        ranked = sorted(rank[token] for token in tokens if token in rank)
+        if ranked:
+            keys = ranked[:len(ranked) - math.ceil(threshold * len(ranked)) + 1]
+        else:
+            keys = [tuple(sorted(tokens))]
+        candidates = set()
+        for key in keys:
+            postings = index.get(key)
+            if postings is None:
+                index[key] = [r]
+            else:
+                candidates.update(postings)
+                if len(postings) < max_block:
+                    postings.append(r)
+        for other in sorted(candidates):
+            yield other, r
+
+
+def similar_pairs(texts, threshold=DEFAULT_THRESHOLD, block_threshold=DEFAULT_BLOCK_THRESHOLD,
+                  max_block=DEFAULT_MAX_BLOCK):
+    """
+    Find pairs of texts whose 3-gram Jaccard similarity is >= threshold.
+
+    Candidates are blocked on word tokens (prefix filter at block_threshold,
+    see _blocking_index) and then scored on 3-grams, which also tolerate
+    typos and spacing inside words. Blocking is a heuristic: a pair that
+    shares too few rare words to be blocked together is missed even if its
+    3-gram score would pass. Lower block_threshold or raise max_block to
+    trade speed for recall.
+
+    Returns:
+        list of (i, j, score) with i < j indexes into texts
+    """
+    grams = [_shingles(text) for text in texts]
+    pairs = []
+    for a, b in _blocking_index([_words(text) for text in texts], block_threshold, max_block):
+        mine, theirs = grams[a], grams[b]
+        small, large = sorted((len(mine), len(theirs)))
+        # Length filter: Jaccard can never exceed |small| / |large|
+        if small < threshold * large:
+            continue
+        common = len(mine & theirs)
+        score = common / (small + large - common)
+        if score >= threshold:
+            pairs.append((a, b, score))
+    return pairs
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        parent = self.parent
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _top_edges(nodes, edges, limit=MAX_CLUSTER_MEMBERS):
+    """
+    Pick the members and pairs a cluster report lists, at most `limit` of each.
+
+    The best-scoring pairs are taken first while both of their ends fit in
+    the member list, so every listed pair points at listed members; the
+    remaining member slots are filled with the other nodes in order.
+
+    Returns:
+        (kept_nodes, kept_edges): nodes in ascending order, edges by score
+    """
+    kept = set()
+    kept_edges = []
+    for a, b, score in sorted(edges, key=lambda e: -e[2]):
+        if len(kept_edges) == limit:
+            break
+        if len(kept | {a, b}) <= limit:
+            kept.update((a, b))
+            kept_edges.append((a, b, score))
+    for n in nodes:
+        if len(kept) == limit:
+            break
+        kept.add(n)
+    return sorted(kept), kept_edges
+
+
+class NearDuplicateFinder:
+    """
+    Collects import items (after exact dedupe) and reports near-duplicate clusters.
+
+    Usage:
+        finder = NearDuplicateFinder()
+        for item in finder.collect(items):
+            ...
+        report = finder.report()
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_clusters=DEFAULT_MAX_CLUSTERS):
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self.items = 0
+        self._first = {}        # normalized key -> first raw key
+        self.variants = {}      # normalized key -> {raw key: count}, only when 2+ raw keys
+        self.entities = {}      # normalized (header, item) -> [raw (header, item), {opco}, count]
+
+    def add(self, item):
+        self.items += 1
+        raw = (item.headerName, item.itemName, item.opCoName)
+        key = normalized_key(item)
+        first = self._first.setdefault(key, raw)
+        if first != raw:
+            counts = self.variants.setdefault(key, {first: 1})
+            counts[raw] = counts.get(raw, 0) + 1
+        elif key in self.variants:
+            self.variants[key][raw] += 1
+
+        entity = self.entities.get(key[:2])
+        if entity is None:
+            entity = self.entities[key[:2]] = [raw[:2], set(), 0]
+        entity[1].add(key[2])
+        entity[2] += 1
+
+    def collect(self, items):
+        """Pass items through unchanged while adding them."""
+        for item in items:
+            self.add(item)
+            yield item
+
+    def _normalized_clusters(self):
+        clusters = []
+        for key, counts in self.variants.items():
+            clusters.append({
+                'kind': 'normalized',
+                'score': 1.0,
+                'key': list(key),
+                'members': [
+                    {'header': h, 'item': i, 'opco': o, 'items': count}
+                    for (h, i, o), count in counts.items()
+                ],
+            })
+        return clusters
+
+    def _fuzzy_clusters(self):
+        keys = list(self.entities)
+        texts = [f"{header} | {item}" for header, item in keys]
+        pairs = similar_pairs(texts, self.threshold)
+
+        groups = _UnionFind()
+        for a, b, _ in pairs:
+            groups.union(a, b)
+        by_root = {}
+        for a, b, score in pairs:
+            by_root.setdefault(groups.find(a), []).append((a, b, score))
+
+        clusters = []
+        for edges in by_root.values():
+            nodes = sorted({n for a, b, _ in edges for n in (a, b)})
+            opco_counts = Counter(opco for n in nodes for opco in self.entities[keys[n]][1])
+            shared = {opco for opco, count in opco_counts.items() if count > 1}
+            kept_nodes, kept_edges = _top_edges(nodes, edges)
+            members = []
+            for n in kept_nodes:
+                (header, item), opcos, count = self.entities[keys[n]]
+                members.append({
+                    'header': header,
+                    'item': item,
+                    'items': count,
+                    'opcos': len(opcos),
+                    'shared_opcos': len(opcos & shared),
+                })
+            index = {n: i for i, n in enumerate(kept_nodes)}
+            clusters.append({
+                'kind': 'fuzzy',
+                'score': round(max(score for _, _, score in edges), 4),
+                'numbers_only': all(_DIGITS.sub('#', texts[a]) == _DIGITS.sub('#', texts[b]) for a, b, _ in edges),
+                'size': len(nodes),
+                'shared_opcos': sorted(shared)[:MAX_CLUSTER_MEMBERS],
+                'members': members,
+                'pairs': [
+                    {'a': index[a], 'b': index[b], 'score': round(score, 4)}
+                    for a, b, score in kept_edges
+                ],
+            })
+        # Likely duplicates first: not just a number change, then shared OpCos, then score
+        clusters.sort(key=lambda c: (c['numbers_only'], not c['shared_opcos'], -c['score']))
+        return clusters
+
+    def report(self):
+        """Return the near-duplicate report dict."""
+        normalized = self._normalized_clusters()
+        fuzzy = self._fuzzy_clusters()
+        return {
+            'items': self.items,
+            'entities': len(self.entities),
+            'threshold': self.threshold,
+            'normalized_clusters': len(normalized),
+            'fuzzy_clusters': len(fuzzy),
+            'numbers_only_clusters': sum(1 for cluster in fuzzy if cluster['numbers_only']),
+            'truncated': len(normalized) + len(fuzzy) > self.max_clusters,
+            'clusters': (normalized + fuzzy)[:self.max_clusters],
+        }
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Cell value normalization helpers
+
+Shared by the converter and the streaming pipeline so that every code path
+turns Excel cells into import values the same way.
+"""
+
+import sys
+from datetime import datetime
+
+
+def format_date(value):
+    """Convert date value to YYYY-MM-DD format string."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, str):
+        # Try to parse common date formats
+        for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y']:
+            try:
+                return datetime.strptime(value.strip(), fmt).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        return value.strip() if value.strip() else None
+    return str(value)
+
+
+def safe_float(value, default=0):
+    """Convert value to float safely."""
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def safe_string(value):
+    """Convert value to string safely, handling None."""
+    if value is None or str(value).strip() == '':
+        return None
+    return str(value).strip()
+
+
+def interned_string(value):
+    """
+    safe_string() with the result interned, so the thousands of rows that
+    repeat one header, category or OpCo name all share a single str object.
+    """
+    value = safe_string(value)
+    return value if value is None else sys.intern(value)
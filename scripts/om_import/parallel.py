@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Parallel multi-workbook conversion
+
+Finance sends one OM Expense workbook per OpCo and financial year. Instead of
+running the converter once per file, a directory or glob is expanded and the
+workbooks are parsed in a process pool (one openpyxl parse per core):
+
+    worker:  read -> normalize -> validate   (per workbook, read-only mode)
+             returns plain tuples in ITEM_FIELDS order + its own counters
+    parent:  merge results in input order -> (header, item, OpCo) dedupe
+             across the whole set -> one combined statistics/error report
+
+Results are merged in input order, so the output is the same as converting
+the workbooks one after another into a single file.
+"""
+
+import glob
+import os
+import time
+from functools import partial
+
+from .pipeline import ConversionState, ImportItem, dedupe_rows, iter_normalized_rows, validate_rows
+from .readers import DELIMITERS
+from .table import ImportTable
+
+# Workbooks plus the CSV / TSV files the readers accept (see readers.py)
+WORKBOOK_PATTERNS = ('*.xlsx', '*.xlsm') + tuple(f'*{suffix}' for suffix in DELIMITERS)
+
+
+def is_multi_input(path):
+    """Return True if path names a directory or a glob pattern."""
+    return os.path.isdir(path) or glob.has_magic(path)
+
+
+def expand_inputs(path):
+    """Expand a directory or glob pattern into a sorted list of workbook paths."""
+    if os.path.isdir(path):
+        paths = []
+        for pattern in WORKBOOK_PATTERNS:
+            paths.extend(glob.glob(os.path.join(path, pattern)))
+    else:
+        paths = glob.glob(path, recursive=True)
+
+    # Skip Excel lock files (~$name.xlsx) left behind by open workbooks
+    return sorted(p for p in paths if os.path.isfile(p) and not os.path.basename(p).startswith('~$'))
+
+
+def convert_workbook(excel_path, cache_dir=None, build_table=False, currency=None, engine=None):
+    """
+    Worker: parse and validate one workbook (through the cache if enabled).
+
+    With build_table=True the raw rows are also returned as an ImportTable
+    (typed arrays pickle compactly). `currency` is a CurrencyNormalizer or None;
+    `engine` selects the sheet reader (see readers.py).
+
+    Returns:
+        dict with the file name, item tuples, counters and errors
+    """
+    started = time.perf_counter()
+    state = ConversionState()
+    name = os.path.basename(excel_path)
+
+    records = []
+    table = ImportTable() if build_table else None
+    try:
+        rows = validate_rows(iter_normalized_rows(excel_path, state, cache_dir=cache_dir, table=table,
+                                                  currency=currency, engine=engine), state)
+        for row_idx, item in rows:
+            records.append(tuple(item))
+        failure = None
+    except Exception as e:
+        # Nothing of a failed workbook is merged, not even the rows read before the failure
+        records = []
+        table = None
+        failure = str(e)
+
+    return {
+        'file': name,
+        'path': excel_path,
+        'records': records,
+        'table': table,
+        'valid': state.valid,
+        'skipped': state.skipped,
+        'errors': [f"{name}: {err}" for err in state.errors],
+        'error_count': state.error_count,
+        'validation': state.validation.to_dict(),
+        'currency': state.currency.to_dict() if state.currency else None,
+        'failure': failure,
+        'cache': state.cache['status'] if state.cache else None,
+        'layout': state.layout['profile'] if state.layout else None,
+        'dates': [{'file': name, **report} for report in state.dates],
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def iter_parallel_items(paths, state, jobs=None, reports=None, cache_dir=None, table=None, metrics=None,
+                        dedupe_key=None, currency=None, engine=None):
+    """
+    Convert many workbooks in a process pool, yielding unique import items.
+
+    Args:
+        paths: Workbook paths (see expand_inputs)
+        state: ConversionState that receives the merged counters
+        jobs: Worker processes (default: os.cpu_count())
+        reports: Optional list that receives one summary dict per workbook
+        cache_dir: Workbook cache directory (see cache.py), or None
+        table: Optional ImportTable that receives every workbook's raw rows
+        metrics: Optional PipelineMetrics; the pool is timed as one 'workers'
+            stage (per-workbook times are in the reports)
+        dedupe_key: Optional dedupe key function (see pipeline.dedupe_rows)
+        currency: Optional CurrencyNormalizer run in every worker; the
+            reports are merged into state.currency
+        engine: Sheet reader engine used by the workers (see readers.py)
+
+    Yields:
+        ImportItem records, deduped across all workbooks
+    """
+    rows = _merge_results(paths, state, jobs, reports, cache_dir, table, currency, engine)
+    if metrics is None:
+        return dedupe_rows(rows, state, key=dedupe_key)
+    return metrics.stage('dedupe', dedupe_rows(metrics.stage('workers', rows), state, key=dedupe_key))
+
+
+def _merge_results(paths, state, jobs, reports, cache_dir, table, currency, engine):
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(paths) or 1))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # map() yields in submission order while the pool works ahead
+        worker = partial(convert_workbook, cache_dir=cache_dir, build_table=table is not None, currency=currency,
+                         engine=engine)
+        if currency is not None and state.currency is None:
+            state.currency = currency.new_report()
+        for result in executor.map(worker, paths):
+            state.skipped += result['skipped']
+            state.add_errors(result['errors'], result['error_count'])
+            state.validation.merge(result['validation'], file=result['file'])
+            state.dates.extend(result['dates'])
+            if result['currency']:
+                state.currency.merge(result['currency'], file=result['file'])
+            if table is not None and result['table'] is not None:
+                table.extend(result['table'])
+            if result['failure']:
+                state.add_error(f"{result['file']}: Failed to read workbook: {result['failure']}")
+
+            if reports is not None:
+                reports.append({
+                    'file': result['file'],
+                    'valid_items': result['valid'],
+                    'skipped_rows': result['skipped'],
+                    'errors': result['error_count'],
+                    'failed': bool(result['failure']),
+                    'cache': result['cache'],
+                    'layout': result['layout'],
+                    'seconds': result['seconds'],
+                })
+
+            file_name = result['file']
+            for record in result['records']:
+                item = ImportItem._make(record)
+                state.add_valid(item)
+                yield file_name, item
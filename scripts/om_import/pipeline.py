@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Streaming row pipeline for OM Expense data import
+
+Each stage is a generator that pulls one row at a time from the previous one:
+
+    read_rows -> normalize_rows -> validate_rows -> dedupe_rows -> (emit)
+
+validate_rows checks every item against importOMExpenseItemSchema, compiled
+once from the declarative schema in validation.py.
+
+With `read_only=True` openpyxl streams the worksheet XML instead of building
+the full cell model, so peak memory is bounded by the dedupe key set and the
+first import items are available before the whole sheet has been parsed.
+`engine='fast'` reads the values straight from the xlsx zip instead of
+through openpyxl, and .csv / .tsv files are read as one-sheet workbooks (see
+readers.py).
+
+Usage:
+    state = ConversionState()
+    for item in iter_import_items('docs/OM Expense.xlsx', state):
+        ...
+    stats = state.to_stats()
+"""
+
+import sys
+from collections import namedtuple
+from itertools import chain, islice
+
+from .dates import DATE_SAMPLE_SIZE, DateColumnParser
+from .layouts import IMPORT_WIDTH, layout_letters, match_layout
+from .normalize import interned_string, safe_float
+from .readers import open_sheet
+from .validation import IMPORT_ITEM_SCHEMA, ValidationReport, compile_schema
+
+# Number of columns in the import layout (A..N, see convert-excel-to-import-json.py);
+# read_rows maps every workbook onto it (see layouts.py)
+EXCEL_COLUMNS = IMPORT_WIDTH
+
+# Import item keys in output order (matches importOMExpenseItemSchema)
+ITEM_FIELDS = (
+    'headerName', 'headerDescription', 'category', 'itemName', 'itemDescription',
+    'budgetAmount', 'opCoName', 'endDate', 'lastFYActualExpense', 'isOngoing'
+)
+
+
+class ImportItem(namedtuple('ImportItem', ITEM_FIELDS, defaults=(False,))):
+    """
+    One import item: a plain tuple in ITEM_FIELDS order with named fields.
+
+    A 10-key dict per row costs about 3x the memory of a 10-slot tuple; the
+    string fields are interned by normalize_rows, so repeated names are
+    stored once. The importData JSON object is only built by to_dict() when
+    the item is serialized (see writers.py).
+    """
+
+    __slots__ = ()
+
+    def to_dict(self):
+        """
+        Return the importData JSON object for this item.
+
+        isOngoing is only written when true: the schema defaults it to false,
+        so the other items stay as they were.
+        """
+        data = dict(zip(ITEM_FIELDS, self))
+        if not self.isOngoing:
+            del data['isOngoing']
+        return data
+
+
+# importOMExpenseItemSchema compiled for ImportItem, shared by every ConversionState
+ITEM_SCHEMA = compile_schema(IMPORT_ITEM_SCHEMA, ITEM_FIELDS)
+
+
+class ConversionState:
+    """Counters and samples shared by the pipeline stages."""
+
+    def __init__(self, max_duplicate_samples=5, max_errors=1000):
+        self.skipped = 0
+        self.valid = 0
+        # Only the first max_errors messages are kept; error_count has them all
+        self.errors = []
+        self.error_count = 0
+        self.max_errors = max_errors
+        self.duplicates = 0
+        self.duplicate_samples = []
+        self.max_duplicate_samples = max_duplicate_samples
+
+        # Set by the workbook cache (see cache.WorkbookCache.iter_rows)
+        self.cache = None
+
+        # One report per date column (see dates.DateColumnParser.report)
+        self.dates = []
+
+        # Sheet the rows are read from (set by read_rows / the cache)
+        self.sheet = None
+        # layouts.CompiledLayout.to_dict() of the sheet (set by read_rows)
+        self.layout = None
+        # Per-rule violations of importOMExpenseItemSchema (see validation.py)
+        self.validation = ValidationReport(ITEM_SCHEMA)
+        # Set when the currency stage runs (see currency.CurrencyReport)
+        self.currency = None
+
+        # Track unique values for validation
+        self.headers = set()
+        self.opcos = set()
+        self.categories = set()
+
+    def set_layout(self, layout):
+        """Record the sheet's layout (CompiledLayout.to_dict()) and map report cells to its columns."""
+        self.layout = layout
+        self.validation.columns = None if not layout or layout['identity'] else layout_letters(layout)
+
+    def add_valid(self, item):
+        """Count an item that passed validation and track its unique values."""
+        self.valid += 1
+        self.headers.add(item.headerName)
+        self.opcos.add(item.opCoName)
+        self.categories.add(item.category)
+
+    def add_error(self, message):
+        """Count an error, keeping only the first max_errors messages."""
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(message)
+
+    def add_errors(self, messages, count=None):
+        """Count `count` errors (default: len(messages)) of which `messages` are kept samples."""
+        self.error_count += len(messages) if count is None else count
+        self.errors.extend(messages[:max(0, self.max_errors - len(self.errors))])
+
+    def add_duplicate(self, key):
+        """Count a duplicate key, keeping only the first few for reporting."""
+        self.duplicates += 1
+        if len(self.duplicate_samples) < self.max_duplicate_samples:
+            self.duplicate_samples.append(key)
+
+    def to_stats(self):
+        """Return the statistics dict reported by the converter."""
+        return {
+            'total_processed': self.valid + self.skipped,
+            'valid_items': self.valid,
+            'unique_items': self.valid - self.duplicates,
+            'duplicates_removed': self.duplicates,
+            'skipped_rows': self.skipped,
+            'unique_headers': len(self.headers),
+            'unique_opcos': len(self.opcos),
+            'unique_categories': len(self.categories),
+            'errors': self.error_count
+        }
+
+
+def read_rows(excel_path, read_only=True, min_row=2, state=None, engine=None):
+    """
+    Yield (row_idx, row) tuples from the active sheet, from min_row on
+    (default: skip the header row). The sheet name and the matched layout
+    are stored in state.sheet / state.layout if `state` is given.
+
+    The header row (row 1) is matched against the layout profiles first
+    (see layouts.py; LayoutError if none matches), and every row is yielded
+    as an EXCEL_COLUMNS-cell tuple in import-layout order - also the header
+    row when min_row is 1. `engine` selects the sheet reader (see readers.py).
+    """
+    with open_sheet(excel_path, engine=engine, read_only=read_only) as sheet:
+        header = next(sheet.iter_rows(min_row=1, max_row=1), ())
+        layout = match_layout(header, sheet=sheet.title)
+        if state is not None:
+            state.sheet = sheet.title
+            state.set_layout(layout.to_dict())
+        extract = layout.extract
+        if min_row <= 1:
+            yield 1, extract(tuple(header[:layout.width]))
+        start = max(min_row, 2)
+        rows = sheet.iter_rows(min_row=start, max_col=layout.width)
+        for row_idx, row in enumerate(rows, start):
+            yield row_idx, extract(row)
+
+
+def normalize_rows(rows, state, date_sample=DATE_SAMPLE_SIZE):
+    """
+    Convert raw rows into ImportItem records, skipping empty rows.
+
+    The first `date_sample` rows are buffered so the End Date column's
+    day/month order can be inferred once before any row is converted.
+    """
+    rows = iter(rows)
+    head = list(islice(rows, date_sample))
+    end_dates = DateColumnParser('endDate', column='M').infer(row[12] for _, row in head)
+
+    for row_idx, row in chain(head, rows):
+        # Skip completely empty rows
+        if all(cell is None or cell == '' for cell in row):
+            state.skipped += 1
+            continue
+
+        # "on-going" in column M: no end date, isOngoing=true (as the router
+        # stores it: omExpense.ts nulls endDate for ongoing items)
+        end_date, outcome = end_dates.parse_outcome(row[12])
+        yield row_idx, ImportItem(
+            interned_string(row[1]),        # Column B: headerName
+            interned_string(row[2]),        # Column C: headerDescription
+            interned_string(row[5]),        # Column F: category
+            interned_string(row[3]),        # Column D: itemName
+            interned_string(row[4]),        # Column E: itemDescription
+            safe_float(row[6], 0),          # Column G: budgetAmount
+            interned_string(row[9]),        # Column J: opCoName
+            sys.intern(end_date) if end_date is not None else None,    # Column M: endDate
+            safe_float(row[13], None) if row[13] is not None else None,  # Column N: lastFYActualExpense
+            outcome == 'ongoing'            # Column M: isOngoing
+        )
+
+    state.dates.append(end_dates.report())
+
+
+def validate_rows(rows, state):
+    """
+    Drop items that importOMExpenseItemSchema would reject, recording one
+    error per row (its first failed rule) and every violation in
+    state.validation.
+    """
+    check = state.validation.check
+    for row_idx, item in rows:
+        rule = check(row_idx, item, state.sheet)
+        if rule is not None:
+            state.add_error(f"Row {row_idx}: {rule.error}")
+            state.skipped += 1
+            continue
+
+        state.add_valid(item)
+        yield row_idx, item
+
+
+def dedupe_rows(rows, state, key=None):
+    """
+    Keep the first item per (header, item, opco) key.
+
+    `key` (item -> hashable) replaces the exact key, e.g. neardup.normalized_key
+    to also drop case / whitespace variants.
+    """
+    seen = set()
+    for row_idx, item in rows:
+        if key is None:
+            key_value = (item.headerName, item.itemName, item.opCoName)
+        else:
+            key_value = key(item)
+        if key_value in seen:
+            state.add_duplicate(key_value)
+            continue
+        seen.add(key_value)
+        yield item
+
+
+def tap_rows(rows, table=None, profiler=None):
+    """
+    Pass raw rows through unchanged while feeding an ImportTable and/or an
+    ImportProfiler, so every consumer sees exactly the same rows from one
+    read. Row 1 (the header row) goes to the profiler and is not passed on.
+    """
+    for row_idx, row in rows:
+        if row_idx == 1:
+            if profiler is not None:
+                profiler.set_header_row(row)
+            continue
+        if table is not None:
+            table.append_raw(row_idx, row)
+        if profiler is not None:
+            profiler.add_row(row)
+        yield row_idx, row
+
+
+def read_tapped_rows(excel_path, read_only=True, table=None, profiler=None, metrics=None, state=None,
+                     engine=None):
+    """
+    read_rows() feeding the optional table / profiler (see tap_rows), with
+    'read' / 'tap' stages recorded when `metrics` (a PipelineMetrics) is given.
+    """
+    min_row = 1 if profiler is not None else 2
+    rows = read_rows(excel_path, read_only=read_only, min_row=min_row, state=state, engine=engine)
+    if metrics is not None:
+        rows = metrics.stage('read', rows, slow_rows=True, columns=True)
+    if table is None and profiler is None:
+        return rows
+    rows = tap_rows(rows, table, profiler)
+    if metrics is not None:
+        rows = metrics.stage('tap', rows)
+    return rows
+
+
+def iter_normalized_rows(excel_path, state, read_only=True, cache_dir=None, table=None, profiler=None,
+                         metrics=None, currency=None, engine=None):
+    """
+    Yield normalized (row_idx, item) pairs, through the workbook cache if enabled.
+
+    If `table` (an ImportTable) or `profiler` (an ImportProfiler) is given,
+    the raw rows are also fed to them during the same read. `metrics` (a
+    PipelineMetrics) records per-stage timings; a cached read is one 'cache'
+    stage. `currency` (a currency.CurrencyNormalizer) checks / fills the USD
+    column from HKD and MOP before normalizing, reporting to state.currency.
+    `engine` selects the sheet reader (see readers.py).
+    """
+    if cache_dir and currency is not None:
+        # The cache stores normalized rows, after the HKD / MOP columns are gone
+        raise ValueError("Currency normalization cannot be combined with the workbook cache")
+    if cache_dir:
+        from .cache import WorkbookCache
+        rows = WorkbookCache(cache_dir).iter_rows(excel_path, state, read_only=read_only,
+                                                  table=table, profiler=profiler, engine=engine)
+        return metrics.stage('cache', rows) if metrics is not None else rows
+    rows = read_tapped_rows(excel_path, read_only=read_only, table=table, profiler=profiler, metrics=metrics,
+                            state=state, engine=engine)
+    if currency is not None:
+        if state.currency is None:
+            state.currency = currency.new_report()
+        rows = currency.apply(rows, state.currency)
+        if metrics is not None:
+            rows = metrics.stage('currency', rows)
+    rows = normalize_rows(rows, state)
+    return metrics.stage('normalize', rows, slow_rows=True) if metrics is not None else rows
+
+
+def iter_import_items(excel_path, state, read_only=True, cache_dir=None, table=None, profiler=None,
+                      metrics=None, dedupe_key=None, currency=None, engine=None):
+    """
+    Run the full pipeline over a workbook, yielding unique import items.
+
+    `dedupe_key` replaces the exact (header, item, opco) dedupe key (see dedupe_rows);
+    `currency` adds the currency stage (see iter_normalized_rows).
+    """
+    rows = iter_normalized_rows(excel_path, state, read_only=read_only, cache_dir=cache_dir,
+                                table=table, profiler=profiler, metrics=metrics, currency=currency,
+                                engine=engine)
+    if metrics is None:
+        return dedupe_rows(validate_rows(rows, state), state, key=dedupe_key)
+    rows = metrics.stage('validate', validate_rows(rows, state))
+    return metrics.stage('dedupe', dedupe_rows(rows, state, key=dedupe_key))
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Single-pass streaming profiler for OM Expense import workbooks
+
+Backs analyze-import-data.py. The workbook is read once in openpyxl read-only
+mode and every row is folded into fixed-size accumulators, so memory stays
+flat no matter how many rows the sheet has:
+
+    per column   null rate, type mix, numeric min/max/sum, text length range,
+                 distinct count
+    per key      distinct counts and heavy hitters for header, item and OpCo
+    samples      first `sample_items` (header, item) pairs with their OpCos
+
+Distinct counts are exact up to `exact_limit` distinct values per counter and
+HyperLogLog estimates beyond that (see sketches.py); the report says which.
+exact=True keeps exact sets/counters everywhere (small files only).
+
+The report keeps the keys of the original analysis JSON (summary, headers,
+categories, opcos, om_expense_headers, sample_items) and adds `columns`,
+`heavy_hitters` and `profile`.
+"""
+
+import math
+from datetime import date, datetime
+
+from .normalize import safe_string
+from .pipeline import ConversionState, read_rows
+from .sketches import DEFAULT_EXACT_LIMIT, DEFAULT_TOP_K, DistinctCounter, ExactCounter, SpaceSaving
+
+# Lists in the report (headers, OpCos, categories) are capped in streaming mode
+DEFAULT_LIST_LIMIT = 5000
+DEFAULT_SAMPLE_ITEMS = 20
+
+
+def _type_name(value):
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, datetime):
+        return 'datetime'
+    if isinstance(value, date):
+        return 'date'
+    if isinstance(value, str):
+        return 'text'
+    return type(value).__name__
+
+
+class ColumnProfile:
+    """Fixed-memory statistics for one worksheet column."""
+
+    def __init__(self, index, name, exact_limit):
+        self.index = index
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.types = {}
+        self.num_min = math.inf
+        self.num_max = -math.inf
+        self.num_sum = 0.0
+        self.len_min = None
+        self.len_max = None
+        self.distinct = DistinctCounter(exact_limit)
+
+    def add(self, value):
+        self.count += 1
+        if value is None or (isinstance(value, str) and not value.strip()):
+            self.nulls += 1
+            return
+
+        kind = _type_name(value)
+        self.types[kind] = self.types.get(kind, 0) + 1
+        if kind == 'number':
+            if value < self.num_min:
+                self.num_min = value
+            if value > self.num_max:
+                self.num_max = value
+            self.num_sum += value
+        elif kind == 'text':
+            length = len(value)
+            if self.len_min is None or length < self.len_min:
+                self.len_min = length
+            if self.len_max is None or length > self.len_max:
+                self.len_max = length
+        self.distinct.add(value if kind != 'datetime' else value.isoformat())
+
+    def report(self):
+        numbers = self.types.get('number', 0)
+        return {
+            'index': self.index,
+            'name': self.name,
+            'count': self.count,
+            'nulls': self.nulls,
+            'null_rate': round(self.nulls / self.count, 4) if self.count else None,
+            'types': dict(sorted(self.types.items())),
+            'min': self.num_min if numbers else None,
+            'max': self.num_max if numbers else None,
+            'sum': round(self.num_sum, 2) if numbers else None,
+            'text_length': [self.len_min, self.len_max] if self.len_min is not None else None,
+            'distinct': self.distinct.count(),
+            'distinct_exact': self.distinct.exact,
+        }
+
+
+class ImportProfiler:
+    """Folds worksheet rows into a profile report, one row at a time."""
+
+    def __init__(self, exact=False, exact_limit=DEFAULT_EXACT_LIMIT, top_k=DEFAULT_TOP_K,
+                 list_limit=DEFAULT_LIST_LIMIT, sample_items=DEFAULT_SAMPLE_ITEMS):
+        self.exact = exact
+        self.exact_limit = None if exact else exact_limit
+        self.list_limit = None if exact else list_limit
+        self.sample_limit = sample_items
+        counter = ExactCounter if exact else SpaceSaving
+
+        self.header_row = []
+        self.columns = []
+        self.rows = 0
+        self.empty_rows = 0
+
+        self.unique_headers = DistinctCounter(self.exact_limit)
+        self.unique_items = DistinctCounter(self.exact_limit)
+        self.unique_opcos = DistinctCounter(self.exact_limit)
+        self.unique_categories = DistinctCounter(self.exact_limit)
+        self.top = {
+            'headers': counter(top_k),
+            'items': counter(top_k),
+            'opcos': counter(top_k),
+        }
+
+        # Bounded detail lists (all of them in exact mode)
+        self.om_headers = {}        # name -> [description, category]
+        self.categories = set()
+        self.opcos = set()
+        self.truncated = set()
+        self.samples = {}           # (header, item) -> details
+
+    def _capped_add(self, name, collection, value):
+        if self.list_limit is not None and len(collection) >= self.list_limit and value not in collection:
+            self.truncated.add(name)
+            return False
+        return True
+
+    def set_header_row(self, row):
+        row = list(row)
+        # read_rows pads short rows with None; drop the padding
+        while row and row[-1] is None:
+            row.pop()
+        self.header_row = row
+        self.columns = [ColumnProfile(i, name, self.exact_limit) for i, name in enumerate(self.header_row)]
+
+    def add_row(self, row):
+        """Fold one data row (raw cell tuple) into the profile."""
+        if all(cell is None or cell == '' for cell in row):
+            self.empty_rows += 1
+            return
+        self.rows += 1
+
+        # Columns beyond the header only count once they hold a value
+        # (read_rows pads short rows with None)
+        if len(self.columns) < len(row) and any(v is not None for v in row[len(self.columns):]):
+            for i in range(len(self.columns), len(row)):
+                self.columns.append(ColumnProfile(i, None, self.exact_limit))
+        for column, value in zip(self.columns, row):
+            column.add(value)
+
+        header_name = safe_string(row[1])
+        header_desc = safe_string(row[2])
+        item_name = safe_string(row[3])
+        item_desc = safe_string(row[4])
+        category = safe_string(row[5])
+        opco = safe_string(row[9])
+
+        if header_name:
+            self.unique_headers.add(header_name)
+            self.top['headers'].add(header_name)
+            entry = self.om_headers.get(header_name)
+            if entry is None and self._capped_add('om_expense_headers', self.om_headers, header_name):
+                entry = self.om_headers[header_name] = [header_desc, '']
+            if category:
+                if entry is not None:
+                    entry[1] = category
+                self.unique_categories.add(category)
+                if self._capped_add('categories', self.categories, category):
+                    self.categories.add(category)
+
+        if item_name and header_name:
+            if opco:
+                self.unique_opcos.add(opco)
+                self.top['opcos'].add(opco)
+                if self._capped_add('opcos', self.opcos, opco):
+                    self.opcos.add(opco)
+
+            key = (header_name, item_name)
+            self.unique_items.add('\x1f'.join(key))
+            self.top['items'].add(key)
+            sample = self.samples.get(key)
+            if sample is None and len(self.samples) < self.sample_limit:
+                sample = self.samples[key] = {
+                    'header': header_name,
+                    'item': item_name,
+                    'item_desc': item_desc,
+                    'category': category,
+                    'opcos': set(),
+                }
+            if sample is not None and opco:
+                sample['opcos'].add(opco)
+
+    def report(self):
+        """Return the analysis report dict."""
+        def hitters(name):
+            return [
+                {'value': list(value) if isinstance(value, tuple) else value, 'count': count, 'error': error}
+                for value, count, error in self.top[name].top()
+            ]
+
+        distinct = {
+            'unique_headers': self.unique_headers,
+            'unique_items': self.unique_items,
+            'unique_categories': self.unique_categories,
+            'unique_opcos': self.unique_opcos,
+        }
+        return {
+            'summary': {
+                'total_rows': self.rows,
+                **{name: counter.count() for name, counter in distinct.items()},
+                # Per count: False once its counter switched to a HyperLogLog estimate
+                'exact': {name: counter.exact for name, counter in distinct.items()},
+            },
+            'headers': self.header_row,
+            'categories': sorted(self.categories),
+            'opcos': sorted(self.opcos),
+            'om_expense_headers': [
+                {
+                    'name': name,
+                    'description': desc,
+                    'category': category
+                }
+                for name, (desc, category) in sorted(self.om_headers.items())
+            ],
+            'sample_items': [
+                {
+                    'header': details['header'],
+                    'item': details['item'],
+                    'item_desc': details['item_desc'],
+                    'category': details['category'],
+                    'opcos_count': len(details['opcos']),
+                    'unique_opcos': sorted(details['opcos'])[:5]
+                }
+                for details in self.samples.values()
+            ],
+            'columns': [column.report() for column in self.columns],
+            'heavy_hitters': {name: hitters(name) for name in self.top},
+            'profile': {
+                'mode': 'exact' if self.exact else 'streaming',
+                'empty_rows': self.empty_rows,
+                'summary_exact': all(counter.exact for counter in distinct.values()),
+                'truncated_lists': sorted(self.truncated),
+            },
+        }
+
+
+def profile_workbook(excel_path, engine=None, **options):
+    """Profile the active sheet of a workbook in one streaming pass (`engine`: see readers.py)."""
+    profiler = ImportProfiler(**options)
+    state = ConversionState()
+    for row_idx, row in read_rows(excel_path, read_only=True, min_row=1, state=state, engine=engine):
+        if row_idx == 1:
+            profiler.set_header_row(row)
+        else:
+            profiler.add_row(row)
+    report = profiler.report()
+    report['layout'] = state.layout
+    return report
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Sheet reader engines for the import pipeline
+
+read_rows() (pipeline.py) and the profiler only need the cell values of the
+active sheet, row by row - what openpyxl's iter_rows(values_only=True) yields.
+Building openpyxl's workbook / cell objects for that is most of the read
+cost. Every engine here offers the same small interface:
+
+    with open_sheet(path, engine='fast') as sheet:
+        sheet.title
+        for row in sheet.iter_rows(min_row=2, max_col=14):
+            ...                         # tuple of plain values
+
+    openpyxl  openpyxl.load_workbook(data_only=True), read-only or full
+    fast      XlsxSheet: reads the xlsx zip directly. The shared-strings
+              table is loaded once, styles.xml is reduced to the set of
+              date-formatted style ids, and the sheet XML is stream-parsed
+              (iterparse) one <row> at a time, each row cleared once decoded.
+              Values are decoded as openpyxl decodes them (shared / inline
+              strings, int vs float, booleans, error codes, dates and
+              durations in the 1900 and 1904 date systems) and rows are padded
+              as openpyxl's read-only iter_rows pads them, so the pipeline
+              sees the same tuples. diff_engines() compares both engines row
+              by row on a workbook (benchmark-om-import.py --diff-engines).
+
+.csv / .tsv files are read by DelimitedSheet whatever the engine: one row
+per line, '' as None, plain numbers ('12', '-3.5', '1e3'; not '007') as
+int / float, everything else as text - dates are then parsed by dates.py
+like text dates in a workbook.
+"""
+
+import csv
+import os
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, time, timedelta
+
+from .xlsx import NS_MAIN, SHARED_STRINGS_PART, STYLES_PART, WORKBOOK_PART, active_sheet, range_bounds
+
+READER_ENGINES = ('openpyxl', 'fast')
+DEFAULT_ENGINE = 'openpyxl'
+
+DELIMITERS = {'.csv': ',', '.tsv': '\t'}
+
+WINDOWS_EPOCH = datetime(1899, 12, 30)
+MAC_EPOCH = datetime(1904, 1, 1)
+SECONDS_PER_DAY = 86400
+
+# Built-in numFmtIds whose format openpyxl recognizes as a date / a duration
+BUILTIN_DATE_FORMATS = frozenset(range(14, 23)) | {45, 46, 47}
+BUILTIN_DURATION_FORMATS = frozenset({46})
+
+DEFAULT_MAX_SAMPLES = 20
+
+_ROW = f'{{{NS_MAIN}}}row'
+_CELL = f'{{{NS_MAIN}}}c'
+_VALUE = f'{{{NS_MAIN}}}v'
+_INLINE = f'{{{NS_MAIN}}}is'
+_TEXT = f'{{{NS_MAIN}}}t'
+_RUN = f'{{{NS_MAIN}}}r'
+_SHARED = f'{{{NS_MAIN}}}si'
+_NUM_FMT = f'{{{NS_MAIN}}}numFmt'
+_CELL_XFS = f'{{{NS_MAIN}}}cellXfs'
+_XF = f'{{{NS_MAIN}}}xf'
+_DIMENSION = f'{{{NS_MAIN}}}dimension'
+_SHEET_DATA = f'{{{NS_MAIN}}}sheetData'
+_WORKBOOK_PR = f'{{{NS_MAIN}}}workbookPr'
+
+# Number format tokens (openpyxl.styles.numbers.is_date_format / is_timedelta_format)
+_QUOTED_OR_LOCALE = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_DATE_TOKEN = re.compile(r'(?<![_\\])[dmhysDMHYS]')
+_DURATION = re.compile(r'\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?', re.I)
+
+_PLAIN_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?')
+
+_column_indexes = {}
+
+
+def is_delimited(path):
+    return os.path.splitext(str(path))[1].lower() in DELIMITERS
+
+
+def open_sheet(path, engine=None, read_only=True):
+    """
+    Open the active sheet of a workbook (or a CSV / TSV file) for reading.
+
+    Raises:
+        ValueError: unknown engine
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine not in READER_ENGINES:
+        raise ValueError(f"Unknown reader engine: {engine} (expected one of {', '.join(READER_ENGINES)})")
+    if is_delimited(path):
+        return DelimitedSheet(path)
+    if engine == 'fast':
+        return XlsxSheet(path)
+    return OpenpyxlSheet(path, read_only=read_only)
+
+
+class SheetReader:
+    """Base class: context manager around iter_rows()."""
+
+    title = None
+
+    def iter_rows(self, min_row=1, max_row=None, max_col=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class OpenpyxlSheet(SheetReader):
+    """The active worksheet through openpyxl (values only)."""
+
+    def __init__(self, path, read_only=True):
+        import openpyxl
+
+        self._wb = openpyxl.load_workbook(path, read_only=read_only, data_only=True)
+        self._ws = self._wb.active
+        self.title = self._ws.title
+
+    def iter_rows(self, min_row=1, max_row=None, max_col=None):
+        return self._ws.iter_rows(min_row=min_row, max_row=max_row, max_col=max_col, values_only=True)
+
+    def close(self):
+        # Read-only workbooks keep the zip file open until closed
+        self._wb.close()
+
+
+def column_index(ref):
+    """'AB12' -> 28 (1-based column of a cell reference)."""
+    letters = ref.rstrip('0123456789')
+    index = _column_indexes.get(letters)
+    if index is None:
+        index = 0
+        for letter in letters.upper():
+            index = index * 26 + ord(letter) - 64
+        _column_indexes[letters] = index
+    return index
+
+
+def is_date_format(code):
+    code = code.split(';')[0]
+    return _DATE_TOKEN.search(_QUOTED_OR_LOCALE.sub('', code)) is not None
+
+
+def is_duration_format(code):
+    return _DURATION.search(code.split(';')[0]) is not None
+
+
+def from_excel(value, epoch=WINDOWS_EPOCH, duration=False):
+    """Excel serial -> datetime, or time (below one day) / timedelta (duration formats)."""
+    if duration:
+        delta = timedelta(days=value)
+        if delta.microseconds:
+            delta = timedelta(seconds=delta.total_seconds() // 1, microseconds=round(delta.microseconds, -3))
+        return delta
+    day, fraction = divmod(value, 1)
+    diff = timedelta(milliseconds=round(fraction * SECONDS_PER_DAY * 1000))
+    if 0 <= value < 1 and diff.days == 0:
+        minutes, seconds = divmod(diff.seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return time(hours, minutes, seconds, diff.microseconds)
+    if 0 < value < 60 and epoch == WINDOWS_EPOCH:
+        # Excel's phantom 1900-02-29
+        day += 1
+    return epoch + timedelta(days=day) + diff
+
+
+def _rich_text(element):
+    """Text of an <si> / <is> element: its <t> plus the <t> of every <r> run (not phonetic runs)."""
+    parts = []
+    for child in element:
+        if child.tag == _TEXT:
+            parts.append(child.text or '')
+        elif child.tag == _RUN:
+            text = child.find(_TEXT)
+            if text is not None:
+                parts.append(text.text or '')
+    return ''.join(parts)
+
+
+def read_shared_strings(zf):
+    if SHARED_STRINGS_PART not in zf.namelist():
+        return []
+    strings = []
+    with zf.open(SHARED_STRINGS_PART) as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == _SHARED:
+                strings.append(_rich_text(element).replace('x005F_', ''))
+                element.clear()
+    return strings
+
+
+def read_date_styles(zf):
+    """Return (date style ids, duration style ids): indexes into cellXfs."""
+    dates = set()
+    durations = set()
+    if STYLES_PART not in zf.namelist():
+        return dates, durations
+    styles = ET.fromstring(zf.read(STYLES_PART))
+    custom = {int(fmt.get('numFmtId')): fmt.get('formatCode') or '' for fmt in styles.iter(_NUM_FMT)}
+    cell_xfs = styles.find(_CELL_XFS)
+    for index, xf in enumerate(cell_xfs.iter(_XF) if cell_xfs is not None else ()):
+        fmt_id = int(xf.get('numFmtId', 0))
+        if fmt_id in custom:
+            code = custom[fmt_id]
+            if is_date_format(code):
+                dates.add(index)
+            if is_duration_format(code):
+                durations.add(index)
+        else:
+            if fmt_id in BUILTIN_DATE_FORMATS:
+                dates.add(index)
+            if fmt_id in BUILTIN_DURATION_FORMATS:
+                durations.add(index)
+    return dates, durations
+
+
+class XlsxSheet(SheetReader):
+    """The active worksheet, parsed straight from the xlsx zip."""
+
+    def __init__(self, path):
+        import zipfile
+
+        self._zf = zipfile.ZipFile(path)
+        try:
+            self.title, self._part = active_sheet(self._zf)
+            workbook = ET.fromstring(self._zf.read(WORKBOOK_PART))
+            properties = workbook.find(_WORKBOOK_PR)
+            date1904 = properties is not None and properties.get('date1904') in ('1', 'true')
+            self.epoch = MAC_EPOCH if date1904 else WINDOWS_EPOCH
+            self.shared_strings = read_shared_strings(self._zf)
+            self.date_styles, self.duration_styles = read_date_styles(self._zf)
+            self.max_row, self.max_column = self._dimensions()
+        except Exception:
+            self._zf.close()
+            raise
+
+    def _dimensions(self):
+        """(max_row, max_column) from <dimension>, like openpyxl's read-only sheets; (None, None) without it."""
+        with self._zf.open(self._part) as f:
+            for event, element in ET.iterparse(f, events=('start', 'end')):
+                if element.tag == _SHEET_DATA:
+                    break
+                if event == 'end' and element.tag == _DIMENSION:
+                    try:
+                        _, _, max_row, max_col = range_bounds(element.get('ref', ''))
+                    except ValueError:
+                        break
+                    return max_row, max_col
+        return None, None
+
+    def _decode(self, cell, data_type):
+        if data_type == 'inlineStr':
+            inline = cell.find(_INLINE)
+            return None if inline is None else _rich_text(inline)
+        value = cell.findtext(_VALUE) or None
+        if value is None:
+            return None
+        if data_type == 'n':
+            number = float(value) if '.' in value or 'e' in value or 'E' in value else int(value)
+            style = cell.get('s')
+            if style and int(style) in self.date_styles:
+                try:
+                    return from_excel(number, self.epoch, duration=int(style) in self.duration_styles)
+                except (OverflowError, ValueError):
+                    return '#VALUE!'
+            return number
+        if data_type == 's':
+            return self.shared_strings[int(value)]
+        if data_type == 'b':
+            return bool(int(value))
+        if data_type == 'd':
+            try:
+                return datetime.fromisoformat(value.rstrip('Z'))
+            except ValueError:
+                return value
+        return value                    # 'str' (formula text) and 'e' (error code)
+
+    def _parsed_rows(self, min_row, max_col):
+        """Yield (row number, [(column, value)]) per <row>; rows before min_row are not decoded."""
+        row_counter = 0
+        with self._zf.open(self._part) as f:
+            for _, element in ET.iterparse(f):
+                if element.tag != _ROW:
+                    continue
+                ref = element.get('r')
+                row_counter = int(ref) if ref else row_counter + 1
+                cells = []
+                if row_counter >= min_row:
+                    column = 0
+                    for cell in element:
+                        ref = cell.get('r')
+                        column = column_index(ref) if ref else column + 1
+                        if max_col and column > max_col:
+                            continue
+                        cells.append((column, self._decode(cell, cell.get('t', 'n'))))
+                    if not max_col and len(element):
+                        # openpyxl pads to the last cell element, even an empty one
+                        cells.append((column, None))
+                element.clear()
+                yield row_counter, cells
+
+    def iter_rows(self, min_row=1, max_row=None, max_col=None):
+        """Value tuples, padded and bounded as openpyxl's read-only iter_rows(values_only=True)."""
+        max_col = max_col or self.max_column
+        max_row = max_row or self.max_row
+        empty_row = (None,) * max_col if max_col else ()
+
+        counter = min_row
+        index = 1
+        for index, cells in self._parsed_rows(min_row, max_col):
+            if max_row is not None and index > max_row:
+                break
+            # Rows without a <row> element
+            for _ in range(counter, index):
+                counter += 1
+                yield empty_row
+            if counter <= index:
+                width = max_col or (cells[-1][0] if cells else 0)
+                row = [None] * width
+                for column, value in cells:
+                    if value is not None:
+                        row[column - 1] = value
+                counter += 1
+                yield tuple(row)
+        if max_row is not None and max_row < index:
+            for _ in range(counter, max_row + 1):
+                yield empty_row
+
+    def close(self):
+        self._zf.close()
+
+
+def _csv_value(text):
+    if text == '':
+        return None
+    match = _PLAIN_NUMBER.fullmatch(text)
+    if match is None:
+        return text
+    return float(text) if match.group(1) or match.group(2) else int(text)
+
+
+class DelimitedSheet(SheetReader):
+    """A CSV / TSV file as a one-sheet workbook (title: the file name without extension)."""
+
+    def __init__(self, path):
+        self.path = path
+        name, suffix = os.path.splitext(os.path.basename(str(path)))
+        self.title = name
+        self.delimiter = DELIMITERS[suffix.lower()]
+
+    def iter_rows(self, min_row=1, max_row=None, max_col=None):
+        with open(self.path, encoding='utf-8-sig', newline='') as f:
+            for row_idx, cells in enumerate(csv.reader(f, delimiter=self.delimiter), 1):
+                if max_row is not None and row_idx > max_row:
+                    break
+                if row_idx < min_row:
+                    continue
+                row = tuple(_csv_value(cell) for cell in cells[:max_col])
+                if max_col and len(row) < max_col:
+                    row += (None,) * (max_col - len(row))
+                yield row
+
+
+def diff_engines(path, max_samples=DEFAULT_MAX_SAMPLES, read_only=True):
+    """
+    Read a workbook with openpyxl and with the fast engine and compare every row.
+
+    Returns:
+        dict with rows, mismatches (rows that differ) and capped samples
+        (row number, both tuples)
+    """
+    from itertools import zip_longest
+
+    report = {'file': os.path.basename(str(path)), 'rows': 0, 'mismatches': 0, 'samples': []}
+    with OpenpyxlSheet(path, read_only=read_only) as expected, XlsxSheet(path) as actual:
+        report['sheet'] = expected.title
+        if actual.title != expected.title:
+            report['mismatches'] += 1
+            report['samples'].append({'row': None, 'openpyxl': expected.title, 'fast': actual.title})
+        pairs = zip_longest(expected.iter_rows(), actual.iter_rows())
+        for row_idx, (want, got) in enumerate(pairs, 1):
+            report['rows'] += 1
+            if want is not None:
+                want = tuple(want)
+            if want == got:
+                continue
+            report['mismatches'] += 1
+            if len(report['samples']) < max_samples:
+                report['samples'].append({'row': row_idx, 'openpyxl': want, 'fast': got})
+    return report
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Subtotal reconciliation of extracted budget JSON
+
+Extracted documents (docs/om-expense-*-extracted.json, see
+annual_budget.py / extracted.py) carry a `subtotal` block per header and
+optionally a category `total`, copied from the workbook. Nothing ties them
+to the item lines, and items without figures (1.2 / 1.3 under R-WAN) drop
+out of every sum unnoticed. This pass checks them in bulk:
+
+    - One traversal over all documents loads the items (direct and inside
+      sub_sections) into columnar arrays (array('d'), NaN = no value). Items
+      of a header are contiguous, so each header is a [start, end) slice.
+    - Per-header sums come from prefix sums of each column (one
+      itertools.accumulate per column): sum = prefix[end] - prefix[start],
+      constant time per header however many headers there are. Category
+      sums add up the header sums.
+    - Findings:
+        subtotal          subtotal differs from the sum of its items
+        subtotal_missing  subtotal block without a value for a field the
+                          items have (e.g. an uncalculated formula)
+        increment         increment_pct differs from budget / last-FY actual - 1
+                          (items and subtotals; US$, else HK$)
+        category_total    category total differs from the sum of its items
+      Unpriced items (no budget in either currency) are listed separately,
+      and a subtotal finding says how many of them its header has.
+
+A difference within max(tolerance, relative_tolerance * |subtotal|) is not
+reported: the screenshots and sheets show whole dollars, so item and
+subtotal roundings may disagree by a dollar.
+"""
+
+import glob
+import json
+import math
+import os
+from array import array
+from itertools import accumulate
+
+AMOUNT_FIELDS = ('budget_us', 'budget_hk', 'actual_us', 'actual_hk')
+
+DEFAULT_TOLERANCE = 1.0
+DEFAULT_RELATIVE_TOLERANCE = 0.001
+DEFAULT_PCT_TOLERANCE = 0.1
+DEFAULT_MAX_FINDINGS = 1000
+DEFAULT_PATTERN = 'docs/om-expense-*-extracted.json'
+
+NAN = float('nan')
+
+
+def _number(value):
+    if value is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return NAN
+    return float(value)
+
+
+def find_documents(paths):
+    """Expand files, directories (their *-extracted.json) and glob patterns into sorted paths."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(glob.glob(os.path.join(path, '*-extracted.json')))
+        elif glob.has_magic(path):
+            found.extend(glob.glob(path))
+        else:
+            found.append(path)
+    return sorted(set(found))
+
+
+class BudgetColumns:
+    """
+    Items of many extracted documents as columns, plus one record per header.
+
+    header records: {file, category, number, name, start, end, subtotal};
+    header_of[i] is the position of item i's header record.
+    """
+
+    def __init__(self):
+        self.columns = {field: array('d') for field in AMOUNT_FIELDS + ('increment_pct',)}
+        self.header_of = array('l')     # header record of each item
+        self.item_numbers = []
+        self.names = []
+        self.headers = []
+        self.totals = []        # (file, category, total block)
+
+    def add_document(self, document, file=None):
+        """Append the items of one document, in document order."""
+        columns = self.columns
+        category = document.get('category')
+        if document.get('total'):
+            self.totals.append((file, category, document['total']))
+        for header in document.get('headers', []):
+            start = len(self.item_numbers)
+            sections = [header.get('items', [])] + [s.get('items', []) for s in header.get('sub_sections', [])]
+            for items in sections:
+                for item in items:
+                    for field, column in columns.items():
+                        column.append(_number(item.get(field)))
+                    self.header_of.append(len(self.headers))
+                    self.item_numbers.append(item.get('item_number'))
+                    self.names.append(item.get('name'))
+            self.headers.append({
+                'file': file,
+                'category': header.get('category', category),
+                'number': header.get('number'),
+                'name': header.get('name'),
+                'start': start,
+                'end': len(self.item_numbers),
+                'subtotal': header.get('subtotal'),
+            })
+
+    def __len__(self):
+        return len(self.item_numbers)
+
+    def prefix_sums(self, field):
+        """Running sums of a column with NaN as 0 (length n + 1)."""
+        return array('d', accumulate((0.0 if v != v else v for v in self.columns[field]), initial=0.0))
+
+    def prefix_counts(self, field):
+        """Running counts of non-null values of a column (length n + 1)."""
+        return array('l', accumulate((v == v for v in self.columns[field]), initial=0))
+
+
+def expected_increment(budget, actual):
+    """Increment % of budget over last-FY actual, or None when it cannot be computed."""
+    if budget != budget or actual != actual or actual == 0:
+        return None
+    return (budget / actual - 1) * 100
+
+
+class Reconciler:
+    """
+    Usage:
+        reconciler = Reconciler()
+        for path in find_documents([DEFAULT_PATTERN]):
+            reconciler.add_file(path)
+        report = reconciler.report()
+    """
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE, relative_tolerance=DEFAULT_RELATIVE_TOLERANCE,
+                 pct_tolerance=DEFAULT_PCT_TOLERANCE, max_findings=DEFAULT_MAX_FINDINGS):
+        self.tolerance = tolerance
+        self.relative_tolerance = relative_tolerance
+        self.pct_tolerance = pct_tolerance
+        self.max_findings = max_findings
+        self.data = BudgetColumns()
+        self.files = []
+
+    def add_file(self, path):
+        with open(path, encoding='utf-8') as f:
+            self.data.add_document(json.load(f), file=os.path.basename(path))
+        self.files.append(path)
+
+    def add_document(self, document, file=None):
+        self.data.add_document(document, file=file)
+
+    def _differs(self, expected, actual):
+        limit = max(self.tolerance, self.relative_tolerance * abs(actual))
+        return abs(expected - actual) > limit
+
+    def report(self):
+        """Run every check and return the reconciliation report dict."""
+        data = self.data
+        sums = {field: data.prefix_sums(field) for field in AMOUNT_FIELDS}
+        counts = {field: data.prefix_counts(field) for field in AMOUNT_FIELDS}
+        findings = []
+        kinds = dict.fromkeys(('subtotal', 'subtotal_missing', 'increment', 'category_total'), 0)
+
+        def add(kind, header, **finding):
+            kinds[kind] += 1
+            if len(findings) < self.max_findings:
+                findings.append({'kind': kind, 'file': header['file'], 'category': header['category'],
+                                 'header_number': header['number'], 'header': header['name'], **finding})
+
+        # Unpriced items: no budget in either currency
+        us, hk = data.columns['budget_us'], data.columns['budget_hk']
+        unpriced = array('b', (u != u and h != h for u, h in zip(us, hk)))
+        unpriced_before = array('l', accumulate(unpriced, initial=0))
+
+        categories = {}
+        checked_subtotals = 0
+        without_subtotal = 0
+        for header in data.headers:
+            start, end = header['start'], header['end']
+            header_sums = {field: sums[field][end] - sums[field][start] for field in AMOUNT_FIELDS}
+            header_counts = {field: counts[field][end] - counts[field][start] for field in AMOUNT_FIELDS}
+            category = categories.setdefault((header['file'], header['category']), {
+                'file': header['file'], 'category': header['category'], 'headers': 0, 'items': 0,
+                'unpriced_items': 0, **dict.fromkeys(AMOUNT_FIELDS, 0.0)})
+            category['headers'] += 1
+            category['items'] += end - start
+            category['unpriced_items'] += unpriced_before[end] - unpriced_before[start]
+            for field in AMOUNT_FIELDS:
+                category[field] += header_sums[field]
+
+            subtotal = header['subtotal']
+            if not subtotal:
+                without_subtotal += 1
+                continue
+            checked_subtotals += 1
+            for field in AMOUNT_FIELDS:
+                stated = subtotal.get(field)
+                if stated is None:
+                    if header_counts[field]:
+                        add('subtotal_missing', header, field=field, items_sum=round(header_sums[field], 2))
+                    continue
+                if self._differs(header_sums[field], stated):
+                    add('subtotal', header, field=field, subtotal=stated,
+                        items_sum=round(header_sums[field], 2),
+                        difference=round(stated - header_sums[field], 2),
+                        items_with_value=header_counts[field],
+                        unpriced_items=unpriced_before[end] - unpriced_before[start])
+            pct = subtotal.get('increment_pct')
+            if pct is not None:
+                self._check_increment(add, header, None, pct, _number(subtotal.get('budget_us')),
+                                      _number(subtotal.get('actual_us')), _number(subtotal.get('budget_hk')),
+                                      _number(subtotal.get('actual_hk')))
+
+        # Item increments, one pass over the columns
+        columns = data.columns
+        checked_increments = 0
+        header_of = data.header_of
+        for i, (pct, b_us, a_us, b_hk, a_hk) in enumerate(zip(
+                columns['increment_pct'], us, columns['actual_us'], hk, columns['actual_hk'])):
+            if pct == pct:
+                checked_increments += 1
+                self._check_increment(add, data.headers[header_of[i]], i, pct, b_us, a_us, b_hk, a_hk)
+
+        for file, name, total in data.totals:
+            category = categories.get((file, name))
+            if category is None:
+                continue
+            for field in AMOUNT_FIELDS:
+                stated = total.get(field)
+                if stated is not None and self._differs(category[field], stated):
+                    add('category_total', {'file': file, 'category': name, 'number': None, 'name': None},
+                        field=field, total=stated, items_sum=round(category[field], 2),
+                        difference=round(stated - category[field], 2))
+                category.setdefault('total', {})[field] = stated
+
+        unpriced_items = []
+        for i, flag in enumerate(unpriced):
+            if flag:
+                header = data.headers[header_of[i]]
+                unpriced_items.append({'file': header['file'], 'category': header['category'],
+                                       'header_number': header['number'], 'header': header['name'],
+                                       'item_number': data.item_numbers[i], 'name': data.names[i]})
+
+        for category in categories.values():
+            for field in AMOUNT_FIELDS:
+                category[field] = round(category[field], 2)
+
+        return {
+            'files': len(self.files),
+            'categories': len(categories),
+            'headers': len(data.headers),
+            'items': len(data),
+            'tolerance': {'absolute': self.tolerance, 'relative': self.relative_tolerance,
+                          'increment_pct': self.pct_tolerance},
+            'checked': {'subtotals': checked_subtotals, 'item_increments': checked_increments},
+            'headers_without_subtotal': without_subtotal,
+            'unpriced_items': len(unpriced_items),
+            'findings_by_kind': kinds,
+            'truncated': sum(kinds.values()) > len(findings),
+            'findings': findings,
+            'unpriced': unpriced_items[:self.max_findings],
+            'by_category': list(categories.values()),
+        }
+
+    def _check_increment(self, add, header, i, pct, b_us, a_us, b_hk, a_hk):
+        expected = expected_increment(b_us, a_us)
+        currency = 'us'
+        if expected is None:
+            expected = expected_increment(b_hk, a_hk)
+            currency = 'hk'
+        if expected is None or abs(expected - pct) <= self.pct_tolerance or not math.isfinite(expected):
+            return
+        add('increment', header, field='increment_pct',
+            item_number=None if i is None else self.data.item_numbers[i],
+            stated=pct, expected=round(expected, 2), currency=currency)
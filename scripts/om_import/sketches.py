@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Fixed-memory sketches for profiling large import workbooks
+
+    HyperLogLog      approximate distinct count in 2^p bytes (p=14: 16 KB,
+                     ~0.8% standard error)
+    DistinctCounter  exact set until `exact_limit` values, then switches to a
+                     HyperLogLog seeded with the set - exact on small files,
+                     flat memory on huge ones
+    SpaceSaving      top-k heavy hitters in k counters (Metwally et al.);
+                     every reported count overestimates by at most `error`
+    ExactCounter     collections.Counter with the SpaceSaving interface, for
+                     --exact runs
+
+Values are hashed with blake2b, so sketches are deterministic across runs
+and processes (unlike the built-in hash(), which is salted per process).
+"""
+
+import hashlib
+import math
+from collections import Counter
+
+DEFAULT_PRECISION = 14
+DEFAULT_EXACT_LIMIT = 10000
+DEFAULT_TOP_K = 50
+
+
+def hash64(value):
+    """Deterministic 64-bit hash of a value's string form."""
+    data = value.encode('utf-8') if isinstance(value, str) else repr(value).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with small-range (linear counting) correction."""
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self._rank_bits = 64 - precision
+        if self.m >= 128:
+            self._alpha = 0.7213 / (1 + 1.079 / self.m)
+        else:
+            self._alpha = {16: 0.673, 32: 0.697, 64: 0.709}[self.m]
+
+    def add(self, value):
+        h = hash64(value)
+        index = h >> self._rank_bits
+        rest = h & ((1 << self._rank_bits) - 1)
+        # Position of the leftmost 1-bit in the remaining bits (1-based)
+        rank = self._rank_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Combine another sketch of the same precision into this one."""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        m = self.m
+        estimate = self._alpha * m * m / math.fsum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(estimate)
+
+
+class DistinctCounter:
+    """Exact distinct count that degrades to HyperLogLog past exact_limit values."""
+
+    def __init__(self, exact_limit=DEFAULT_EXACT_LIMIT, precision=DEFAULT_PRECISION):
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self.values = set()
+        self.hll = None
+
+    @property
+    def exact(self):
+        return self.hll is None
+
+    def add(self, value):
+        if self.hll is not None:
+            self.hll.add(value)
+            return
+        self.values.add(value)
+        if self.exact_limit is not None and len(self.values) > self.exact_limit:
+            self.hll = HyperLogLog(self.precision)
+            for seen in self.values:
+                self.hll.add(seen)
+            self.values = None
+
+    def count(self):
+        return len(self.values) if self.hll is None else self.hll.count()
+
+
+class SpaceSaving:
+    """Top-k frequent values with bounded overestimation."""
+
+    def __init__(self, k=DEFAULT_TOP_K):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+
+    def add(self, value):
+        self.total += 1
+        counts = self.counts
+        if value in counts:
+            counts[value] += 1
+        elif len(counts) < self.k:
+            counts[value] = 1
+            self.errors[value] = 0
+        else:
+            # Replace the current minimum; the newcomer inherits its count as error
+            victim = min(counts, key=counts.get)
+            floor = counts.pop(victim)
+            del self.errors[victim]
+            counts[value] = floor + 1
+            self.errors[value] = floor
+
+    def top(self, n=None):
+        """[(value, count, max_overestimate), ...] by descending count."""
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [(value, count, self.errors[value]) for value, count in ranked]
+
+
+class ExactCounter:
+    """Exact frequencies with the SpaceSaving interface."""
+
+    def __init__(self, k=DEFAULT_TOP_K):
+        self.k = k
+        self.counts = Counter()
+        self.total = 0
+
+    def add(self, value):
+        self.total += 1
+        self.counts[value] += 1
+
+    def top(self, n=None):
+        return [(value, count, 0) for value, count in self.counts.most_common(n or self.k)]
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Deterministic synthetic OM Expense data for benchmarks
+
+Generates workbooks in the 14-column import layout (A..N, see
+convert-excel-to-import-json.py) and screenshot-extraction JSON in the shape
+of docs/om-expense-screenshot-extracted.json, at any size from a few hundred
+to millions of rows.
+
+Cardinalities follow docs/import-data-analysis.json (500 rows: 69 headers,
+160 items, 9 categories, 42 OpCos): about 2.3 items per header and 3 OpCos per
+item, so headers scale with the row count while categories and OpCos stay
+small. End dates mix the formats found in Finance's sheets (datetime cells,
+d/m/Y text, "Jul-26", "on-going").
+
+Two kinds of bad rows are mixed in at configurable rates:
+
+    duplicates  exact copies of an earlier valid row (removed by dedupe_rows)
+    invalid     a valid row with header, item, category or OpCo blanked out
+                (rejected by validate_rows)
+
+The same parameters and seed always produce the same rows; expected() returns
+the counts the converter should report for them.
+
+Usage:
+    spec = SyntheticSpec(rows=100000, duplicate_rate=0.02, invalid_rate=0.01)
+    counts = write_workbook('bench.xlsx', spec)
+"""
+
+import random
+from datetime import datetime
+
+CATEGORIES = (
+    'Application System', 'Cloud', 'Computer Room Maintenance', 'Datalines', 'Hardware',
+    'IT Security', 'Network', 'Others', 'Software',
+)
+
+OPCOS = (
+    'ASPC', 'P&C', 'PFU Asia', 'PFU-HK', 'R.IT', 'R.IT (RDC2)', 'R.IT (S2)', 'RA', 'RAP', 'RAPO',
+    'RBS', 'RCN', 'RHK', 'RHK (IT pay 1st)', 'RIMV', 'RIT', 'RKR', 'RMS', 'RNZ', 'RPH', 'RSP',
+    'RTH', 'RTMAP', 'RTMEAP', 'RTW', 'RVN',
+)
+
+VENDORS = (
+    'Adobe', 'Anaplan', 'AWS', 'Azure', 'Cisco', 'DYXnet', 'Fortinet', 'HGC', 'HKT', 'Microsoft',
+    'NTT', 'Oracle', 'Palo Alto', 'Salesforce', 'SAP', 'ServiceNow', 'Veeam', 'VMware', 'Zoom',
+)
+
+PRODUCTS = (
+    'License Subscription', 'Maintenance', 'Support Renewal', 'SD-WAN', 'Internet Line',
+    'Backup Service', 'Firewall Subscription', 'Cloud Hosting', 'Dataline', 'Hardware Warranty',
+)
+
+HEADER_ROW = (
+    '#', 'OM Expense Header', 'OM Expense Description', 'OM Expense Item Details',
+    'OM Expense Item Details Description', 'Expense Category',
+    'FY26 OM Expense Budget Amount (USD)', 'FY26 OM Expense Budget Amount (HKD)', 'Budget (MOP)',
+    'Charge to OpCos', 'Start', 'Contact', 'OM Expense End Date', 'Last FY Actual Expense',
+)
+
+# Columns blanked to make a row invalid: header, item, category, OpCo
+INVALID_COLUMNS = (1, 3, 5, 9)
+
+HKD_PER_USD = 7.8
+MOP_PER_HKD = 1.03
+
+
+class SyntheticSpec:
+    """Size, bad-row rates and cardinalities of a synthetic data set."""
+
+    def __init__(self, rows=1000, duplicate_rate=0.02, invalid_rate=0.01, seed=0,
+                 items_per_header=2.3, opcos_per_item=3.0, opcos=len(OPCOS),
+                 categories=len(CATEGORIES)):
+        if not 0 <= duplicate_rate + invalid_rate < 1:
+            raise ValueError("duplicate_rate + invalid_rate must be in [0, 1)")
+        self.rows = rows
+        self.duplicate_rate = duplicate_rate
+        self.invalid_rate = invalid_rate
+        self.seed = seed
+        self.items_per_header = items_per_header
+        self.opcos_per_item = opcos_per_item
+        self.opcos = min(opcos, len(OPCOS))
+        self.categories = min(categories, len(CATEGORIES))
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def slug(self):
+        """Short file-name-safe identifier (same spec -> same slug)."""
+        return (f"{self.rows}r-d{self.duplicate_rate:g}-i{self.invalid_rate:g}-s{self.seed}"
+                f"-h{self.items_per_header:g}-o{self.opcos_per_item:g}")
+
+
+def _end_date(rng):
+    roll = rng.random()
+    year = rng.randint(2025, 2028)
+    month = rng.randint(1, 12)
+    if roll < 0.35:
+        return datetime(year, month, 28)
+    if roll < 0.55:
+        return f"{rng.randint(1, 28)}/{month}/{year}"
+    if roll < 0.7:
+        return datetime(year, month, 1).strftime('%b-%y')
+    if roll < 0.85:
+        return 'on-going'
+    return None
+
+
+def iter_rows(spec):
+    """
+    Yield the data rows (14-cell tuples, no header row) of a synthetic sheet.
+
+    Rows are generated header by header; every header gets 1..2x
+    items_per_header items and every item 1..2x opcos_per_item OpCos, so each
+    (header, item, OpCo) key is unique unless it is a deliberate duplicate.
+    """
+    rng = random.Random(spec.seed)
+    opcos = OPCOS[:spec.opcos]
+    categories = CATEGORIES[:spec.categories]
+    max_items = max(1, round(spec.items_per_header * 2) - 1)
+    max_opcos = max(1, min(len(opcos), round(spec.opcos_per_item * 2) - 1))
+
+    recent = []         # ring of recent valid rows to copy duplicates from
+    emitted = 0
+    header_no = 0
+    while emitted < spec.rows:
+        header_no += 1
+        vendor = rng.choice(VENDORS)
+        header = f"{vendor} {rng.choice(PRODUCTS)} #{header_no} (Budget @US${rng.randint(1, 200) * 500:,})"
+        header_desc = f"{vendor} contract ref IT{rng.randint(200000, 259999)}" if rng.random() < 0.6 else None
+        category = rng.choice(categories)
+
+        for item_no in range(1, rng.randint(1, max_items) + 1):
+            item = f"{header.split(' (')[0]} - item {item_no}"
+            item_desc = f"@US${rng.randint(10, 5000):,}/mth" if rng.random() < 0.4 else None
+            end_date = _end_date(rng)
+            for opco in rng.sample(opcos, rng.randint(1, max_opcos)):
+                if emitted >= spec.rows:
+                    return
+                usd = round(rng.uniform(50, 50000), 2) if rng.random() < 0.9 else None
+                hkd = round(usd * HKD_PER_USD, 2) if usd is not None else None
+                mop = round(hkd * MOP_PER_HKD, 2) if hkd is not None and rng.random() < 0.3 else None
+                last_fy = round(usd * rng.uniform(0.8, 1.1), 2) if usd is not None and rng.random() < 0.5 else None
+                row = (emitted + 1, header, header_desc, item, item_desc, category, usd, hkd, mop,
+                       opco, None, 'IT', end_date, last_fy)
+
+                roll = rng.random()
+                if roll < spec.invalid_rate:
+                    index = rng.choice(INVALID_COLUMNS)
+                    row = row[:index] + (None,) + row[index + 1:]
+                elif roll < spec.invalid_rate + spec.duplicate_rate and recent:
+                    row = (emitted + 1,) + rng.choice(recent)[1:]
+                else:
+                    if len(recent) < 256:
+                        recent.append(row)
+                    else:
+                        recent[rng.randrange(256)] = row
+                yield row
+                emitted += 1
+
+
+def expected(spec):
+    """Counts the converter should report for spec's rows."""
+    counts = {'rows': 0, 'duplicates': 0, 'invalid': 0, 'unique_items': 0}
+    seen = set()
+    for row in iter_rows(spec):
+        counts['rows'] += 1
+        if any(row[index] is None for index in INVALID_COLUMNS):
+            counts['invalid'] += 1
+            continue
+        key = (row[1], row[3], row[9])
+        if key in seen:
+            counts['duplicates'] += 1
+        else:
+            seen.add(key)
+    counts['unique_items'] = len(seen)
+    return counts
+
+
+def write_workbook(path, spec):
+    """
+    Write spec's rows to an .xlsx file (openpyxl write-only mode, so memory
+    stays flat at any size).
+
+    Returns:
+        expected(spec)
+    """
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('OM Expense')
+    sheet.append(HEADER_ROW)
+    for row in iter_rows(spec):
+        sheet.append(row)
+    workbook.save(path)
+    return expected(spec)
+
+
+def extracted_document(spec, category='A) Datalines'):
+    """
+    Build screenshot-extraction JSON (see extracted.py) from spec's valid rows.
+
+    Every synthetic header becomes one numbered header; every third header
+    puts its items in a sub-section. Subtotals are the sums of the item
+    budgets, so a reconciliation pass should find no differences.
+    """
+    headers = []
+    by_name = {}
+    for row in iter_rows(spec):
+        if any(row[index] is None for index in INVALID_COLUMNS):
+            continue
+        header = by_name.get(row[1])
+        if header is None:
+            header = by_name[row[1]] = {'number': len(headers) + 1, 'name': row[1], 'items': []}
+            if row[2]:
+                header['notes'] = [row[2]]
+            headers.append(header)
+        usd = round(row[6]) if row[6] is not None else None
+        hkd = round(row[7]) if row[7] is not None else None
+        end_date = row[12]
+        if isinstance(end_date, datetime):
+            end_date = f"{end_date.month}/{end_date.day}/{end_date.year}"   # m/d/Y, as in the screenshots
+        header['items'].append({
+            'item_number': f"{header['number']}.{len(header['items']) + 1}",
+            'name': f"{row[3]} ({row[9]})",
+            'budget_us': usd,
+            'budget_hk': hkd,
+            'increment_pct': 0.0,
+            'charge_to': row[9],
+            'actual_hk': hkd,
+            'actual_us': usd,
+            'end_date': end_date,
+        })
+
+    for header in headers:
+        items = header['items']
+        header['subtotal'] = {
+            'budget_us': sum(item['budget_us'] or 0 for item in items),
+            'budget_hk': sum(item['budget_hk'] or 0 for item in items),
+            'increment_pct': 0.0,
+            'actual_hk': sum(item['actual_hk'] or 0 for item in items),
+            'actual_us': sum(item['actual_us'] or 0 for item in items),
+        }
+        if header['number'] % 3 == 0:
+            header['sub_sections'] = [{'name': f"{header['number']}.1 {header['name'].split(' ')[0]}",
+                                       'items': items}]
+            del header['items']
+
+    return {
+        'metadata': {
+            'source': f"synthetic-{spec.slug()}",
+            'document_title': 'IT Annual Maintenance Budget for FY26 - synthetic',
+            'financial_year': 2026,
+        },
+        'category': category,
+        'headers': headers,
+    }
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Columnar in-memory table for OM Expense import data
+
+Rows are stored column by column instead of as one list/dict per row:
+
+    numeric columns  array('d') typed arrays, NaN for empty / non-numeric cells
+                     (USD / HKD / MOP budgets, last-FY actuals)
+    string columns   dictionary-encoded: array('i') codes into a list of
+                     distinct values, -1 for empty cells (header, item,
+                     category, OpCo, ...)
+
+Aggregations (sums per header / OpCo, null counts, min/max, range checks)
+run as batch operations over whole columns instead of calling safe_float()
+cell by cell. The converter's --budget-report reads workbooks through this
+table (analyze-import-data.py uses the fixed-memory profiler in profiler.py).
+
+Only non-empty rows are stored; `row_idx` keeps the Excel row number of each.
+"""
+
+import json
+import math
+import os
+import sys
+from array import array
+
+from .normalize import safe_string
+
+NULL_CODE = -1
+NAN = float('nan')
+
+# (name, Excel column index, kind) for the 14-column import layout
+COLUMNS = (
+    ('headerName', 1, 'string'),          # B
+    ('headerDescription', 2, 'string'),   # C
+    ('itemName', 3, 'string'),            # D
+    ('itemDescription', 4, 'string'),     # E
+    ('category', 5, 'string'),            # F
+    ('budgetUsd', 6, 'numeric'),          # G
+    ('budgetHkd', 7, 'numeric'),          # H
+    ('budgetMop', 8, 'numeric'),          # I
+    ('opCoName', 9, 'string'),            # J
+    ('endDate', 12, 'string'),            # M (raw text, see dates.py for parsing)
+    ('lastFYActual', 13, 'numeric'),      # N
+)
+
+NUMERIC_COLUMNS = tuple(name for name, _, kind in COLUMNS if kind == 'numeric')
+STRING_COLUMNS = tuple(name for name, _, kind in COLUMNS if kind == 'string')
+
+
+def _to_number(value):
+    """Cell value as float, NaN when empty or not numeric (bools excluded)."""
+    if value is None or isinstance(value, bool):
+        return NAN
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return NAN
+
+
+class DictColumn:
+    """Dictionary-encoded string column."""
+
+    def __init__(self, name):
+        self.name = name
+        self.codes = array('i')
+        self.values = []
+        self._index = {}
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(NULL_CODE)
+            return
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        code = self.codes[i]
+        return None if code == NULL_CODE else self.values[code]
+
+    def __iter__(self):
+        values = self.values
+        return (None if code == NULL_CODE else values[code] for code in self.codes)
+
+    def null_count(self):
+        return self.codes.count(NULL_CODE)
+
+    def distinct_count(self):
+        """Number of distinct non-null values actually used."""
+        return len(self.values)
+
+    def counts(self):
+        """Occurrences per distinct value (nulls excluded)."""
+        totals = [0] * len(self.values)
+        for code in self.codes:
+            if code != NULL_CODE:
+                totals[code] += 1
+        return dict(zip(self.values, totals))
+
+
+class NumericColumn:
+    """Float64 column with NaN as the null marker."""
+
+    def __init__(self, name):
+        self.name = name
+        self.data = array('d')
+
+    def append(self, value):
+        self.data.append(_to_number(value))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, i):
+        value = self.data[i]
+        return None if value != value else value
+
+    def __iter__(self):
+        return (None if v != v else v for v in self.data)
+
+    def null_count(self):
+        # NaN is the only value not equal to itself
+        return sum(1 for v in self.data if v != v)
+
+    def present(self):
+        """Non-null values."""
+        return [v for v in self.data if v == v]
+
+    def stats(self):
+        """count / nulls / sum / min / max over non-null values."""
+        values = self.present()
+        return {
+            'count': len(values),
+            'nulls': len(self.data) - len(values),
+            'sum': math.fsum(values),
+            'min': min(values) if values else None,
+            'max': max(values) if values else None,
+        }
+
+
+class ImportTable:
+    """Columnar table over the import layout (see COLUMNS)."""
+
+    def __init__(self):
+        self.row_idx = array('I')
+        self.columns = {}
+        for name, _, kind in COLUMNS:
+            self.columns[name] = DictColumn(name) if kind == 'string' else NumericColumn(name)
+        self.header_row = None
+        self.empty_rows = 0
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a table from (row_idx, raw row tuple) pairs."""
+        table = cls()
+        for row_idx, row in rows:
+            table.append_raw(row_idx, row)
+        return table
+
+    @classmethod
+    def from_workbook(cls, excel_path, read_only=True, engine=None):
+        """Read the active sheet of a workbook; row 1 becomes header_row."""
+        from .pipeline import read_rows
+
+        table = cls()
+        rows = read_rows(excel_path, read_only=read_only, min_row=1, engine=engine)
+        for row_idx, row in rows:
+            if row_idx == 1:
+                table.header_row = list(row)
+                continue
+            table.append_raw(row_idx, row)
+        return table
+
+    def append_raw(self, row_idx, row):
+        """Append one raw Excel row; completely empty rows are only counted."""
+        if all(cell is None or cell == '' for cell in row):
+            self.empty_rows += 1
+            return
+        self.row_idx.append(row_idx)
+        columns = self.columns
+        for name, index, kind in COLUMNS:
+            value = row[index] if index < len(row) else None
+            columns[name].append(safe_string(value) if kind == 'string' else value)
+
+    def extend(self, other):
+        """Append all rows of another table, re-mapping dictionary codes."""
+        self.row_idx.extend(other.row_idx)
+        self.empty_rows += other.empty_rows
+        for name, column in self.columns.items():
+            source = other.columns[name]
+            if isinstance(column, NumericColumn):
+                column.data.extend(source.data)
+                continue
+            remap = [column._index.get(value) for value in source.values]
+            for i, value in enumerate(source.values):
+                if remap[i] is None:
+                    remap[i] = column._index[value] = len(column.values)
+                    column.values.append(value)
+            column.codes.extend(array('i', (NULL_CODE if c == NULL_CODE else remap[c] for c in source.codes)))
+
+    def save(self, path):
+        """
+        Write the table as one JSON header line followed by the raw arrays.
+
+        The arrays are written in native byte order (recorded in the header);
+        load() reads them back with array.fromfile, without per-cell parsing.
+        """
+        header = {
+            'version': 1,
+            'byteorder': sys.byteorder,
+            'rows': len(self.row_idx),
+            'empty_rows': self.empty_rows,
+            'header_row': [None if v is None else str(v) for v in self.header_row] if self.header_row else None,
+            'strings': {name: self.columns[name].values for name in STRING_COLUMNS},
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.row_idx.tofile(f)
+            for name, _, kind in COLUMNS:
+                column = self.columns[name]
+                (column.codes if kind == 'string' else column.data).tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a table written by save()."""
+        table = cls()
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline().decode('utf-8'))
+            rows = header['rows']
+            swap = header['byteorder'] != sys.byteorder
+            table.empty_rows = header['empty_rows']
+            table.header_row = header['header_row']
+            table.row_idx.fromfile(f, rows)
+            arrays = [table.row_idx]
+            for name, _, kind in COLUMNS:
+                column = table.columns[name]
+                target = column.codes if kind == 'string' else column.data
+                target.fromfile(f, rows)
+                arrays.append(target)
+                if kind == 'string':
+                    column.values = header['strings'][name]
+                    column._index = {value: i for i, value in enumerate(column.values)}
+            if swap:
+                for target in arrays:
+                    target.byteswap()
+        return table
+
+    def __len__(self):
+        return len(self.row_idx)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    # ---------- Batch operations ----------
+
+    def null_counts(self):
+        """Nulls per column."""
+        return {name: column.null_count() for name, column in self.columns.items()}
+
+    def numeric_stats(self):
+        """count / nulls / sum / min / max for every numeric column."""
+        return {name: self.columns[name].stats() for name in NUMERIC_COLUMNS}
+
+    def group_sum(self, value_column, by):
+        """
+        Sum a numeric column per value of a string column (nulls skipped).
+
+        Returns:
+            dict of group value -> (row count, sum)
+        """
+        key = self.columns[by]
+        counts = [0] * len(key.values)
+        sums = [0.0] * len(key.values)
+        for code, value in zip(key.codes, self.columns[value_column].data):
+            if code != NULL_CODE and value == value:
+                counts[code] += 1
+                sums[code] += value
+        return {key.values[i]: (counts[i], sums[i]) for i in range(len(key.values)) if counts[i]}
+
+    def range_check(self, value_column, minimum=None, maximum=None):
+        """Excel row numbers whose non-null value falls outside [minimum, maximum]."""
+        low = -math.inf if minimum is None else minimum
+        high = math.inf if maximum is None else maximum
+        return [
+            row_idx for row_idx, value in zip(self.row_idx, self.columns[value_column].data)
+            if value == value and not low <= value <= high
+        ]
+
+    def missing(self, *columns):
+        """Excel row numbers where any of the given string columns is empty."""
+        code_columns = [self.columns[name].codes for name in columns]
+        return [
+            row_idx for row_idx, *codes in zip(self.row_idx, *code_columns)
+            if NULL_CODE in codes
+        ]
+
+
+def budget_summary(table, top=10):
+    """
+    Budget checks for the converter's --budget-report.
+
+    Returns:
+        dict with per-column numeric stats, null counts, negative budgets
+        (importOMExpenseItemSchema requires budgetAmount >= 0), and the
+        largest per-header and per-OpCo USD totals
+    """
+    def largest(groups):
+        ranked = sorted(groups.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        return [{'name': name, 'rows': rows, 'budgetUsd': round(total, 2)} for name, (rows, total) in ranked]
+
+    by_header = table.group_sum('budgetUsd', 'headerName')
+    by_opco = table.group_sum('budgetUsd', 'opCoName')
+    return {
+        'rows': len(table),
+        'numeric': table.numeric_stats(),
+        'nulls': table.null_counts(),
+        'negative_budget_rows': table.range_check('budgetUsd', minimum=0),
+        'headers': len(by_header),
+        'opcos': len(by_opco),
+        'top_headers': largest(by_header),
+        'top_opcos': largest(by_opco),
+    }
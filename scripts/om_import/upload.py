@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Concurrent, resumable upload of import chunks to importData
+
+Sends transaction-sized chunks (see chunking.py) to the `omExpense.importData`
+tRPC mutation with a bounded number of requests in flight:
+
+    - Keep-alive: one persistent HTTP connection per in-flight slot
+      (http.client on worker threads, driven by asyncio)
+    - Retries: connection errors, timeouts, 429 and 5xx responses are retried
+      with exponential backoff and full jitter (Retry-After is honoured);
+      4xx errors and importData results with success=false are not
+    - Checkpoint: every finished chunk is recorded in a JSON checkpoint file
+      (written atomically), so an interrupted load resumes with the chunks
+      that have not completed yet
+
+Resending a chunk is safe: in 'skip' and 'update' mode importData treats
+items it already has as duplicates, so a chunk whose response was lost is
+simply skipped or updated again.
+
+Chunks run in separate transactions, and importData creates missing OpCos
+and categories by name without a unique constraint - two concurrent
+transactions could both create "RHK". A chunk that introduces an OpCo or
+category name another in-flight chunk also introduces therefore waits until
+that chunk has committed. With importMode 'replace' only the first chunk
+replaces (it runs alone); the remaining chunks use 'skip' and start only once
+the replace has committed - a failed replace chunk stops the upload, whatever
+stop_on_error says. The checkpoint records the committed replace: until it
+has one, a resumed upload sends every chunk again, the first as 'replace'
+(a replace deletes the financial year, including chunks sent before it).
+
+Wire format (tRPC v10 with the superjson transformer, non-batched):
+
+    POST <base_url>/api/trpc/omExpense.importData
+    {"json": {"financialYear": 2026, "items": [...], "importMode": "skip"}}
+    -> {"result": {"data": {"json": <ImportResult>}}}
+    -> {"error": {"json": {"message": ..., "data": {"code": ..., "httpStatus": ...}}}}
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import random
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+PROCEDURE = 'omExpense.importData'
+IMPORT_MODES = ('skip', 'update', 'replace')
+
+CHECKPOINT_VERSION = 1
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_ATTEMPTS = 5
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_TIMEOUT = 330.0     # importData's transaction timeout is 300 s
+
+RETRY_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+
+class UploadError(Exception):
+    """A request that failed; `retryable` tells whether sending it again may help."""
+
+    def __init__(self, message, status=None, code=None, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF, cap=DEFAULT_MAX_BACKOFF, retry_after=None):
+    """Seconds to wait before retry `attempt` (1-based): full jitter, or the server's Retry-After."""
+    if retry_after is not None:
+        return min(cap, retry_after)
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def _retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TrpcClient:
+    """
+    Minimal tRPC mutation client over a pool of keep-alive connections.
+
+    Usage:
+        client = TrpcClient('http://localhost:3000', cookie='authjs.session-token=...')
+        result = await client.mutation('omExpense.importData', payload)
+        client.close()
+    """
+
+    def __init__(self, base_url, cookie=None, pool_size=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 path_prefix='/api/trpc'):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported URL: {base_url} (expected http:// or https://)")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/') + path_prefix
+        self.cookie = cookie
+        self.timeout = timeout
+        self._connections = [self._connect() for _ in range(pool_size)]
+        self._idle = asyncio.Queue()
+        for connection in self._connections:
+            self._idle.put_nowait(connection)
+        self.requests = 0
+
+    def _connect(self):
+        connection = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return connection(self.host, self.port, timeout=self.timeout)
+
+    def _post(self, connection, path, body):
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'Connection': 'keep-alive',
+        }
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        try:
+            connection.request('POST', path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            # Drop the socket; http.client reconnects on the next request
+            connection.close()
+            raise UploadError(f"{type(e).__name__}: {e}", retryable=True) from e
+        if response.getheader('Connection', '').lower() == 'close':
+            connection.close()
+        return response.status, response.getheader('Retry-After'), data
+
+    async def mutation(self, procedure, payload):
+        """Call a mutation and return its (superjson-decoded) data, or raise UploadError."""
+        body = json.dumps({'json': payload}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        connection = await self._idle.get()
+        try:
+            status, retry_after, data = await asyncio.to_thread(
+                self._post, connection, f"{self.prefix}/{procedure}", body)
+        finally:
+            self._idle.put_nowait(connection)
+        self.requests += 1
+
+        try:
+            envelope = json.loads(data)
+        except ValueError:
+            envelope = None
+        if isinstance(envelope, dict) and 'result' in envelope and status < 400:
+            return envelope['result']['data'].get('json')
+
+        # Proxies and load balancers answer with their own (non-tRPC) bodies
+        error = envelope.get('error') if isinstance(envelope, dict) else None
+        error = error.get('json', error) if isinstance(error, dict) else {}
+        code = (error.get('data') or {}).get('code')
+        message = error.get('message') or f"HTTP {status}: {data[:200].decode('utf-8', 'replace')}"
+        raise UploadError(message, status=status, code=code,
+                          retryable=status in RETRY_STATUSES, retry_after=_retry_after(retry_after))
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+
+
+class UploadCheckpoint:
+    """
+    Progress of one upload, saved after every chunk.
+
+    The checkpoint is bound to its input (fingerprint), financial year and
+    import mode; resuming with different ones is refused.
+    """
+
+    def __init__(self, path, fingerprint, financial_year, import_mode):
+        self.path = path
+        self.data = {
+            'version': CHECKPOINT_VERSION,
+            'fingerprint': fingerprint,
+            'financialYear': financial_year,
+            'importMode': import_mode,
+            'createdAt': datetime.now().isoformat(timespec='seconds'),
+            'completed': {},
+            'failed': {},
+            'replaced': False,
+        }
+
+    def load(self):
+        """Resume from an existing checkpoint file; return the number of completed chunks."""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding='utf-8') as f:
+            saved = json.load(f)
+        for key in ('version', 'fingerprint', 'financialYear', 'importMode'):
+            if saved.get(key) != self.data[key]:
+                raise ValueError(f"Checkpoint {self.path} belongs to another upload ({key}: "
+                                 f"{saved.get(key)!r} != {self.data[key]!r}); use --restart to discard it")
+        saved['failed'] = {}
+        saved.setdefault('replaced', any(entry.get('importMode') == 'replace'
+                                         for entry in saved['completed'].values()))
+        self.data = saved
+        return len(saved['completed'])
+
+    @property
+    def replaced(self):
+        """True once the 'replace' chunk of a replace-mode upload has committed."""
+        return self.data['replaced']
+
+    def is_done(self, index):
+        return str(index) in self.data['completed']
+
+    def mark_done(self, index, entry):
+        self.data['completed'][str(index)] = entry
+        if entry.get('importMode') == 'replace':
+            self.data['replaced'] = True
+        self.data['failed'].pop(str(index), None)
+        self.save()
+
+    def mark_failed(self, index, entry):
+        self.data['failed'][str(index)] = entry
+        self.save()
+
+    def save(self):
+        self.data['updatedAt'] = datetime.now().isoformat(timespec='seconds')
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class UploadChunk:
+    """One chunk to send: its position, a label and a loader for its items (read when it is sent)."""
+
+    def __init__(self, index, label, load):
+        self.index = index
+        self.label = label
+        self.load = load
+
+
+def _new_names(items):
+    return ({('opco', item['opCoName']) for item in items}
+            | {('category', item['category']) for item in items})
+
+
+async def upload_chunks(chunks, client, financial_year, import_mode='skip', checkpoint=None,
+                        concurrency=DEFAULT_CONCURRENCY, attempts=DEFAULT_ATTEMPTS, backoff=DEFAULT_BACKOFF,
+                        stop_on_error=True, progress=None):
+    """
+    Upload chunks in order with at most `concurrency` requests in flight.
+
+    Args:
+        chunks: UploadChunk list, in load order
+        client: TrpcClient
+        financial_year / import_mode: importData input
+        checkpoint: Optional UploadCheckpoint; completed chunks are skipped
+            (all are resent while a replace-mode upload has not replaced yet)
+        attempts: Tries per chunk for retryable errors
+        stop_on_error: Start no further chunks after a chunk failed (always
+            the case after a failed 'replace' chunk)
+        progress: Optional callback(event dict) for every finished / retried chunk
+
+    Returns:
+        summary dict (totals of the ImportResult statistics, failures)
+    """
+    totals = {}
+    failures = []
+    uploaded = 0
+    in_flight = {}          # task -> (chunk, names it introduces, import mode)
+    committed = set()       # OpCo / category names that exist on the server
+    stopped = False
+    started = time.perf_counter()
+    progress = progress or (lambda event: None)
+
+    async def send(chunk, items, mode):
+        payload = {'financialYear': financial_year, 'items': items, 'importMode': mode}
+        chunk_started = time.perf_counter()
+        for attempt in range(1, attempts + 1):
+            try:
+                result = await client.mutation(PROCEDURE, payload)
+            except UploadError as e:
+                if not e.retryable or attempt == attempts:
+                    return {'error': str(e), 'status': e.status, 'code': e.code, 'attempts': attempt}
+                delay = backoff_delay(attempt, backoff, retry_after=e.retry_after)
+                progress({'event': 'retry', 'chunk': chunk.label, 'attempt': attempt, 'delay': delay,
+                          'error': str(e)})
+                await asyncio.sleep(delay)
+                continue
+            entry = {
+                'attempts': attempt,
+                'seconds': round(time.perf_counter() - chunk_started, 3),
+                'items': len(items),
+                'importMode': mode,
+            }
+            if not isinstance(result, dict) or not result.get('success'):
+                message = ((result or {}).get('error') or {}).get('message', 'importData returned success=false')
+                return {**entry, 'error': message, 'result': result}
+            return {**entry, 'statistics': result.get('statistics', {})}
+
+    def finish(task):
+        nonlocal stopped, uploaded
+        chunk, names, mode = in_flight.pop(task)
+        entry = task.result()
+        if 'error' in entry:
+            failures.append({'chunk': chunk.label, **entry})
+            if checkpoint is not None:
+                checkpoint.mark_failed(chunk.index, {'chunk': chunk.label, **entry})
+            # Chunks sent after a failed replace would be deleted by the replace of the rerun
+            stopped = stopped or stop_on_error or mode == 'replace'
+        else:
+            uploaded += 1
+            committed.update(names)
+            for key, value in entry['statistics'].items():
+                if isinstance(value, (int, float)):
+                    totals[key] = totals.get(key, 0) + value
+            if checkpoint is not None:
+                checkpoint.mark_done(chunk.index, {'chunk': chunk.label, **entry})
+        progress({'event': 'failed' if 'error' in entry else 'done', 'chunk': chunk.label, **entry})
+
+    async def wait_any():
+        done, _ = await asyncio.wait(list(in_flight), return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            finish(task)
+
+    replace_pending = import_mode == 'replace' and (checkpoint is None or not checkpoint.replaced)
+    if replace_pending:
+        pending = list(chunks)
+    else:
+        pending = [chunk for chunk in chunks if checkpoint is None or not checkpoint.is_done(chunk.index)]
+    skipped = len(chunks) - len(pending)
+    for position, chunk in enumerate(pending):
+        if stopped:
+            break
+        items = chunk.load()
+        mode = 'replace' if replace_pending and position == 0 else 'skip' if import_mode == 'replace' \
+            else import_mode
+        names = _new_names(items) - committed
+
+        # Replace runs alone; new names must not be created by two transactions at once
+        while in_flight and (mode == 'replace' or len(in_flight) >= concurrency
+                             or any(names & other for _, other, _ in in_flight.values())):
+            await wait_any()
+        if stopped:
+            break
+        task = asyncio.ensure_future(send(chunk, items, mode))
+        in_flight[task] = (chunk, names, mode)
+        if mode == 'replace':
+            await wait_any()
+
+    while in_flight:
+        await wait_any()
+
+    return {
+        'chunks': len(chunks),
+        'resumed': skipped,
+        'uploaded': uploaded,
+        'remaining': len(pending) - uploaded,
+        'failed': failures,
+        'statistics': totals,
+        'requests': client.requests,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
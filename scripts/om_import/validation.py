@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Declarative import item validation mirroring the importData schema
+
+importData (packages/api/src/routers/omExpense.ts) parses its input with zod
+and runs the whole import in one transaction, so a single item the server
+rejects fails every item of the request. IMPORT_ITEM_SCHEMA restates
+importOMExpenseItemSchema field by field, together with the source column
+of each field in the import layout:
+
+    headerName           B  string, min(1)              'Header 名稱不能為空'
+    headerDescription    C  string, nullable
+    category             F  string, min(1)              '類別不能為空'
+    itemName             D  string, min(1)              '項目名稱不能為空'
+    itemDescription      E  string, nullable
+    budgetAmount         G  number, nonnegative
+    opCoName             J  string, min(1)              'OpCo 名稱不能為空'
+    endDate              M  string, nullable            -> new Date(endDate)
+    lastFYActualExpense  N  number, nullable
+    isOngoing            M  boolean, default(false)     -> endDate stored as null
+
+zod's number() rejects NaN and Infinity (JSON cannot carry them either), and
+the router turns endDate into `new Date(endDate)`, which fails the Prisma
+write for anything that is not a date - so endDate must be YYYY-MM-DD. For
+an ongoing item (isOngoing=true, "on-going" in column M) the router stores
+endDate as null whatever was sent, so endDate must be null there too rather
+than be dropped silently. The strings have no maximum length (text columns in
+schema.prisma).
+
+compile_schema() turns the schema into one checker per field once; checking
+an item is one call per field. ValidationReport counts every violation per
+rule but keeps only the first `max_samples` of each, with its cell address
+(e.g. 'OM Expense'!J42), so a badly broken sheet costs a fixed amount of
+memory.
+"""
+
+import math
+import re
+from datetime import date
+from functools import lru_cache
+
+DEFAULT_MAX_SAMPLES = 20
+
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+# Sheet names that need quoting in a cell reference
+_PLAIN_SHEET = re.compile(r'[A-Za-z_][A-Za-z0-9_.]*')
+
+
+class Field:
+    """One field of the server's item schema and the column it is read from."""
+
+    def __init__(self, name, column, label, kind, required=False, nonnegative=False, message=None,
+                 null_when=None):
+        self.name = name
+        self.column = column
+        self.label = label                  # for local error messages
+        self.kind = kind                    # 'string', 'number', 'date' or 'boolean'
+        self.required = required
+        self.nonnegative = nonnegative
+        self.message = message              # the server's error message, if it has one
+        self.null_when = null_when          # boolean field that requires this one to be null
+
+
+IMPORT_ITEM_SCHEMA = (
+    Field('headerName', 'B', 'header name', 'string', required=True, message='Header 名稱不能為空'),
+    Field('headerDescription', 'C', 'header description', 'string'),
+    Field('category', 'F', 'category', 'string', required=True, message='類別不能為空'),
+    Field('itemName', 'D', 'item name', 'string', required=True, message='項目名稱不能為空'),
+    Field('itemDescription', 'E', 'item description', 'string'),
+    Field('budgetAmount', 'G', 'budget amount', 'number', required=True, nonnegative=True),
+    Field('opCoName', 'J', 'OpCo name', 'string', required=True, message='OpCo 名稱不能為空'),
+    Field('endDate', 'M', 'end date', 'date', null_when='isOngoing'),
+    Field('lastFYActualExpense', 'N', 'last FY actual expense', 'number'),
+    Field('isOngoing', 'M', 'ongoing flag', 'boolean'),
+)
+
+
+class Rule:
+    """One compiled constraint: `field.constraint`, e.g. 'budgetAmount.nonnegative'."""
+
+    def __init__(self, field, index, constraint, error):
+        self.id = f"{field.name}.{constraint}"
+        self.field = field
+        self.index = index                  # position of the field in the item
+        self.number = None                  # position in CompiledSchema.rules
+        self.constraint = constraint
+        self.error = error
+
+
+@lru_cache(maxsize=4096)
+def is_iso_date(value):
+    """True for a real calendar date written as YYYY-MM-DD."""
+    if not _ISO_DATE.fullmatch(value):
+        return False
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _field_checker(field, index, rules):
+    """
+    Compile one field into check(value) -> failed Rule or None.
+
+    Rules are tested in order; the first failure wins (a missing value is
+    not also reported as a type error).
+    """
+    label = field.label
+    if field.kind == 'string':
+        if field.required:
+            missing = Rule(field, index, 'required', f"Missing {label}")
+            rules.append(missing)
+
+            def check(value):
+                if value is None or value == '':
+                    return missing
+                return None if isinstance(value, str) else missing
+            return check
+
+        not_string = Rule(field, index, 'type', f"Invalid {label}: not text")
+        rules.append(not_string)
+        return lambda value: None if value is None or isinstance(value, str) else not_string
+
+    if field.kind == 'number':
+        not_number = Rule(field, index, 'type', f"Invalid {label}: not a finite number")
+        rules.append(not_number)
+        negative = None
+        if field.nonnegative:
+            negative = Rule(field, index, 'nonnegative', f"Negative {label}")
+            rules.append(negative)
+
+        def check(value):
+            if value is None:
+                return not_number if field.required else None
+            if not _is_number(value):
+                return not_number
+            if negative is not None and value < 0:
+                return negative
+            return None
+        return check
+
+    if field.kind == 'date':
+        not_date = Rule(field, index, 'format', f"Invalid {label}: not a YYYY-MM-DD date")
+        rules.append(not_date)
+        return lambda value: None if value is None or (isinstance(value, str) and is_iso_date(value)) else not_date
+
+    if field.kind == 'boolean':
+        not_boolean = Rule(field, index, 'type', f"Invalid {label}: not true/false")
+        rules.append(not_boolean)
+        return lambda value: None if value is None or isinstance(value, bool) else not_boolean
+
+    raise ValueError(f"Unknown field kind: {field.kind}")
+
+
+class CompiledSchema:
+    """
+    Per-field checkers for items laid out in `fields` order.
+
+    Required fields are checked first, in column order, so a row missing
+    several of them reports the same first error as before: header, item,
+    category, OpCo.
+    """
+
+    def __init__(self, schema, fields):
+        by_name = {field.name: field for field in schema}
+        missing = [name for name in fields if name not in by_name]
+        if missing:
+            raise ValueError(f"No schema for fields: {', '.join(missing)}")
+
+        self.rules = []
+        ordered = sorted(schema, key=lambda field: (not (field.required and field.kind == 'string'), field.column))
+        self.checkers = tuple(
+            (fields.index(field.name), _field_checker(field, fields.index(field.name), self.rules))
+            for field in ordered
+        )
+        # Cross-field rules, checked after the field's own checker passes
+        self.conditions = []
+        for field in schema:
+            if field.null_when is not None:
+                rule = Rule(field, fields.index(field.name), field.null_when,
+                            f"Invalid {field.label}: must be empty when {field.null_when} is true")
+                self.rules.append(rule)
+                self.conditions.append((rule.index, fields.index(field.null_when), rule))
+        for number, rule in enumerate(self.rules):
+            rule.number = number
+        self.by_id = {rule.id: rule for rule in self.rules}
+
+    def failures(self, item):
+        """Return the Rules an item breaks (empty list if it is valid)."""
+        failed = []
+        for index, check in self.checkers:
+            rule = check(item[index])
+            if rule is not None:
+                failed.append(rule)
+        for index, flag_index, rule in self.conditions:
+            if item[flag_index] is True and item[index] is not None and not any(r.field is rule.field for r in failed):
+                failed.append(rule)
+        return failed
+
+
+def compile_schema(schema, fields):
+    """Compile a field schema (e.g. IMPORT_ITEM_SCHEMA) for items in `fields` order."""
+    return CompiledSchema(schema, fields)
+
+
+def cell_address(sheet, column, row, file=None):
+    """
+    Excel-style cell reference: 'Sheet1', 'J', 42 -> 'Sheet1!J42'; with a
+    file name '[wb0.xlsx]Sheet1!J42'. Quoted when the name has spaces etc.
+    """
+    cell = f"{column}{row}"
+    if not sheet:
+        return f"[{file}]{cell}" if file else cell
+    prefix = f"[{file}]{sheet}" if file else sheet
+    if not _PLAIN_SHEET.fullmatch(sheet) or (file and not _PLAIN_SHEET.fullmatch(file)):
+        prefix = "'" + prefix.replace("'", "''") + "'"
+    return f"{prefix}!{cell}"
+
+
+def _sample_value(value):
+    # Keep samples JSON-safe: NaN / Infinity are not valid JSON
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    return value
+
+
+class ValidationReport:
+    """
+    Violation counts and capped samples per rule of a compiled schema.
+
+    Usage:
+        report = ValidationReport(compiled)
+        rule = report.check(row_idx, item, sheet='OM Expense')   # first failure or None
+        summary = report.to_dict()
+    """
+
+    def __init__(self, compiled, max_samples=DEFAULT_MAX_SAMPLES):
+        self.compiled = compiled
+        self.max_samples = max_samples
+        self.rows = 0
+        self.rejected = 0
+        self.counts = [0] * len(compiled.rules)
+        self.samples = [[] for _ in compiled.rules]
+        # Import-layout letter -> workbook letter when the sheet's columns
+        # are arranged differently (set by pipeline.read_rows, see layouts.py)
+        self.columns = None
+
+    def check(self, row_idx, item, sheet=None):
+        """Check one item, recording its violations; return the first failed Rule or None."""
+        self.rows += 1
+        failed = self.compiled.failures(item)
+        if not failed:
+            return None
+        self.rejected += 1
+        for rule in failed:
+            n = rule.number
+            self.counts[n] += 1
+            if len(self.samples[n]) < self.max_samples:
+                column = rule.field.column
+                if self.columns is not None:
+                    column = self.columns.get(column, column)
+                self.samples[n].append({
+                    'file': None,
+                    'sheet': sheet,
+                    'row': row_idx,
+                    'column': column,
+                    'cell': cell_address(sheet, column, row_idx),
+                    'value': _sample_value(item[rule.index]),
+                })
+        return failed[0]
+
+    def merge(self, other, file=None):
+        """Add another report's to_dict() (e.g. from a worker process), tagging its samples with file."""
+        self.rows += other['rows']
+        self.rejected += other['rejected']
+        for entry in other['rules']:
+            n = self.compiled.by_id[entry['rule']].number
+            self.counts[n] += entry['count']
+            room = self.max_samples - len(self.samples[n])
+            for sample in entry['samples'][:max(0, room)]:
+                if file:
+                    sample = {**sample, 'file': file,
+                              'cell': cell_address(sample['sheet'], sample.get('column', entry['column']),
+                                                   sample['row'], file)}
+                self.samples[n].append(sample)
+
+    def to_dict(self):
+        """Return the report dict; only rules with violations are listed."""
+        rules = []
+        for rule, count, samples in zip(self.compiled.rules, self.counts, self.samples):
+            if not count:
+                continue
+            rules.append({
+                'rule': rule.id,
+                'field': rule.field.name,
+                'column': rule.field.column,
+                'error': rule.error,
+                'server_message': rule.field.message,
+                'count': count,
+                'truncated': count > len(samples),
+                'samples': samples,
+            })
+        return {
+            'schema': 'importOMExpenseItemSchema',
+            'rows': self.rows,
+            'rejected': self.rejected,
+            'violations': sum(self.counts),
+            'rules': rules,
+        }
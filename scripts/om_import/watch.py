@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Drop-folder bookkeeping for the resident conversion service
+
+watch-import-folder.py keeps one process (and a pool of pre-warmed workers)
+running, so a workbook dropped into the share costs its parse time only, not
+a Python start-up plus the openpyxl import. This module is the part that
+touches the drop directory:
+
+    scan        workbooks (*.xlsx / *.xlsm, or *.csv / *.tsv exports; not ~$
+                Office lock files) whose size and mtime have not changed for
+                `settle` seconds - a file still being copied onto the share is
+                left alone - and that have no up-to-date status file yet
+    claim       <workbook>.lock created with O_CREAT | O_EXCL, so two
+                services on the same share never convert the same file at
+                once; once the lock is held the status file is read again, so
+                a workbook another service finished (or quarantined) while
+                this one waited is not converted twice. The owner touches
+                the lock on every poll while converting; a lock not touched
+                for `lock_timeout` (crashed service) is broken, unless its
+                owner is a live process on this host
+    results     next to the workbook:
+                    <name>.import.json     converter output (see --format)
+                    <name>.import.log      converter console output
+                    <name>.status.json     state processing / done, the source
+                                           fingerprint and the statistics
+    quarantine  a workbook that fails is moved to quarantine/ with its log
+                and a status file (state failed, error, traceback)
+
+A status file records the workbook's (size, mtime_ns) fingerprint; a
+workbook that is replaced in place is converted again.
+
+All status / heartbeat files are written atomically (temp file + os.replace).
+"""
+
+import json
+import os
+import shutil
+import socket
+import time
+
+from .readers import DELIMITERS
+
+WORKBOOK_SUFFIXES = ('.xlsx', '.xlsm') + tuple(DELIMITERS)
+QUARANTINE_DIR = 'quarantine'
+SERVICE_STATUS = '.watch-status.json'
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_SETTLE = 2.0
+DEFAULT_LOCK_TIMEOUT = 3600.0
+
+
+def write_json(path, data):
+    """Write a JSON document atomically."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def now_iso():
+    return time.strftime('%Y-%m-%dT%H:%M:%S%z')
+
+
+def result_paths(workbook_path, output_suffix='.json'):
+    """Output / log / status / lock paths that belong to one workbook."""
+    base = os.path.splitext(workbook_path)[0]
+    return {
+        'output': f"{base}.import{output_suffix}",
+        'log': f"{base}.import.log",
+        'status': f"{base}.status.json",
+        'lock': f"{workbook_path}.lock",
+    }
+
+
+def _pid_alive(pid):
+    """True when a process with this pid exists on this host (always False on Windows)."""
+    # os.kill(pid, 0) terminates the process on Windows instead of probing it
+    if not isinstance(pid, int) or pid <= 0 or os.name == 'nt':
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class FileLock:
+    """An O_EXCL lock file holding the owner's host, pid and start time."""
+
+    def __init__(self, path, timeout=DEFAULT_LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self.held = False
+
+    def acquire(self):
+        """Take the lock; False when another (live) owner has it."""
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._break_stale():
+                    return False
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'host': socket.gethostname(), 'pid': os.getpid(), 'since': now_iso()}, f)
+            self.held = True
+            return True
+        return False
+
+    def touch(self):
+        """Refresh the lock's mtime so a long conversion is not taken for a crash."""
+        if self.held:
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
+
+    def _break_stale(self):
+        try:
+            age = time.time() - os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return True
+        if age < self.timeout:
+            return False
+        owner = read_json(self.path)
+        if isinstance(owner, dict) and owner.get('host') == socket.gethostname() and _pid_alive(owner.get('pid')):
+            return False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def release(self):
+        if self.held:
+            self.held = False
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class DropFolder:
+    """
+    Usage:
+        folder = DropFolder('//share/om-import')
+        for path, fingerprint in folder.scan():
+            lock = folder.claim(path)
+            if lock:
+                folder.mark_processing(path, fingerprint)
+                ...
+                folder.mark_done(path, fingerprint, stats)   # or folder.quarantine(...)
+                lock.release()
+    """
+
+    def __init__(self, directory, settle=DEFAULT_SETTLE, lock_timeout=DEFAULT_LOCK_TIMEOUT,
+                 output_suffix='.json'):
+        self.directory = directory
+        self.settle = settle
+        self.lock_timeout = lock_timeout
+        self.output_suffix = output_suffix
+        self.quarantine_dir = os.path.join(directory, QUARANTINE_DIR)
+        self._observed = {}     # path -> (fingerprint, first seen with it)
+        self._finished = {}     # path -> fingerprint with a final status file
+
+    def paths(self, workbook_path):
+        return result_paths(workbook_path, self.output_suffix)
+
+    def scan(self):
+        """Return [(path, fingerprint)] of settled workbooks that still need converting."""
+        now = time.monotonic()
+        ready = []
+        present = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.lower().endswith(WORKBOOK_SUFFIXES) or name.startswith(('~$', '.')):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                path = entry.path
+                present.add(path)
+                fingerprint = [stat.st_size, stat.st_mtime_ns]
+                if self._finished.get(path) == fingerprint:
+                    continue
+                observed = self._observed.get(path)
+                if observed is None or observed[0] != fingerprint:
+                    self._observed[path] = (fingerprint, now)
+                    if observed is None and self._has_final_status(path, fingerprint):
+                        continue
+                    if self.settle > 0:
+                        continue
+                elif now - observed[1] < self.settle:
+                    continue
+                ready.append((path, fingerprint))
+        for path in [path for path in self._observed if path not in present]:
+            del self._observed[path]
+            self._finished.pop(path, None)
+        return sorted(ready)
+
+    def waiting(self):
+        """Workbooks seen but not settled or not converted yet."""
+        return sum(1 for path, (fingerprint, _) in self._observed.items()
+                   if self._finished.get(path) != fingerprint)
+
+    def _has_final_status(self, path, fingerprint):
+        status = read_json(self.paths(path)['status'])
+        if status and status.get('state') == 'done' and status.get('source', {}).get('fingerprint') == fingerprint:
+            self._finished[path] = fingerprint
+            return True
+        return False
+
+    def claim(self, path, fingerprint):
+        """
+        FileLock for the workbook, or None when another service holds it or
+        has already converted (or quarantined) this version of it.
+        """
+        lock = FileLock(self.paths(path)['lock'], self.lock_timeout)
+        if not lock.acquire():
+            return None
+        # Another service may have finished it between our scan and the lock
+        if not os.path.exists(path) or self._has_final_status(path, fingerprint):
+            lock.release()
+            return None
+        return lock
+
+    def _status(self, path, fingerprint, state, **fields):
+        return {
+            'state': state,
+            'source': {'file': os.path.basename(path), 'fingerprint': fingerprint},
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'updated_at': now_iso(),
+            **fields,
+        }
+
+    def mark_processing(self, path, fingerprint):
+        write_json(self.paths(path)['status'], self._status(path, fingerprint, 'processing',
+                                                            started_at=now_iso()))
+
+    def mark_done(self, path, fingerprint, result):
+        paths = self.paths(path)
+        write_json(paths['status'], self._status(
+            path, fingerprint, 'done', output=os.path.basename(paths['output']),
+            log=os.path.basename(paths['log']), **result))
+        self._finished[path] = fingerprint
+
+    def quarantine(self, path, fingerprint, result):
+        """
+        Move a failed workbook (and its log) to quarantine/, with a status file.
+
+        Returns:
+            the quarantined workbook path
+        """
+        os.makedirs(self.quarantine_dir, exist_ok=True)
+        paths = self.paths(path)
+        name, ext = os.path.splitext(os.path.basename(path))
+        target = os.path.join(self.quarantine_dir, name + ext)
+        if os.path.exists(target):
+            target = os.path.join(self.quarantine_dir, f"{name}.{time.strftime('%Y%m%d-%H%M%S')}{ext}")
+        shutil.move(path, target)
+        target_paths = result_paths(target, self.output_suffix)
+        if os.path.exists(paths['log']):
+            shutil.move(paths['log'], target_paths['log'])
+        for stale in (paths['status'], paths['output']):
+            if os.path.exists(stale):
+                os.remove(stale)
+        write_json(target_paths['status'], self._status(
+            path, fingerprint, 'failed', quarantined_as=os.path.relpath(target, self.directory), **result))
+        self._observed.pop(path, None)
+        self._finished.pop(path, None)
+        return target
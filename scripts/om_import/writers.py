@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Incremental output writers for importData JSON
+
+Items are written as they are produced by the pipeline, so the converter
+never holds the full item list just to serialize it.
+
+Formats:
+    pretty - JSON array with indent=2 (the original converter output)
+    json   - Compact JSON array, no whitespace (smallest payload for importData)
+    ndjson - One compact JSON object per line
+
+Any format can be gzip-compressed (compress=True, or an output path ending in
+.gz). Output goes to a temp file in the target directory and is atomically
+renamed into place on close, so a crash never leaves a half-written file.
+
+Usage:
+    with ImportWriter('import-data.json', fmt='json') as writer:
+        for item in items:
+            writer.write(item)
+"""
+
+import gzip
+import io
+import json
+import os
+
+OUTPUT_FORMATS = ('pretty', 'json', 'ndjson')
+
+_COMPACT = (',', ':')
+
+
+class ImportWriter:
+    """Atomic, incremental writer for import items."""
+
+    def __init__(self, path, fmt='pretty', compress=None):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {fmt} (expected one of {', '.join(OUTPUT_FORMATS)})")
+        if compress is None:
+            compress = str(path).endswith('.gz')
+
+        self.path = str(path)
+        self.fmt = fmt
+        self.compress = compress
+        self.count = 0
+
+        import tempfile
+
+        target_dir = os.path.dirname(os.path.abspath(self.path))
+        fd, self.tmp_path = tempfile.mkstemp(
+            prefix='.' + os.path.basename(self.path) + '.', suffix='.tmp', dir=target_dir
+        )
+        self._raw = os.fdopen(fd, 'wb')
+        self._gzip = None
+        binary = self._raw
+        if compress:
+            # No filename/mtime in the gzip header: same input gives same bytes
+            self._gzip = gzip.GzipFile(filename='', mode='wb', fileobj=self._raw, mtime=0)
+            binary = self._gzip
+        self._f = io.TextIOWrapper(binary, encoding='utf-8', newline='\n')
+        self._closed = False
+
+        if fmt != 'ndjson':
+            self._f.write('[')
+
+    def write(self, item):
+        """Serialize one item (an ImportItem record or a plain dict)."""
+        if not isinstance(item, dict):
+            item = item.to_dict()
+        if self.fmt == 'ndjson':
+            self._f.write(json.dumps(item, ensure_ascii=False, separators=_COMPACT))
+            self._f.write('\n')
+        elif self.fmt == 'json':
+            if self.count:
+                self._f.write(',')
+            self._f.write(json.dumps(item, ensure_ascii=False, separators=_COMPACT))
+        else:
+            # Same text as json.dump(items, f, indent=2)
+            self._f.write(',\n  ' if self.count else '\n  ')
+            self._f.write(json.dumps(item, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+        self.count += 1
+
+    def write_all(self, items):
+        """Serialize every item from an iterable, returning the number written."""
+        for item in items:
+            self.write(item)
+        return self.count
+
+    def close(self):
+        """Finish the document, flush to disk and move it into place."""
+        if self._closed:
+            return
+        if self.fmt == 'pretty':
+            self._f.write('\n]' if self.count else ']')
+        elif self.fmt == 'json':
+            self._f.write(']')
+        self._f.flush()
+        self._f.detach()
+        if self._gzip is not None:
+            self._gzip.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        self._closed = True
+        # mkstemp creates 0600 files; give the output normal file permissions
+        os.chmod(self.tmp_path, 0o644)
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Discard the temp file, leaving any existing output untouched."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._f.detach()
+        except (ValueError, OSError):
+            pass
+        try:
+            self._raw.close()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_items(path, items, fmt='pretty', compress=None):
+    """Write all items to path atomically, returning the number written."""
+    with ImportWriter(path, fmt=fmt, compress=compress) as writer:
+        return writer.write_all(items)
+
+
+def read_items(path):
+    """
+    Read the items of an import file written by ImportWriter (any format,
+    gzip detected from the .gz suffix) as a list of dicts.
+    """
+    path = str(path)
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        if path.removesuffix('.gz').endswith('.ndjson'):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
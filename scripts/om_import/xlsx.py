@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Low-level xlsx package helpers
+
+An .xlsx file is a zip of XML parts. These helpers resolve worksheet names to
+their XML parts without loading the workbook through openpyxl, so callers can
+hash or read individual sheets cheaply.
+"""
+
+import posixpath
+import xml.etree.ElementTree as ET
+
+NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+WORKBOOK_PART = 'xl/workbook.xml'
+WORKBOOK_RELS_PART = 'xl/_rels/workbook.xml.rels'
+SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+STYLES_PART = 'xl/styles.xml'
+
+
+def _resolve_target(target):
+    """Resolve a relationship target relative to xl/workbook.xml."""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join('xl', target))
+
+
+def workbook_sheets(zf):
+    """
+    List the sheets of an opened xlsx zip in workbook order.
+
+    Returns:
+        list of (sheet_name, part_path) tuples, e.g. ('Sheet1', 'xl/worksheets/sheet1.xml')
+    """
+    rels = ET.fromstring(zf.read(WORKBOOK_RELS_PART))
+    targets = {
+        rel.get('Id'): _resolve_target(rel.get('Target'))
+        for rel in rels.iter(f'{{{NS_PKG_REL}}}Relationship')
+    }
+
+    workbook = ET.fromstring(zf.read(WORKBOOK_PART))
+    sheets = []
+    for sheet in workbook.iter(f'{{{NS_MAIN}}}sheet'):
+        rel_id = sheet.get(f'{{{NS_REL}}}id')
+        sheets.append((sheet.get('name'), targets.get(rel_id)))
+    return sheets
+
+
+def active_sheet(zf):
+    """Return (sheet_name, part_path) of the sheet openpyxl reports as wb.active."""
+    sheets = workbook_sheets(zf)
+    workbook = ET.fromstring(zf.read(WORKBOOK_PART))
+    view = workbook.find(f'{{{NS_MAIN}}}bookViews/{{{NS_MAIN}}}workbookView')
+    index = int(view.get('activeTab', 0)) if view is not None else 0
+    if not 0 <= index < len(sheets):
+        index = 0
+    return sheets[index]
+
+
+def merged_ranges(zf, part):
+    """
+    Return the merged cell ranges of a worksheet part as
+    (min_row, min_col, max_row, max_col) tuples (1-based, inclusive).
+
+    The sheet XML is streamed; <mergeCells> sits after <sheetData>, so cell
+    elements are discarded as they are parsed.
+    """
+    ranges = []
+    with zf.open(part) as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == f'{{{NS_MAIN}}}mergeCell':
+                ranges.append(range_bounds(element.get('ref')))
+            elif element.tag == f'{{{NS_MAIN}}}row':
+                element.clear()
+    return ranges
+
+
+def _cell_bounds(ref):
+    letters = ref.rstrip('0123456789')
+    column = 0
+    for letter in letters.upper():
+        column = column * 26 + ord(letter) - 64
+    return int(ref[len(letters):]), column
+
+
+def range_bounds(ref):
+    """'B6:H7' -> (6, 2, 7, 8); a single cell 'C3' -> (3, 3, 3, 3)."""
+    first, _, last = ref.partition(':')
+    min_row, min_col = _cell_bounds(first)
+    max_row, max_col = _cell_bounds(last or first)
+    return min_row, min_col, max_row, max_col
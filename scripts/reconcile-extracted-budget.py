@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Subtotal reconciliation for extracted budget JSON
+
+Checks every header subtotal, category total and increment percentage of
+the extracted budget documents against their item lines, across all files
+in one run (see om_import/reconcile.py), and lists items without a budget.
+
+Usage:
+    python scripts/reconcile-extracted-budget.py [input ...] [--output REPORT_JSON]
+        [--tolerance 1] [--relative-tolerance 0.001] [--pct-tolerance 0.1]
+        [--max-findings 1000] [--strict]
+
+Arguments:
+    input        - Extracted JSON files, directories or quoted globs
+                   (default: 'docs/om-expense-*-extracted.json')
+
+Options:
+    --output     - Report path (default: docs/budget-reconciliation.json)
+    --tolerance  - Allowed absolute difference per sum (default: 1, whole-dollar rounding)
+    --relative-tolerance - Allowed difference as a share of the subtotal (default: 0.001)
+    --pct-tolerance - Allowed increment_pct difference in points (default: 0.1)
+    --max-findings - Findings / unpriced items kept in the report (default: 1000)
+    --strict     - Exit with status 1 when there are findings
+
+Author: IT Department
+Since: FEAT-008 - OM Expense Data Import
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from om_import.reconcile import (
+    DEFAULT_MAX_FINDINGS, DEFAULT_PATTERN, DEFAULT_PCT_TOLERANCE, DEFAULT_RELATIVE_TOLERANCE,
+    DEFAULT_TOLERANCE, Reconciler, find_documents
+)
+
+DEFAULT_OUTPUT = 'docs/budget-reconciliation.json'
+
+
+def describe(finding):
+    """One line for a finding."""
+    where = f"{finding['file']} {finding['category']}"
+    if finding['header_number'] is not None or finding['header']:
+        where += f" #{finding['header_number']} {(finding['header'] or '')[:40]}"
+    kind = finding['kind']
+    if kind == 'subtotal':
+        text = (f"{finding['field']} subtotal {finding['subtotal']:,} != items {finding['items_sum']:,} "
+                f"(diff {finding['difference']:+,})")
+        if finding['unpriced_items']:
+            text += f", {finding['unpriced_items']} unpriced item(s)"
+    elif kind == 'subtotal_missing':
+        text = f"{finding['field']} subtotal empty, items sum to {finding['items_sum']:,}"
+    elif kind == 'increment':
+        target = f"item {finding['item_number']}" if finding['item_number'] else 'subtotal'
+        text = f"{target} increment {finding['stated']}% != {finding['expected']}% ({finding['currency'].upper()}$)"
+    else:
+        text = f"{finding['field']} total {finding['total']:,} != items {finding['items_sum']:,}"
+    return f"{where}: {text}"
+
+
+def reconcile_extracted_budget(inputs, output_path=DEFAULT_OUTPUT, tolerance=DEFAULT_TOLERANCE,
+                               relative_tolerance=DEFAULT_RELATIVE_TOLERANCE,
+                               pct_tolerance=DEFAULT_PCT_TOLERANCE, max_findings=DEFAULT_MAX_FINDINGS):
+    """
+    Reconcile all matching documents and write the report.
+
+    Returns:
+        the report dict
+    """
+    paths = find_documents(inputs)
+    if not paths:
+        raise ValueError(f"No extracted JSON found for: {', '.join(inputs)}")
+
+    reconciler = Reconciler(tolerance, relative_tolerance, pct_tolerance, max_findings)
+    for path in paths:
+        reconciler.add_file(path)
+    report = reconciler.report()
+
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output_path)
+
+    print("=" * 50)
+    print("[STATS] Reconciliation Statistics:")
+    print("=" * 50)
+    print(f"   Files: {report['files']}, categories: {report['categories']}, "
+          f"headers: {report['headers']:,}, items: {report['items']:,}")
+    print(f"   Subtotals checked: {report['checked']['subtotals']:,} "
+          f"({report['headers_without_subtotal']:,} headers without subtotal)")
+    print(f"   Item increments checked: {report['checked']['item_increments']:,}")
+    print(f"   Unpriced items (no US$ / HK$ budget): {report['unpriced_items']:,}")
+    for kind, count in report['findings_by_kind'].items():
+        print(f"   {kind}: {count:,}")
+
+    if report['findings']:
+        print("\n[WARN] Findings (first 10):")
+        for finding in report['findings'][:10]:
+            print(f"   - {describe(finding)}")
+    else:
+        print("\n[OK] All subtotals, totals and increments reconcile")
+    print(f"\n[INFO] Report: {output_path}")
+    return report
+
+
+def main(argv=None, prog=None):
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Reconcile subtotals, totals and increments of extracted budget JSON.',
+        epilog="Example: python scripts/reconcile-extracted-budget.py 'docs/om-expense-*-extracted.json'"
+    )
+    parser.add_argument('inputs', nargs='*', default=[DEFAULT_PATTERN],
+                        help=f'Extracted JSON files, directories or globs (default: {DEFAULT_PATTERN})')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f'Report path (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed absolute difference (default: {DEFAULT_TOLERANCE:g})')
+    parser.add_argument('--relative-tolerance', type=float, default=DEFAULT_RELATIVE_TOLERANCE,
+                        help=f'Allowed relative difference (default: {DEFAULT_RELATIVE_TOLERANCE:g})')
+    parser.add_argument('--pct-tolerance', type=float, default=DEFAULT_PCT_TOLERANCE,
+                        help=f'Allowed increment_pct difference in points (default: {DEFAULT_PCT_TOLERANCE:g})')
+    parser.add_argument('--max-findings', type=int, default=DEFAULT_MAX_FINDINGS,
+                        help=f'Findings kept in the report (default: {DEFAULT_MAX_FINDINGS})')
+    parser.add_argument('--strict', action='store_true', help='Exit with status 1 when there are findings')
+    args = parser.parse_args(argv)
+
+    try:
+        report = reconcile_extracted_budget(args.inputs, args.output, tolerance=args.tolerance,
+                                            relative_tolerance=args.relative_tolerance,
+                                            pct_tolerance=args.pct_tolerance, max_findings=args.max_findings)
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        sys.exit(1)
+
+    if args.strict and any(report['findings_by_kind'].values()):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Concurrent, resumable upload of import data to importData
+
+Sends the output of convert-excel-to-import-json.py to the running web app's
+`omExpense.importData` tRPC mutation, one transaction-sized chunk per
+request, with a few requests in flight and a checkpoint file so an
+interrupted upload resumes where it stopped (see om_import/upload.py).
+
+Usage:
+    python scripts/upload-import-data.py <input> --financial-year YYYY
+        [--url http://localhost:3000] [--cookie COOKIE]
+        [--import-mode skip|update|replace] [--concurrency 4]
+        [--chunk-items N] [--attempts 5] [--timeout 330]
+        [--checkpoint FILE] [--restart] [--continue-on-error]
+
+Arguments:
+    input        - A chunk directory written by `convert ... --chunk-dir DIR`
+                   (manifest.json; every chunk is checksum-verified before it is
+                   sent), or one import file (.json / .ndjson, optionally .gz),
+                   which is split into chunks the same way
+
+Options:
+    --url        - Base URL of the web app (default: http://localhost:3000)
+    --cookie     - Cookie header of a signed-in session, e.g.
+                   'authjs.session-token=...' (default: $OM_IMPORT_COOKIE);
+                   importData is a protected procedure
+    --import-mode - skip (default), update or replace. replace deletes the
+                   financial year with the first chunk only; the other chunks
+                   are sent with skip once it has committed (a failed replace
+                   chunk stops the upload; rerunning sends it again first)
+    --concurrency - Requests in flight (default: 4)
+    --chunk-items - Items per request when input is a single file (default: 500;
+                   also capped by the 6000 monthly-record limit of chunking.py)
+    --attempts   - Tries per chunk for connection errors, timeouts, 429 and 5xx
+                   (default: 5, exponential backoff with jitter)
+    --timeout    - Seconds to wait for one response (default: 330)
+    --checkpoint - Progress file (default: <chunk_dir>/upload-checkpoint.json or
+                   <input>.upload-checkpoint.json). Rerunning the same command
+                   skips the chunks it lists as completed
+    --restart    - Discard an existing checkpoint and upload everything again
+    --continue-on-error - Keep starting chunks after one failed (default: stop)
+
+Exit status is 1 when a chunk failed; rerun the same command to retry it.
+
+Author: IT Department
+Since: FEAT-008 - OM Expense Data Import
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from om_import.chunking import (
+    DEFAULT_MAX_ITEMS, MANIFEST_NAME, file_sha256, group_items, load_manifest, plan_chunks, verify_chunk
+)
+from om_import.pipeline import ITEM_FIELDS, ImportItem
+from om_import.upload import (
+    DEFAULT_ATTEMPTS, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, IMPORT_MODES,
+    TrpcClient, UploadCheckpoint, UploadChunk, upload_chunks
+)
+from om_import.writers import read_items
+
+DEFAULT_URL = 'http://localhost:3000'
+COOKIE_ENV = 'OM_IMPORT_COOKIE'
+CHECKPOINT_NAME = 'upload-checkpoint.json'
+
+
+def chunks_from_dir(chunk_dir):
+    """
+    UploadChunks for a chunk directory and the manifest checksum as fingerprint.
+
+    A chunk file is read (and verified) only when it is about to be sent.
+    """
+    manifest = load_manifest(chunk_dir)
+
+    def loader(entry):
+        def load():
+            if not verify_chunk(chunk_dir, entry):
+                raise ValueError(f"Chunk {entry['file']} is missing or does not match manifest.json")
+            return read_items(os.path.join(chunk_dir, entry['file']))
+        return load
+
+    chunks = [UploadChunk(entry['index'], entry['file'], loader(entry)) for entry in manifest['chunks']]
+    return chunks, file_sha256(os.path.join(chunk_dir, MANIFEST_NAME))
+
+
+def chunks_from_file(path, max_items=DEFAULT_MAX_ITEMS):
+    """UploadChunks for one import file, split without breaking header groups."""
+    defaults = ImportItem._field_defaults
+    items = [ImportItem._make(item.get(name, defaults.get(name)) for name in ITEM_FIELDS) for item in read_items(path)]
+    chunks = []
+    end = 0
+    for index, chunk in enumerate(plan_chunks(group_items(items), max_items), 1):
+        payload = [item.to_dict() for group in chunk for item in group]
+        label = f"chunk {index} (items {end + 1}-{end + len(payload)})"
+        chunks.append(UploadChunk(index, label, lambda payload=payload: payload))
+        end += len(payload)
+    return chunks, f"{file_sha256(path)}:{max_items}"
+
+
+def print_event(event):
+    """Progress line for one upload event."""
+    if event['event'] == 'retry':
+        print(f"[WARN] {event['chunk']}: attempt {event['attempt']} failed ({event['error']}), "
+              f"retrying in {event['delay']:.1f}s")
+    elif event['event'] == 'failed':
+        print(f"[ERROR] {event['chunk']}: {event['error']}")
+    else:
+        stats = event['statistics']
+        print(f"[INFO] {event['chunk']}: {event['items']} items in {event['seconds']:.1f}s "
+              f"(created {stats.get('createdItems', 0)}, updated {stats.get('updatedItems', 0)}, "
+              f"skipped {stats.get('skippedDuplicates', 0)})")
+
+
+def upload_import_data(input_path, financial_year, url=DEFAULT_URL, cookie=None, import_mode='skip',
+                       concurrency=DEFAULT_CONCURRENCY, max_items=DEFAULT_MAX_ITEMS,
+                       attempts=DEFAULT_ATTEMPTS, timeout=DEFAULT_TIMEOUT, checkpoint_path=None,
+                       restart=False, stop_on_error=True):
+    """
+    Upload a chunk directory or import file to importData.
+
+    Returns:
+        summary dict (see om_import.upload.upload_chunks)
+    """
+    print("=" * 50)
+    print("FEAT-008: Upload import data")
+    print("=" * 50)
+
+    if os.path.isdir(input_path):
+        chunks, fingerprint = chunks_from_dir(input_path)
+        default_checkpoint = os.path.join(input_path, CHECKPOINT_NAME)
+    else:
+        chunks, fingerprint = chunks_from_file(input_path, max_items)
+        default_checkpoint = input_path + '.' + CHECKPOINT_NAME
+
+    checkpoint = UploadCheckpoint(checkpoint_path or default_checkpoint, fingerprint,
+                                  financial_year, import_mode)
+    if restart and os.path.exists(checkpoint.path):
+        os.remove(checkpoint.path)
+    resumed = checkpoint.load()
+
+    print(f"[INFO] Input: {input_path} ({len(chunks)} chunks)")
+    print(f"[INFO] Target: {url} ({import_mode}, financial year {financial_year}, "
+          f"{concurrency} in flight)")
+    print(f"[INFO] Checkpoint: {checkpoint.path}")
+    if resumed:
+        print(f"[INFO] Resuming: {resumed} of {len(chunks)} chunks already uploaded")
+    if not cookie:
+        print(f"[WARN] No session cookie (--cookie or ${COOKIE_ENV}); importData requires a signed-in user")
+
+    client = TrpcClient(url, cookie=cookie, pool_size=concurrency, timeout=timeout)
+    try:
+        summary = asyncio.run(upload_chunks(chunks, client, financial_year, import_mode=import_mode,
+                                            checkpoint=checkpoint, concurrency=concurrency,
+                                            attempts=attempts, stop_on_error=stop_on_error,
+                                            progress=print_event))
+    finally:
+        client.close()
+
+    stats = summary['statistics']
+    print("\n[STATS] Upload Statistics:")
+    print(f"   Chunks uploaded: {summary['uploaded']} (+{summary['resumed']} from checkpoint) "
+          f"of {summary['chunks']}")
+    print(f"   Requests: {summary['requests']} in {summary['seconds']:.1f}s")
+    print(f"   Created items: {stats.get('createdItems', 0)}")
+    print(f"   Updated items: {stats.get('updatedItems', 0)}")
+    print(f"   Skipped duplicates: {stats.get('skippedDuplicates', 0)}")
+    print(f"   Created headers / OpCos / categories: {stats.get('createdHeaders', 0)} / "
+          f"{stats.get('createdOpCos', 0)} / {stats.get('createdCategories', 0)}")
+    if stats.get('deletedBeforeReplace'):
+        print(f"   Deleted before replace: {stats['deletedBeforeReplace']}")
+
+    if summary['failed'] or summary['remaining']:
+        print(f"\n[WARN] {len(summary['failed'])} chunk(s) failed, {summary['remaining']} not uploaded; "
+              f"rerun the same command to resume")
+    else:
+        print("\n[OK] All chunks uploaded")
+    return summary
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Upload import data (chunk directory or import file) to omExpense.importData.',
+        epilog="Example: python scripts/upload-import-data.py import-chunks --financial-year 2026"
+    )
+    parser.add_argument('input', help='Chunk directory with manifest.json, or an import .json / .ndjson(.gz) file')
+    parser.add_argument('--financial-year', type=int, required=True,
+                        help='financialYear passed to importData')
+    parser.add_argument('--url', default=DEFAULT_URL, help=f'Web app base URL (default: {DEFAULT_URL})')
+    parser.add_argument('--cookie', default=os.environ.get(COOKIE_ENV),
+                        help=f'Session Cookie header (default: ${COOKIE_ENV})')
+    parser.add_argument('--import-mode', choices=IMPORT_MODES, default='skip',
+                        help='skip (default), update or replace (first chunk only)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Requests in flight (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--chunk-items', type=int, default=DEFAULT_MAX_ITEMS,
+                        help=f'Items per request for a single input file (default: {DEFAULT_MAX_ITEMS})')
+    parser.add_argument('--attempts', type=int, default=DEFAULT_ATTEMPTS,
+                        help=f'Tries per chunk for retryable errors (default: {DEFAULT_ATTEMPTS})')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Response timeout in seconds (default: {DEFAULT_TIMEOUT:g})')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: next to the input)')
+    parser.add_argument('--restart', action='store_true', help='Discard the checkpoint and upload everything')
+    parser.add_argument('--continue-on-error', action='store_true',
+                        help='Keep uploading the other chunks after a chunk failed')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"[ERROR] Input not found: {args.input}")
+        sys.exit(1)
+    if not 2000 <= args.financial_year <= 2100:
+        print(f"[ERROR] --financial-year must be between 2000 and 2100 (got {args.financial_year})")
+        sys.exit(1)
+    if args.concurrency < 1 or args.attempts < 1:
+        print("[ERROR] --concurrency and --attempts must be at least 1")
+        sys.exit(1)
+
+    try:
+        summary = upload_import_data(args.input, args.financial_year, url=args.url, cookie=args.cookie,
+                                     import_mode=args.import_mode, concurrency=args.concurrency,
+                                     max_items=args.chunk_items, attempts=args.attempts,
+                                     timeout=args.timeout, checkpoint_path=args.checkpoint,
+                                     restart=args.restart, stop_on_error=not args.continue_on_error)
+    except KeyboardInterrupt:
+        print("\n[WARN] Interrupted; completed chunks are in the checkpoint, rerun to resume")
+        sys.exit(130)
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        sys.exit(1)
+
+    if summary['failed'] or summary['remaining']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
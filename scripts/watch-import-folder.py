@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+FEAT-008: Resident watch-folder service for the Excel to JSON converter
+
+Runs convert_excel_to_import_json (convert-excel-to-import-json.py) on every
+workbook dropped into a directory, without starting a new Python process per
+file: the service polls the drop directory and hands settled workbooks to a
+bounded pool of worker processes that imported the converter and openpyxl
+once at start-up, so per-file latency is the conversion itself.
+
+For each workbook (see om_import/watch.py for the file conventions):
+    <name>.xlsx.lock         taken while converting (safe with several services)
+    <name>.import.json       converter output
+    <name>.import.log        converter console output
+    <name>.status.json       processing -> done, with the statistics
+    quarantine/<name>.xlsx   failed workbooks, with their .status.json / .import.log
+
+A workbook fails when the converter raises (unreadable file, unknown header
+layout, ...) or produces no valid items. <drop_dir>/.watch-status.json is
+the service heartbeat (running files, counts, last error).
+
+Usage:
+    python scripts/watch-import-folder.py <drop_dir> [--workers 2] [--interval 2]
+        [--settle 2] [--lock-timeout 3600] [--once]
+        [--format pretty|json|ndjson] [--gzip] [--stream] [--currency check|fill]
+
+Arguments:
+    drop_dir     - Directory to watch for .xlsx / .xlsm workbooks (or .csv / .tsv exports)
+
+Options:
+    --workers    - Worker processes, i.e. workbooks converted at a time (default: 2)
+    --interval   - Seconds between directory polls (default: 2)
+    --settle     - Seconds a workbook's size and mtime must stay unchanged before
+                   it is converted, so files still being copied are skipped (default: 2)
+    --lock-timeout - Seconds without a refresh after which a .lock left by a
+                   crashed service is broken (default: 3600); running
+                   conversions refresh their locks on every poll
+    --once       - Convert what is in the directory, then exit
+    --format, --gzip, --stream, --currency - Passed to the converter
+
+Stop with Ctrl+C (or SIGTERM): running conversions finish, no new ones start.
+
+Author: IT Department
+Since: FEAT-008 - OM Expense Data Import
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import signal
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from om_import.currency import CURRENCY_MODES
+from om_import.watch import (
+    DEFAULT_INTERVAL, DEFAULT_LOCK_TIMEOUT, DEFAULT_SETTLE, SERVICE_STATUS, DropFolder, now_iso, write_json
+)
+from om_import.writers import OUTPUT_FORMATS
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WORKERS = 2
+
+# Statistics copied from the converter's stats into the status file
+STATUS_STATS = ('total_processed', 'valid_items', 'unique_items', 'duplicates_removed', 'skipped_rows',
+                'unique_headers', 'unique_opcos', 'unique_categories', 'errors')
+
+_converter = None
+
+
+def _init_worker():
+    """Pool initializer: import the converter (and openpyxl) once per worker."""
+    global _converter
+    # Ctrl+C / SIGTERM reach the whole process group; the service handles them
+    # and lets running conversions finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    spec = importlib.util.spec_from_file_location(
+        'convert_excel_to_import_json', os.path.join(SCRIPTS_DIR, 'convert-excel-to-import-json.py'))
+    _converter = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(_converter)
+    # The converter imports the pipeline modules on its first run; warm those too
+    for name in ('om_import.metrics', 'om_import.parallel', 'om_import.profiler', 'openpyxl'):
+        importlib.import_module(name)
+
+
+def _warm_up():
+    """No-op task; submitting one per worker starts every worker process up front."""
+    time.sleep(0.05)
+
+
+def convert_one(excel_path, output_path, log_path, options):
+    """
+    Worker: convert one workbook, capturing the converter's console output.
+
+    Returns:
+        dict with ok, seconds, stats (summary) or error / traceback
+    """
+    started = time.perf_counter()
+    log = io.StringIO()
+    result = {'ok': False}
+    try:
+        with contextlib.redirect_stdout(log):
+            stats = _converter.convert_excel_to_import_json(excel_path, output_path, **options)
+        summary = {key: stats[key] for key in STATUS_STATS}
+        if stats.get('layout'):
+            summary['layout'] = stats['layout']['profile']
+        summary['schema_rejected'] = stats['validation']['rejected']
+        result['stats'] = summary
+        if stats['unique_items']:
+            result['ok'] = True
+        else:
+            result['error'] = 'No valid items: importData requires at least one item'
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc(limit=5).splitlines()[-8:]
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    with open(log_path, 'w', encoding='utf-8') as f:
+        f.write(log.getvalue())
+    return result
+
+
+class WatchService:
+    """Poll loop: claim settled workbooks, keep up to `workers` conversions running."""
+
+    def __init__(self, drop_dir, workers=DEFAULT_WORKERS, interval=DEFAULT_INTERVAL, settle=DEFAULT_SETTLE,
+                 lock_timeout=DEFAULT_LOCK_TIMEOUT, options=None):
+        self.drop_dir = drop_dir
+        self.workers = workers
+        self.interval = interval
+        self.options = options or {}
+        suffix = {'ndjson': '.ndjson'}.get(self.options.get('output_format'), '.json')
+        if self.options.get('compress'):
+            suffix += '.gz'
+        self.folder = DropFolder(drop_dir, settle=settle, lock_timeout=lock_timeout, output_suffix=suffix)
+        self.running = {}       # future -> (path, fingerprint, lock)
+        self.stopping = False
+        self.counts = {'done': 0, 'failed': 0}
+        self.last_error = None
+        self.started_at = now_iso()
+
+    def stop(self, *_):
+        if not self.stopping:
+            print("\n[INFO] Stopping: waiting for running conversions to finish...")
+        self.stopping = True
+
+    def run(self, once=False):
+        print(f"[INFO] Watching {self.drop_dir} with {self.workers} workers "
+              f"(poll {self.interval:g}s, settle {self.folder.settle:g}s)")
+        pool = self._new_pool()
+        try:
+            while True:
+                if not self.stopping:
+                    self._dispatch(pool)
+                self._heartbeat()
+                if self.stopping and not self.running:
+                    break
+                if once and not self.running and not self.folder.waiting():
+                    break
+                if not self.running:
+                    time.sleep(self.interval)
+                    continue
+                done, _ = wait(list(self.running), timeout=self.interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if not self._finish(future):
+                        # A worker died (e.g. out of memory); the pool cannot be reused
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        # Every pending future of a broken pool fails with BrokenProcessPool
+                        for other in list(self.running):
+                            self._finish(other)
+                        pool = self._new_pool()
+                        break
+        finally:
+            pool.shutdown(wait=True)
+            self._heartbeat(stopped=True)
+        print(f"[STATS] Converted: {self.counts['done']}, quarantined: {self.counts['failed']}")
+        return self.counts
+
+    def _new_pool(self):
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        # Pay the interpreter / openpyxl start-up now, not when the first workbook arrives
+        wait([pool.submit(_warm_up) for _ in range(self.workers)])
+        return pool
+
+    def _dispatch(self, pool):
+        busy = {path for path, _, _ in self.running.values()}
+        for path, fingerprint in self.folder.scan():
+            if len(self.running) >= self.workers:
+                break
+            if path in busy:
+                continue
+            lock = self.folder.claim(path, fingerprint)
+            if lock is None:
+                continue
+            paths = self.folder.paths(path)
+            self.folder.mark_processing(path, fingerprint)
+            print(f"[INFO] Converting {os.path.basename(path)}")
+            future = pool.submit(convert_one, path, paths['output'], paths['log'], self.options)
+            self.running[future] = (path, fingerprint, lock)
+
+    def _finish(self, future):
+        """Record one finished conversion; False when the pool is broken."""
+        path, fingerprint, lock = self.running.pop(future)
+        name = os.path.basename(path)
+        broken = False
+        try:
+            result = future.result()
+        except BrokenProcessPool as e:
+            broken = True
+            result = {'ok': False, 'error': f"Worker crashed: {e}"}
+        except Exception as e:
+            result = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+        ok = result.pop('ok')
+        try:
+            if ok:
+                self.folder.mark_done(path, fingerprint, result)
+                self.counts['done'] += 1
+                stats = result['stats']
+                print(f"[OK] {name}: {stats['unique_items']} items, {stats['errors']} errors "
+                      f"({result['seconds']}s)")
+            else:
+                target = self.folder.quarantine(path, fingerprint, result)
+                self.counts['failed'] += 1
+                self.last_error = f"{name}: {result['error']}"
+                print(f"[ERROR] {name}: {result['error']} -> {os.path.relpath(target, self.drop_dir)}")
+        except OSError as e:
+            self.last_error = f"{name}: {e}"
+            print(f"[ERROR] {name}: could not record the result: {e}")
+        finally:
+            lock.release()
+        return not broken
+
+    def _heartbeat(self, stopped=False):
+        for _, _, lock in self.running.values():
+            lock.touch()
+        write_json(os.path.join(self.drop_dir, SERVICE_STATUS), {
+            'state': 'stopped' if stopped else ('stopping' if self.stopping else 'running'),
+            'pid': os.getpid(),
+            'started_at': self.started_at,
+            'updated_at': now_iso(),
+            'workers': self.workers,
+            'running': sorted(os.path.basename(path) for path, _, _ in self.running.values()),
+            'waiting': self.folder.waiting() - len(self.running),
+            'converted': self.counts['done'],
+            'quarantined': self.counts['failed'],
+            'last_error': self.last_error,
+        })
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Convert workbooks dropped into a directory with a resident worker pool.',
+        epilog="Example: python scripts/watch-import-folder.py //fileshare/om-import --workers 4"
+    )
+    parser.add_argument('drop_dir', help='Directory to watch for .xlsx / .xlsm (or .csv / .tsv) workbooks')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Workbooks converted at a time (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f'Seconds between polls (default: {DEFAULT_INTERVAL:g})')
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE,
+                        help=f'Seconds a workbook must stay unchanged before conversion (default: {DEFAULT_SETTLE:g})')
+    parser.add_argument('--lock-timeout', type=float, default=DEFAULT_LOCK_TIMEOUT,
+                        help=f'Seconds without a refresh after which a stale .lock is broken '
+                             f'(default: {DEFAULT_LOCK_TIMEOUT:g})')
+    parser.add_argument('--once', action='store_true', help='Convert the current workbooks, then exit')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='pretty', help='Converter output format')
+    parser.add_argument('--gzip', action='store_true', help='Gzip-compress the outputs')
+    parser.add_argument('--stream', action='store_true', help='Constant-memory converter mode')
+    parser.add_argument('--currency', choices=CURRENCY_MODES, help='Converter currency stage')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.drop_dir):
+        print(f"[ERROR] Directory not found: {args.drop_dir}")
+        sys.exit(1)
+
+    options = {'output_format': args.format, 'compress': args.gzip, 'streaming': args.stream,
+               'currency_mode': args.currency}
+    service = WatchService(args.drop_dir, workers=max(1, args.workers), interval=args.interval,
+                           settle=args.settle, lock_timeout=args.lock_timeout, options=options)
+    signal.signal(signal.SIGINT, service.stop)
+    signal.signal(signal.SIGTERM, service.stop)
+    try:
+        counts = service.run(once=args.once)
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        sys.exit(1)
+
+    if args.once and counts['failed']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()